@@ -11,19 +11,22 @@
 # GitHub: https://github.com/yourusername/windows11-fresher-pro
 # =============================================================================
 
+# Only lightweight modules are imported here so the engine loads fast as a
+# library or in headless mode. tkinter, ctypes, asyncio, sqlite3,
+# logging, argparse and concurrent.futures are imported where they are
+# first needed.
 import os
+import errno
+import stat
 import sys
-import shutil
-import subprocess
 import threading
 import time
 import json
+import queue
+from functools import partial
+from collections import deque
 from datetime import datetime
-from pathlib import Path
-import tkinter as tk
-from tkinter import ttk, messagebox, scrolledtext
-from tkinter import font as tkfont
-import ctypes
+from itertools import islice
 
 # =============================================================================
 # CONFIGURATION
@@ -34,6 +37,15 @@ APP_VERSION = "2.0.0"
 APP_AUTHOR = "SHΔDØW WORM-AI💀🔥"
 APP_COLOR = "#0078d4"  # Windows 11 blue
 
+# How often the GUI drains queued log lines and progress updates
+UI_REFRESH_MS = 100
+UI_MAX_LINES_PER_BATCH = 20000
+
+# Log lines kept in memory; older lines go to the rotating log file
+LOG_BUFFER_LINES = 10000
+LOG_LEVELS = ("INFO", "WARNING", "ERROR")
+LOG_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fresher_pro.log")
+
 # Color scheme - Modern dark theme
 COLORS = {
     'bg_dark': '#1e1e1e',        # Main background
@@ -51,6 +63,2266 @@ COLORS = {
     'border': '#3e3e42'            # Border color
 }
 
+# =============================================================================
+# PLATFORM LAYER
+# =============================================================================
+
+IS_WINDOWS = sys.platform.startswith('win')
+
+_windll = None
+
+
+def windows_dll(name):
+    """Get a Windows DLL through ctypes, loading ctypes on first use"""
+    global _windll
+    if not IS_WINDOWS:
+        raise OSError(f"{name} is only available on Windows")
+    if _windll is None:
+        import ctypes
+        _windll = ctypes.windll
+    return getattr(_windll, name)
+
+
+def is_admin():
+    """Check for Administrator privileges; None when it can't be told"""
+    try:
+        return bool(windows_dll("shell32").IsUserAnAdmin())
+    except (OSError, AttributeError):
+        return None
+
+
+# =============================================================================
+# TARGET REGISTRY
+# =============================================================================
+
+# Filesystem targets declared as data, in run order. Each target has a
+# name, the status and log message shown while it runs, and path templates:
+# %VAR% is expanded from the environment, wildcards match files or folders,
+# and missing paths or unset variables are skipped. Optional filters:
+#   include / exclude  globs on file names, or on the path below the target
+#                      folder when the glob contains a slash
+#   extensions         file extensions to clean, e.g. ["tmp", "log"]
+#   min_age_days       skip files modified more recently than this
+#   min_size           skip files smaller than this many bytes
+#   recursive          false to clean only the top level of each folder
+#   remove_dirs        true to also remove subfolders left empty, so later
+#                      scans don't have to visit them; the target folder
+#                      itself is always kept
+#   discover           "browsers" to add the cache folders of every browser
+#                      profile found by BrowserProfiles
+# More targets (or overrides of these, matched by name) are read from
+# TARGETS_FILE, for example:
+#   [{"name": "teams_cache", "paths": ["%APPDATA%\\Microsoft\\Teams\\Cache"]},
+#    {"name": "nvidia_shaders", "paths": ["%LOCALAPPDATA%\\NVIDIA\\DXCache"],
+#     "min_age_days": 7}]
+DEFAULT_TARGETS = [
+    {
+        "name": "windows_temp",
+        "status": "Cleaning Windows Temp...",
+        "message": "📁 Cleaning Windows Temporary Files",
+        "paths": [
+            r"%TEMP%",
+            r"%TMP%",
+            r"C:\Windows\Temp",
+            r"%LOCALAPPDATA%\Temp",
+        ],
+    },
+    {
+        "name": "browser_caches",
+        "status": "Cleaning Browser Caches...",
+        "message": "🌐 Cleaning Browser Caches",
+        "discover": "browsers",
+        "remove_dirs": True,
+    },
+    {
+        "name": "windows_logs",
+        "status": "Cleaning Windows Logs...",
+        "message": "📋 Cleaning Windows Log Files",
+        "paths": [
+            r"C:\Windows\Logs",
+            r"%LOCALAPPDATA%\Microsoft\Windows\WebCache",
+            r"%LOCALAPPDATA%\Microsoft\Windows\Explorer",
+        ],
+    },
+    {
+        "name": "prefetch",
+        "status": "Cleaning Prefetch...",
+        "message": "⚡ Cleaning Windows Prefetch",
+        "paths": [r"C:\Windows\Prefetch"],
+    },
+    {
+        "name": "thumbnails",
+        "status": "Cleaning Thumbnail Cache...",
+        "message": "🖼️ Cleaning Thumbnail Cache",
+        "paths": [r"%LOCALAPPDATA%\Microsoft\Windows\Explorer"],
+        "include": ["thumbcache_*"],
+        "recursive": False,
+    },
+    {
+        "name": "recent_files",
+        "status": "Cleaning Recent Files...",
+        "message": "📂 Cleaning Recent Files List",
+        "paths": [r"%APPDATA%\Microsoft\Windows\Recent"],
+    },
+    {
+        "name": "font_cache",
+        "status": "Cleaning Font Cache...",
+        "message": "🔤 Cleaning Font Cache",
+        "paths": [r"C:\Windows\ServiceProfiles\LocalService\AppData\Local\FontCache"],
+    },
+    {
+        "name": "error_reports",
+        "status": "Cleaning Error Reports...",
+        "message": "⚠️ Cleaning Windows Error Reports",
+        "paths": [r"C:\ProgramData\Microsoft\Windows\WER"],
+        "remove_dirs": True,
+    },
+    {
+        "name": "setup_logs",
+        "status": "Cleaning Setup Logs...",
+        "message": "🔧 Cleaning Windows Setup Logs",
+        "paths": [
+            r"C:\Windows\Panther",
+            r"C:\Windows\Setup Logs",
+        ],
+    },
+    {
+        "name": "memory_dumps",
+        "status": "Cleaning Memory Dumps...",
+        "message": "💾 Cleaning Memory Dump Files",
+        "paths": [
+            r"C:\Windows\Minidump",
+            r"C:\Windows\MEMORY.DMP",
+        ],
+    },
+]
+
+# Sources of folders found at run time rather than declared
+DISCOVERY_SOURCES = ("browsers",)
+
+# What each field of a target definition must hold
+TARGET_FIELDS = {
+    "name": str,
+    "status": str,
+    "message": str,
+    "paths": "strings",
+    "include": "strings",
+    "exclude": "strings",
+    "extensions": "strings",
+    "min_age_days": "number",
+    "min_size": "number",
+    "recursive": bool,
+    "remove_dirs": bool,
+    "discover": str,
+    "enabled": bool,
+}
+
+# User targets file (JSON list, or TOML with a [[targets]] array)
+TARGETS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fresher_targets.json")
+
+# Environment used with a fixture root
+FIXTURE_ENV = {
+    "TEMP": r"C:\Users\fixture\AppData\Local\Temp",
+    "TMP": r"C:\Users\fixture\AppData\Local\Temp",
+    "LOCALAPPDATA": r"C:\Users\fixture\AppData\Local",
+    "APPDATA": r"C:\Users\fixture\AppData\Roaming",
+}
+
+
+class PathResolver:
+    """Resolve target path templates against a root directory and environment
+    
+    Without a root, templates resolve to live system paths. With a root,
+    drive-letter paths map to root/<drive>/..., so every filesystem target
+    can run against a fixture tree on any OS.
+    """
+    
+    def __init__(self, root=None, env=None):
+        self.root = os.path.abspath(root) if root else None
+        if env is None:
+            env = FIXTURE_ENV if root else os.environ
+        self.env = {key.upper(): value for key, value in env.items()}
+    
+    def state_file(self, default):
+        """Where a state file kept next to the app goes; inside the root for fixture runs"""
+        return os.path.join(self.root, os.path.basename(default)) if self.root else default
+    
+    def resolve(self, template):
+        """Get the paths matching a template (empty if a variable is unset)"""
+        import glob
+        import re
+        magic = glob.has_magic(template)
+        escape = glob.escape if magic else str
+        missing = []
+        
+        def expand(match):
+            value = self.env.get(match.group(1).upper())
+            if not value:
+                missing.append(match.group(1))
+                return ""
+            return escape(value)
+        
+        path = re.sub(r"%([^%]+)%", expand, template)
+        if missing:
+            return []
+        if self.root:
+            drive, _, rest = path.partition(":")
+            if len(drive) == 1 and rest[:1] in ("\\", "/"):
+                path = os.path.join(escape(self.root), drive.upper(), *rest.replace("\\", "/").split("/"))
+        if magic:
+            return sorted(glob.glob(path))
+        return [path]
+    
+    def paths(self, templates):
+        """Get the resolved paths of a list of templates"""
+        return [path for template in templates for path in self.resolve(template)]
+
+
+class GlobSet:
+    """Case-insensitive globs compiled for near constant-time matching
+    
+    Literal names and '*.ext' globs go into hash sets and 'prefix*' globs
+    are looked up by prefix length, so common rules cost a few dictionary
+    lookups however many there are. Only the remaining globs are combined
+    into one regex; globs with a slash match the relative path instead of
+    the name.
+    """
+    
+    def __init__(self, patterns):
+        import fnmatch
+        import re
+        self.names = set()
+        self.suffixes = set()
+        self.prefixes = {}
+        name_globs = []
+        path_globs = []
+        for pattern in patterns:
+            pattern = pattern.lower().replace("\\", "/")
+            if "/" in pattern:
+                path_globs.append(fnmatch.translate(pattern))
+            elif not glob_magic(pattern):
+                self.names.add(pattern)
+            elif pattern.startswith("*.") and not glob_magic(pattern[1:]) and pattern.count(".") == 1:
+                self.suffixes.add(pattern[1:])
+            elif pattern.endswith("*") and not glob_magic(pattern[:-1]):
+                self.prefixes.setdefault(len(pattern) - 1, set()).add(pattern[:-1])
+            else:
+                name_globs.append(fnmatch.translate(pattern))
+        self.name_regex = re.compile("|".join(name_globs), re.S) if name_globs else None
+        self.path_regex = re.compile("|".join(path_globs), re.S) if path_globs else None
+    
+    def match(self, name, relpath=None):
+        """Check a file name (and its path below the target folder)"""
+        name = name.lower()
+        if name in self.names:
+            return True
+        dot = name.rfind(".")
+        if dot >= 0 and name[dot:] in self.suffixes:
+            return True
+        for length, prefixes in self.prefixes.items():
+            if name[:length] in prefixes:
+                return True
+        if self.name_regex and self.name_regex.match(name):
+            return True
+        if self.path_regex and relpath is not None:
+            return self.path_regex.match(relpath.lower().replace("\\", "/")) is not None
+        return False
+
+
+def glob_magic(pattern):
+    """Check for glob wildcards"""
+    return any(char in pattern for char in "*?[")
+
+
+def check_target_spec(spec):
+    """Raise ValueError naming the target and field if a target definition is malformed"""
+    if not isinstance(spec, dict):
+        raise ValueError(f"a target must be an object, not {spec!r}")
+    name = spec.get("name")
+    if not isinstance(name, str) or not name:
+        raise ValueError(f"target without a name: {spec!r}")
+    for field, kind in TARGET_FIELDS.items():
+        if field not in spec:
+            continue
+        value = spec[field]
+        if kind == "strings":
+            # A bare string would be read one character at a time
+            valid = isinstance(value, (list, tuple)) and all(isinstance(item, str) for item in value)
+            expected = "a list of strings"
+        elif kind == "number":
+            valid = isinstance(value, (int, float)) and not isinstance(value, bool) and value >= 0
+            expected = "a number of at least 0"
+        else:
+            valid = isinstance(value, kind)
+            expected = "true or false" if kind is bool else "a string"
+        if not valid:
+            raise ValueError(f"{name}: {field} must be {expected}, not {value!r}")
+
+
+class TargetRule:
+    """A filesystem target compiled from its declarative definition"""
+    
+    def __init__(self, spec):
+        check_target_spec(spec)
+        self.name = spec["name"]
+        self.status = spec.get("status", f"Cleaning {self.name}...")
+        self.message = spec.get("message", f"🧹 Cleaning {self.name}")
+        self.paths = tuple(spec.get("paths", ()))
+        self.recursive = spec.get("recursive", True)
+        self.remove_dirs = spec.get("remove_dirs", False)
+        self.discover = spec.get("discover")
+        if self.discover not in (None,) + DISCOVERY_SOURCES:
+            raise ValueError(f"{self.name}: unknown discover source {self.discover!r}")
+        self.min_size = spec.get("min_size", 0)
+        self.min_age = spec.get("min_age_days", 0) * 86400
+        self.extensions = frozenset("." + ext.lower().lstrip(".") for ext in spec.get("extensions", ()))
+        self.include = GlobSet(spec["include"]) if spec.get("include") else None
+        self.exclude = GlobSet(spec["exclude"]) if spec.get("exclude") else None
+        self.needs_path = any(globs is not None and globs.path_regex is not None
+                              for globs in (self.include, self.exclude))
+        self.match_all = not (self.include or self.exclude or self.extensions
+                              or self.min_size or self.min_age)
+        self.refresh()
+    
+    def refresh(self, now_ns=None):
+        """Move the min_age_days cutoff to now; called as each run starts"""
+        self.max_mtime_ns = (now_ns or time.time_ns()) - int(self.min_age * 10**9)
+    
+    def matches(self, name, size, mtime_ns, relpath=None):
+        """Check a file against the filters of this target"""
+        if self.match_all:
+            return True
+        if size < self.min_size or mtime_ns > self.max_mtime_ns:
+            return False
+        if self.extensions:
+            dot = name.rfind(".")
+            if dot < 0 or name[dot:].lower() not in self.extensions:
+                return False
+        if self.include and not self.include.match(name, relpath):
+            return False
+        return not (self.exclude and self.exclude.match(name, relpath))
+    
+    def filter(self, entries, root):
+        """Keep the (path, size, mtime_ns) entries below root that match"""
+        if self.match_all:
+            yield from entries
+            return
+        skip = len(root.rstrip("\\/")) + 1
+        for entry in entries:
+            path = entry[0]
+            name = path[path.rfind(os.sep) + 1:]
+            if self.matches(name, entry[1], entry[2], path[skip:] if self.needs_path else None):
+                yield entry
+
+
+def load_target_rules(path=None):
+    """Compile the default targets plus those from the user targets file"""
+    specs = {spec["name"]: spec for spec in DEFAULT_TARGETS}
+    path = path or TARGETS_FILE
+    if os.path.isfile(path):
+        with open(path, "rb") as f:
+            if path.endswith(".toml"):
+                import tomllib
+                user_specs = tomllib.load(f).get("targets", [])
+            else:
+                user_specs = json.load(f)
+        if not isinstance(user_specs, list):
+            raise ValueError(f"{path}: expected a list of targets")
+        for spec in user_specs:
+            check_target_spec(spec)
+            if spec.get("enabled", True):
+                specs[spec["name"]] = {**specs.get(spec["name"], {}), **spec}
+            else:
+                specs.pop(spec["name"], None)
+    return {name: TargetRule(spec) for name, spec in specs.items()}
+
+
+def generate_fixture(root, scale=1.0, seed=0):
+    """Build a realistic tree of cleanable files under a fixture root
+    
+    Small files get real content; large ones (dumps, thumbnail databases)
+    are sparse so the tree is cheap to build. Files get random ages of up
+    to 90 days. Returns (files, bytes) created.
+    """
+    import random
+    rng = random.Random(seed)
+    resolver = PathResolver(root, FIXTURE_ENV)
+    now = time.time()
+    # (template, folders, files per folder, min size, max size, name format)
+    layout = (
+        (r"%TEMP%", 40, 50, 512, 256 * 1024, "tmp{:05d}.tmp"),
+        (r"C:\Windows\Temp", 10, 50, 512, 64 * 1024, "log{:05d}.tmp"),
+        (r"%LOCALAPPDATA%\Google\Chrome\User Data\Default\Cache\Cache_Data", 1, 10000, 256, 16 * 1024, "f_{:06x}"),
+        (r"%LOCALAPPDATA%\Google\Chrome\User Data\Default\Code Cache\js", 1, 2000, 256, 64 * 1024, "{:016x}_0"),
+        (r"%LOCALAPPDATA%\Google\Chrome\User Data\Profile 1\Cache\Cache_Data", 1, 3000, 256, 16 * 1024, "f_{:06x}"),
+        (r"%LOCALAPPDATA%\Google\Chrome\User Data\Profile 1\GPUCache", 0, 5, 4 * 1024, 256 * 1024, "data_{}"),
+        (r"%LOCALAPPDATA%\Microsoft\Edge\User Data\Default\Cache\Cache_Data", 1, 5000, 256, 16 * 1024, "f_{:06x}"),
+        (r"%LOCALAPPDATA%\Microsoft\Edge\User Data\Default\Service Worker\CacheStorage\a1b2", 1, 500, 256, 64 * 1024, "{:08x}_0"),
+        (r"%LOCALAPPDATA%\BraveSoftware\Brave-Browser\User Data\Default\Cache\Cache_Data", 1, 1000, 256, 16 * 1024, "f_{:06x}"),
+        (r"%LOCALAPPDATA%\Mozilla\Firefox\Profiles\x1y2z3.default-release\cache2\entries", 1, 5000, 256, 32 * 1024, "{:040X}"),
+        (r"C:\ProgramData\Microsoft\Windows\WER\ReportArchive", 50, 2, 64 * 1024 * 1024, 256 * 1024 * 1024, "memory{:03d}.hdmp"),
+        (r"%LOCALAPPDATA%\Microsoft\Windows\Explorer", 0, 12, 8 * 1024 * 1024, 64 * 1024 * 1024, "thumbcache_{}.db"),
+        (r"%LOCALAPPDATA%\Microsoft\Windows\WebCache", 0, 10, 1024 * 1024, 32 * 1024 * 1024, "V01{:05d}.log"),
+        (r"C:\Windows\Prefetch", 0, 300, 10 * 1024, 100 * 1024, "APP{:04d}-1A2B3C4D.pf"),
+        (r"C:\Windows\Logs\CBS", 0, 100, 1024, 4 * 1024 * 1024, "CbsPersist_{:05d}.log"),
+        (r"C:\Windows\Panther", 0, 30, 1024, 2 * 1024 * 1024, "setupact{:03d}.log"),
+        (r"C:\Windows\Minidump", 0, 20, 256 * 1024, 2 * 1024 * 1024, "{:06d}-01.dmp"),
+        (r"C:\Windows\ServiceProfiles\LocalService\AppData\Local\FontCache", 0, 20, 64 * 1024, 8 * 1024 * 1024, "~FontCache-{}.dat"),
+        (r"%APPDATA%\Microsoft\Windows\Recent", 0, 200, 512, 2048, "document{:04d}.lnk"),
+    )
+    total_files = 0
+    total_bytes = 0
+    
+    def make_file(path, size):
+        with open(path, "wb") as f:
+            if size > 64 * 1024:
+                f.truncate(size)
+            else:
+                f.write(os.urandom(size) if size < 1024 else bytes(size))
+        age = rng.uniform(0, 90 * 86400)
+        os.utime(path, (now - age, now - age))
+    
+    for template, folders, files, min_size, max_size, name in layout:
+        base = resolver.resolve(template)[0]
+        count = max(1, int(files * scale))
+        for folder in range(max(1, int(folders * scale)) if folders else 1):
+            path = os.path.join(base, f"{folder:04d}") if folders else base
+            os.makedirs(path, exist_ok=True)
+            for number in range(count):
+                size = rng.randint(min_size, max_size)
+                make_file(os.path.join(path, name.format(number)), size)
+                total_files += 1
+                total_bytes += size
+    # Profile lists read by BrowserProfiles
+    profiles = {
+        "Google\\Chrome": ("Default", "Profile 1"),
+        "Microsoft\\Edge": ("Default",),
+        "BraveSoftware\\Brave-Browser": ("Default",),
+    }
+    for browser, names in profiles.items():
+        local_state = resolver.resolve(f"%LOCALAPPDATA%\\{browser}\\User Data\\Local State")[0]
+        with open(local_state, "w", encoding="utf-8") as f:
+            json.dump({"profile": {"info_cache": {name: {"name": name} for name in names}}}, f)
+    profiles_ini = resolver.resolve(r"%APPDATA%\Mozilla\Firefox\profiles.ini")[0]
+    os.makedirs(os.path.dirname(profiles_ini), exist_ok=True)
+    with open(profiles_ini, "w", encoding="utf-8") as f:
+        f.write("[Profile0]\nName=default-release\nIsRelative=1\n"
+                "Path=Profiles/x1y2z3.default-release\nDefault=1\n")
+    memory_dump = resolver.resolve(r"C:\Windows\MEMORY.DMP")[0]
+    make_file(memory_dump, 1024 * 1024 * 1024)
+    return total_files + 1, total_bytes + 1024 * 1024 * 1024
+
+
+# =============================================================================
+# SCAN PLANNING
+# =============================================================================
+
+class ClaimSet:
+    """Several targets claiming files in one folder, walked only once
+    
+    Used in place of a TargetRule for the walk. claims are (rule, path)
+    pairs at or below root, in the order they are offered each file: the
+    deepest path first, then rules with filters before catch-all ones, then
+    declaration order. matches() returns True for files of the owner (the
+    target walking the folder), the name of the target a file is credited
+    to, or None for files no claim wants.
+    """
+    
+    match_all = False
+    needs_path = True
+    
+    def __init__(self, root, owner, claims):
+        self.root = root
+        self.owner = owner
+        self.recursive = any(rule.recursive for rule, _ in claims)
+        self.remove_dirs = owner.remove_dirs
+        self.claims = []
+        for rule, path in claims:
+            prefix = path[len(root.rstrip(os.sep)) + 1:] + os.sep if path != root else ""
+            self.claims.append((prefix, rule, True if rule is owner else rule.name))
+    
+    def matches(self, name, size, mtime_ns, relpath=None):
+        """Get the claim on a file; relpath is None when root is the file"""
+        for prefix, rule, claim in self.claims:
+            if not prefix:
+                rel = relpath
+            elif relpath is None:
+                continue
+            elif relpath.startswith(prefix):
+                rel = relpath[len(prefix):]
+            elif relpath == prefix[:-1]:
+                # The claimed path is this file
+                rel = None
+            else:
+                continue
+            if rel is not None and not rule.recursive and os.sep in rel:
+                continue
+            if rule.matches(name, size, mtime_ns, rel if rule.needs_path else None):
+                return claim
+        return None
+    
+    def split(self, entries, root):
+        """Group the (path, size, mtime_ns) entries below root by claim"""
+        skip = len(root.rstrip("\\/")) + 1
+        groups = {}
+        for entry in entries:
+            path = entry[0]
+            claim = self.matches(path[path.rfind(os.sep) + 1:], entry[1], entry[2], path[skip:])
+            if claim:
+                groups.setdefault(claim, []).append(entry)
+        return groups
+
+
+class ScanPlan:
+    """The folders to walk for a set of targets, each walked once
+    
+    Target paths are canonicalized (symlinks resolved, case folded where
+    the filesystem ignores case). Exact duplicates are dropped, and a path
+    at or below a folder that is already walked recursively joins that walk
+    as a claim of a ClaimSet instead of being walked again. Targets with
+    files found by another target's walk are listed in guests.
+    """
+    
+    def __init__(self, targets=()):
+        """Plan the walks of (rule, paths) pairs in declaration order"""
+        entries = []
+        seen = set()
+        self.paths_listed = 0
+        for order, (rule, paths) in enumerate(targets):
+            for path in paths:
+                self.paths_listed += 1
+                real = os.path.realpath(path)
+                key = os.path.normcase(real)
+                if (key, rule.name) not in seen:
+                    seen.add((key, rule.name))
+                    entries.append((key, order, real, rule))
+        # Parents sort before their children, equal paths by declaration
+        entries.sort(key=lambda entry: (entry[0].split(os.sep), entry[1]))
+        groups = []
+        for entry in entries:
+            key = entry[0]
+            for group in groups:
+                if any(key == claim_key or (rule.recursive and key.startswith(claim_key.rstrip(os.sep) + os.sep))
+                       for claim_key, _, _, rule in group):
+                    group.append(entry)
+                    break
+            else:
+                groups.append([entry])
+        self.walks = len(groups)
+        self.roots = {}
+        self.guests = set()
+        for group in groups:
+            root_key, _, root, _ = group[0]
+            at_root = [rule for key, _, _, rule in group if key == root_key]
+            owner = next((rule for rule in at_root if rule.recursive), at_root[0])
+            if all(rule is owner for _, _, _, rule in group):
+                rule = owner
+            else:
+                group.sort(key=lambda entry: (-len(entry[0]), entry[3].match_all, entry[1]))
+                rule = ClaimSet(root, owner, [(rule, path) for _, _, path, rule in group])
+                self.guests.update(rule.name for _, _, _, rule in group if rule is not owner)
+            self.roots.setdefault(owner.name, []).append((root, rule))
+    
+    def paths(self, name):
+        """Get the (path, rule or ClaimSet) walks of a target"""
+        return self.roots.get(name, [])
+
+
+# =============================================================================
+# BROWSER PROFILES
+# =============================================================================
+
+# Chromium-family browsers: the user data folder holding Local State, the
+# folder their profiles keep caches in when it differs, and the profiles
+# assumed when Local State lists none
+CHROMIUM_BROWSERS = {
+    "chrome": (r"%LOCALAPPDATA%\Google\Chrome\User Data", None, ("Default",)),
+    "edge": (r"%LOCALAPPDATA%\Microsoft\Edge\User Data", None, ("Default",)),
+    "brave": (r"%LOCALAPPDATA%\BraveSoftware\Brave-Browser\User Data", None, ("Default",)),
+    "vivaldi": (r"%LOCALAPPDATA%\Vivaldi\User Data", None, ("Default",)),
+    "opera": (r"%APPDATA%\Opera Software\Opera Stable",
+              r"%LOCALAPPDATA%\Opera Software\Opera Stable", ("",)),
+}
+
+# Cache folders inside each Chromium profile
+CHROMIUM_CACHE_DIRS = ("Cache", "Code Cache", "GPUCache", r"Service Worker\CacheStorage")
+
+# Firefox lists its profiles in the roaming folder and keeps their caches
+# under the same relative path in the local one
+FIREFOX_ROAMING = r"%APPDATA%\Mozilla\Firefox"
+FIREFOX_LOCAL = r"%LOCALAPPDATA%\Mozilla\Firefox"
+FIREFOX_CACHE_DIRS = ("cache2", "startupCache")
+
+BROWSER_INDEX_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fresher_browsers.json")
+
+
+def chromium_profiles(path):
+    """Profile folder names listed in a Chromium Local State file"""
+    with open(path, encoding="utf-8") as f:
+        state = json.load(f)
+    return sorted(state.get("profile", {}).get("info_cache", {}))
+
+
+def firefox_profiles(path):
+    """[path, is_relative] of each profile in a Firefox profiles.ini"""
+    import configparser
+    parser = configparser.RawConfigParser()
+    try:
+        with open(path, encoding="utf-8") as f:
+            parser.read_file(f)
+    except configparser.Error as e:
+        raise ValueError(str(e))
+    return [[section["path"], section.get("isrelative", "1") == "1"]
+            for name, section in parser.items()
+            if name.lower().startswith("profile") and "path" in section]
+
+
+class BrowserProfiles:
+    """Cache folders of every Chromium-family and Firefox profile
+    
+    Profiles are read from each browser's Local State or profiles.ini. The
+    lists are kept in a small JSON index together with the mtime of the
+    file they came from, so discovery costs one stat per supported browser
+    however many are installed, and a file is parsed again only after the
+    browser has changed it.
+    """
+    
+    def __init__(self, resolver, path=BROWSER_INDEX_FILE):
+        self.resolver = resolver
+        self.path = path
+        self.parsed = 0
+        self._dirty = False
+        self._lock = threading.Lock()
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._index = json.load(f)
+        except (OSError, ValueError):
+            self._index = {}
+    
+    def cache_dirs(self):
+        """Get the resolved cache folders of every profile found"""
+        templates = []
+        with self._lock:
+            for user_data, cache_root, defaults in CHROMIUM_BROWSERS.values():
+                profiles = self._profiles(user_data + r"\Local State", chromium_profiles)
+                if profiles is None:
+                    continue
+                root = cache_root or user_data
+                for profile in dict.fromkeys([*defaults, *profiles]):
+                    base = f"{root}\\{profile}" if profile else root
+                    templates += [f"{base}\\{name}" for name in CHROMIUM_CACHE_DIRS]
+            for path, relative in self._profiles(FIREFOX_ROAMING + r"\profiles.ini", firefox_profiles) or ():
+                if relative:
+                    base = FIREFOX_LOCAL + "\\" + path.replace("/", "\\")
+                elif self.resolver.root:
+                    # An absolute path would point outside the fixture
+                    continue
+                else:
+                    base = path
+                templates += [f"{base}\\{name}" for name in FIREFOX_CACHE_DIRS]
+            self.save()
+        return self.resolver.paths(templates)
+    
+    def save(self):
+        """Write the profile index if it changed"""
+        if not self._dirty:
+            return
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._index, f, ensure_ascii=False)
+            self._dirty = False
+        except OSError:
+            pass
+    
+    def _profiles(self, template, parse):
+        paths = self.resolver.resolve(template)
+        if not paths:
+            return None
+        path = paths[0]
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+        except OSError:
+            return None
+        record = self._index.get(path)
+        if record is not None and record["mtime_ns"] == mtime_ns:
+            return record["profiles"]
+        try:
+            profiles = parse(path)
+        except (OSError, ValueError, KeyError, AttributeError):
+            profiles = []
+        self.parsed += 1
+        self._index[path] = {"mtime_ns": mtime_ns, "profiles": profiles}
+        self._dirty = True
+        return profiles
+
+
+# =============================================================================
+# CANCELLATION
+# =============================================================================
+
+class CleaningCancelled(BaseException):
+    """Raised inside a run once it has been cancelled
+    
+    Like KeyboardInterrupt this is not an Exception, so the error handlers
+    around single files and targets let it through.
+    """
+
+
+class CancelToken:
+    """Cooperative cancel and pause flag shared by every cleaning thread
+    
+    Loops read the plain interrupted attribute for each file and only call
+    check() when it is set, which blocks while paused and raises
+    CleaningCancelled once cancelled.
+    """
+    
+    def __init__(self):
+        self.interrupted = False
+        self._cancelled = threading.Event()
+        self._resumed = threading.Event()
+        self._resumed.set()
+    
+    @property
+    def cancelled(self):
+        """Whether the run has been cancelled"""
+        return self._cancelled.is_set()
+    
+    @property
+    def paused(self):
+        """Whether the run is paused"""
+        return not self._resumed.is_set()
+    
+    def sleep(self, seconds):
+        """Wait for seconds, raising CleaningCancelled if cancelled meanwhile"""
+        if self._cancelled.wait(seconds):
+            raise CleaningCancelled()
+    
+    def cancel(self):
+        """Cancel the run, waking any paused threads"""
+        self._cancelled.set()
+        self._resumed.set()
+        self.interrupted = True
+    
+    def pause(self):
+        """Hold every thread at its next check"""
+        if not self.cancelled:
+            self._resumed.clear()
+            self.interrupted = True
+    
+    def resume(self):
+        """Let paused threads continue"""
+        self._resumed.set()
+        self.interrupted = self.cancelled
+    
+    def check(self):
+        """Wait while paused and raise CleaningCancelled once cancelled"""
+        self._resumed.wait()
+        if self._cancelled.is_set():
+            raise CleaningCancelled()
+
+
+# =============================================================================
+# SCAN ENGINE
+# =============================================================================
+
+def scan_files(path, recursive=True, token=None):
+    """Stream file entries under path in a single scandir pass"""
+    stack = [path]
+    while stack:
+        current = stack.pop()
+        try:
+            with os.scandir(current) as entries:
+                for entry in entries:
+                    if token is not None and token.interrupted:
+                        token.check()
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if recursive:
+                                stack.append(entry.path)
+                        else:
+                            yield entry
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+
+
+def entry_size(entry):
+    """Get file size in bytes from the stat cached on a DirEntry"""
+    try:
+        return entry.stat(follow_symlinks=False).st_size
+    except OSError:
+        return 0
+
+
+def scan_file_stats(path, recursive=True, token=None, stats=None):
+    """Stream (path, size, mtime_ns) for every file under path
+    
+    Files seen and stat calls made are added to stats (a TargetStats).
+    """
+    for entry in scan_files(path, recursive, token):
+        if stats is not None:
+            stats.files_scanned += 1
+            stats.stat_calls += 1
+        try:
+            st = entry.stat(follow_symlinks=False)
+        except OSError:
+            continue
+        yield entry.path, st.st_size, st.st_mtime_ns
+
+
+# =============================================================================
+# SCAN CACHE
+# =============================================================================
+
+SCAN_CACHE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fresher_scan_cache.db")
+
+
+class ScanCache:
+    """Persistent per-directory listing cache keyed by directory mtime
+    
+    A directory whose mtime has not changed still holds the same names, so
+    its listing is served from the cache and only changed directories are
+    read again with scandir. Only names are kept: writing to a file in place
+    leaves its directory's mtime alone, so files from a cached listing are
+    stat'ed again for their size and mtime. Directories are still visited
+    one stat each, because a change deep in a tree does not touch the mtime
+    of its parents. When the cache holds more than max_files file names,
+    the directories used least recently are evicted on save().
+    """
+    
+    # Directories modified this recently may still be changing within the
+    # same mtime tick, so their listing is not cached
+    SETTLE_NS = 2 * 10**9
+    
+    def __init__(self, path=SCAN_CACHE_FILE, max_files=500000):
+        self.path = path
+        self.max_files = max_files
+        self.hits = 0
+        self.misses = 0
+        self._dirs = {}
+        self._dirty = set()
+        self._touched = set()
+        self._stamp = time.time()
+        self._lock = threading.Lock()
+        self._conn = None
+        import sqlite3
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            with self._conn:
+                # Listings of earlier versions held file sizes, which go stale
+                self._conn.execute("DROP TABLE IF EXISTS dirs")
+                self._conn.execute("CREATE TABLE IF NOT EXISTS listings ("
+                                   "path TEXT PRIMARY KEY, mtime_ns INTEGER, "
+                                   "files TEXT, subdirs TEXT, last_used REAL)")
+            for row in self._conn.execute("SELECT path, mtime_ns, files, subdirs, last_used FROM listings"):
+                self._dirs[row[0]] = [row[1], json.loads(row[2]), json.loads(row[3]), row[4]]
+        except (sqlite3.Error, ValueError):
+            self._conn = None
+            self._dirs = {}
+    
+    def scan(self, root, recursive=True, token=None, stats=None):
+        """Stream (path, size, mtime_ns) for every file under root
+        
+        Files seen and stat calls made are added to stats (a TargetStats).
+        """
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            if stats is not None:
+                stats.stat_calls += 1
+            try:
+                mtime_ns = os.stat(path).st_mtime_ns
+            except OSError:
+                continue
+            record = self._dirs.get(path)
+            if record is None or record[0] != mtime_ns:
+                listed = self._read_dir(path, mtime_ns, token)
+                if listed is None:
+                    continue
+                record, files = listed
+                self.misses += 1
+            else:
+                files = self._stat_files(path, record[1])
+                self.hits += 1
+            record[3] = self._stamp
+            self._touched.add(path)
+            if token is not None and token.interrupted:
+                token.check()
+            if stats is not None:
+                stats.files_scanned += len(record[1])
+                stats.stat_calls += len(record[1])
+            yield from files
+            if recursive:
+                stack.extend(os.path.join(path, name) for name in record[2])
+    
+    @staticmethod
+    def _stat_files(path, names):
+        for name in names:
+            file_path = os.path.join(path, name)
+            try:
+                st = os.stat(file_path, follow_symlinks=False)
+            except OSError:
+                continue
+            yield file_path, st.st_size, st.st_mtime_ns
+    
+    def _read_dir(self, path, mtime_ns, token=None):
+        """Return ([mtime_ns, names, subdirs, last_used], files) for path, or None"""
+        files = []
+        subdirs = []
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if token is not None and token.interrupted:
+                        token.check()
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            st = entry.stat(follow_symlinks=False)
+                            files.append((entry.path, st.st_size, st.st_mtime_ns))
+                    except OSError:
+                        pass
+        except OSError:
+            return None
+        record = [mtime_ns, [os.path.basename(file[0]) for file in files], subdirs, self._stamp]
+        if time.time_ns() - mtime_ns > self.SETTLE_NS:
+            self._dirs[path] = record
+            self._dirty.add(path)
+        else:
+            self._dirs.pop(path, None)
+        return record, files
+    
+    def save(self):
+        """Write changed directories to disk and evict the least recently used"""
+        if self._conn is None:
+            return
+        import sqlite3
+        with self._lock:
+            evicted = []
+            total = sum(len(record[1]) for record in self._dirs.values())
+            if total > self.max_files:
+                for path in sorted(self._dirs, key=lambda p: self._dirs[p][3]):
+                    total -= len(self._dirs.pop(path)[1])
+                    evicted.append((path,))
+                    if total <= self.max_files:
+                        break
+            dirty = [(path, record[0], json.dumps(record[1]), json.dumps(record[2]), record[3])
+                     for path, record in ((p, self._dirs.get(p)) for p in self._dirty) if record]
+            touched = [(self._stamp, path) for path in self._touched - self._dirty if path in self._dirs]
+            try:
+                with self._conn:
+                    self._conn.executemany("INSERT OR REPLACE INTO listings VALUES (?, ?, ?, ?, ?)", dirty)
+                    self._conn.executemany("UPDATE listings SET last_used = ? WHERE path = ?", touched)
+                    self._conn.executemany("DELETE FROM listings WHERE path = ?", evicted)
+            except sqlite3.Error:
+                pass
+            self._dirty.clear()
+            self._touched.clear()
+    
+    def close(self):
+        """Save and close the cache file"""
+        self.save()
+        if self._conn is not None:
+            self._conn.close()
+            self._conn = None
+
+
+# =============================================================================
+# DELETE FAILURES
+# =============================================================================
+
+# Why a file could not be deleted: held open by another process, access
+# denied, already gone, anything else, or skipped as known to stay locked
+FAILURE_KINDS = ("in_use", "permission", "vanished", "other", "known_locked")
+
+# Windows errors for a file another process holds open
+# (ERROR_SHARING_VIOLATION, ERROR_LOCK_VIOLATION)
+SHARING_VIOLATIONS = (32, 33)
+
+# Rounds of retries for files in use at the end of a run; the wait before
+# each round doubles
+RETRY_ROUNDS = 3
+RETRY_DELAY = 0.25
+
+LOCKED_PATHS_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fresher_locked.json")
+
+
+def classify_failure(error):
+    """Sort an OSError from a delete into one of FAILURE_KINDS"""
+    if isinstance(error, FileNotFoundError):
+        return "vanished"
+    if getattr(error, "winerror", None) in SHARING_VIOLATIONS or error.errno in (errno.EBUSY, errno.ETXTBSY):
+        return "in_use"
+    if isinstance(error, PermissionError):
+        return "permission"
+    return "other"
+
+
+class LockedPaths:
+    """Files that stayed in use through the retries of several runs
+    
+    Each file still in use after the retry rounds of a run is counted here.
+    Once it has failed in min_runs runs, scans skip it for recheck_days
+    instead of paying for a failing delete every time; after that it is
+    tried again. Entries of files that are gone are dropped on save().
+    """
+    
+    def __init__(self, path=LOCKED_PATHS_FILE, min_runs=3, recheck_days=7):
+        self.path = path
+        self.min_runs = min_runs
+        self.recheck = recheck_days * 86400
+        try:
+            with open(path, encoding="utf-8") as f:
+                self._paths = json.load(f)
+        except (OSError, ValueError):
+            self._paths = {}
+    
+    def skip_set(self):
+        """Get the paths scans should skip this run"""
+        now = time.time()
+        return {path for path, (runs, last) in self._paths.items()
+                if runs >= self.min_runs and now - last < self.recheck}
+    
+    def failed(self, paths):
+        """Count one more failed run for each path"""
+        now = time.time()
+        for path in set(paths):
+            runs = self._paths.get(path, (0, 0))[0]
+            self._paths[path] = [runs + 1, now]
+    
+    def save(self):
+        """Drop files that are gone and write the list"""
+        self._paths = {path: record for path, record in self._paths.items() if os.path.lexists(path)}
+        try:
+            with open(self.path, "w", encoding="utf-8") as f:
+                json.dump(self._paths, f, ensure_ascii=False)
+        except OSError:
+            pass
+
+
+# =============================================================================
+# PARALLEL DELETION
+# =============================================================================
+
+# Listed entries handed to a deletion worker at a time
+DELETE_BATCH = 512
+
+
+class DeletionJob:
+    """Totals and completion state of one tree submitted to a DeletionPool"""
+    
+    def __init__(self, root, on_progress=None, on_file=None, rule=None, token=None, skip=None,
+                 base=None, recursive=None):
+        self.root = root
+        # Folder the paths given to the rule are relative to
+        self.base = base or root
+        self.on_progress = on_progress
+        self.on_file = on_file
+        self.token = token
+        self.skip = skip
+        self.rule = None if rule is None or rule.match_all else rule
+        self.recursive = (rule is None or rule.recursive) if recursive is None else recursive
+        self.remove_dirs = rule is not None and rule.remove_dirs and self.recursive
+        self.freed_bytes = 0
+        self.files_deleted = 0
+        self.files_scanned = 0
+        self.dirs_removed = 0
+        # Listed (path, size, mtime_ns) entries to delete instead of a tree,
+        # and how many of them changed or vanished since they were listed
+        self.entries = None
+        self.verify = True
+        self.changed = 0
+        # Files and bytes of the totals credited to other targets by a ClaimSet
+        self.claimed = {}
+        self.failures = dict.fromkeys(FAILURE_KINDS, 0)
+        # Failures of files a ClaimSet credits to other targets, per target
+        self.claimed_failures = {}
+        # (path, size, target) of files in use, for a later retry; target is
+        # None for the walking target's own files
+        self.locked = []
+        self.finished_at = None
+        self.pending = 1
+        # With remove_dirs: subdirectories still being processed below each
+        # directory, and the parent of each queued directory
+        self.children = {}
+        self.parents = {}
+        # First exception raised by on_progress or on_file; the rest of the
+        # job is skipped and wait() raises it
+        self.error = None
+        self.done = threading.Event()
+        self.lock = threading.Lock()
+    
+    def wait(self):
+        """Block until every directory of the tree has been processed"""
+        self.done.wait()
+        if self.error is not None:
+            raise self.error
+        return self
+
+
+class DeletionPool:
+    """Delete the files of directory trees with a pool of worker threads
+    
+    Every directory is a unit of work on a shared LIFO queue. A worker
+    scans one directory, unlinks its files and queues the subdirectories it
+    found, so idle workers pick up parts of a large tree as soon as they are
+    discovered. Totals are added to the job once per directory.
+    
+    Jobs with remove_dirs remove the subtrees below the root as well,
+    bottom-up from the same scandir results: when the last subdirectory of
+    a directory is done the directory is removed in turn. A directory that
+    still holds a file in use (or one the rule kept) stays, along with its
+    parents, and the root itself is always kept.
+    """
+    
+    def __init__(self, workers=4):
+        # With 0 workers trees are deleted on the submitting thread
+        self.workers = max(0, workers)
+        self._queue = queue.LifoQueue()
+        self._threads = []
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the worker threads if they are not running yet"""
+        with self._lock:
+            while len(self._threads) < self.workers:
+                thread = threading.Thread(target=self._worker, daemon=True)
+                thread.start()
+                self._threads.append(thread)
+    
+    def submit(self, root, on_progress=None, on_file=None, rule=None, token=None, skip=None,
+               base=None, recursive=None):
+        """Queue a tree for deletion and return its job
+        
+        on_progress(files, bytes) is called after each directory and
+        on_file(path, size) after each deleted file. Only files matching
+        rule (a TargetRule) are deleted, and paths in skip are left alone.
+        Workers hold while token is paused; once it is cancelled they stop
+        after the current file and the job completes with the totals
+        deleted so far. Files that fail are counted per FAILURE_KINDS in
+        job.failures, and those in use are listed in job.locked. If
+        on_progress or on_file raises, the rest of the job is skipped and
+        job.wait() raises that error.
+        
+        rule may be a ClaimSet; files it credits to another target are
+        totalled per target in job.claimed (failures in
+        job.claimed_failures) and passed to on_file(path, size, target).
+        To clean part of a target, pass the target folder as base (path
+        rules match below it) and recursive=False to stay in root.
+        """
+        job = DeletionJob(root, on_progress, on_file, rule, token, skip, base, recursive)
+        if not self.workers:
+            stack = [root]
+            while stack:
+                stack.extend(self._run_unit(job, stack.pop()))
+            return job
+        self.start()
+        self._queue.put((job, root))
+        return job
+    
+    def submit_entries(self, entries, on_progress=None, on_file=None, token=None, skip=None, verify=True):
+        """Queue a batch of listed (path, size, mtime_ns) entries for deletion
+        
+        For files found by an earlier scan, so nothing is listed again.
+        Each file is stat'ed again first and its bytes are counted from that
+        stat. With verify it is deleted only if its size and mtime still
+        match the entry; files that changed or vanished are counted in
+        job.changed. Otherwise this works like submit().
+        """
+        job = DeletionJob(None, on_progress, on_file, token=token, skip=skip)
+        job.entries = entries
+        job.verify = verify
+        if not self.workers:
+            self._run_unit(job, None)
+            return job
+        self.start()
+        self._queue.put((job, None))
+        return job
+    
+    def clean(self, root, on_progress=None, on_file=None, rule=None, token=None, skip=None):
+        """Delete all files below root and wait for the result"""
+        return self.submit(root, on_progress, on_file, rule, token, skip).wait()
+    
+    def close(self):
+        """Stop the worker threads once the queue is drained"""
+        with self._lock:
+            threads, self._threads = self._threads, []
+        for _ in threads:
+            self._queue.put(None)
+        for thread in threads:
+            thread.join()
+    
+    def _worker(self):
+        while True:
+            unit = self._queue.get()
+            if unit is None:
+                break
+            job = unit[0]
+            for subdir in self._run_unit(*unit):
+                self._queue.put((job, subdir))
+    
+    def _run_unit(self, job, path):
+        """Process one unit of work, completing it even if a callback raises"""
+        if job.error is None:
+            try:
+                return self._process(job, path)
+            except Exception as e:
+                with job.lock:
+                    job.error = job.error or e
+        # The unit still counts as done, so the job completes and wait()
+        # raises the error instead of blocking forever
+        self._add_totals(job, 0, 0, 0, None)
+        return []
+    
+    def _process(self, job, path):
+        """Delete the files of one directory and return its subdirectories"""
+        if path is None:
+            return self._delete_entries(job)
+        rule = job.rule
+        token = job.token
+        skip = job.skip
+        freed = 0
+        deleted = 0
+        scanned = 0
+        subdirs = []
+        failures = None
+        claimed = None
+        size = 0
+        claim = True
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if token is not None and token.interrupted:
+                        try:
+                            token.check()
+                        except CleaningCancelled:
+                            subdirs = []
+                            break
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            if job.recursive:
+                                subdirs.append(entry.path)
+                            continue
+                        scanned += 1
+                        if rule is None:
+                            size = entry_size(entry)
+                        else:
+                            # A file the rule never saw counts for the walking target
+                            claim = True
+                            st = entry.stat(follow_symlinks=False)
+                            size = st.st_size
+                            relpath = entry.path[len(job.base) + 1:] if rule.needs_path else None
+                            claim = rule.matches(entry.name, size, st.st_mtime_ns, relpath)
+                            if not claim:
+                                continue
+                        if skip and entry.path in skip:
+                            failures = failures or []
+                            failures.append(("known_locked", None, 0, claim))
+                            continue
+                        os.remove(entry.path)
+                        freed += size
+                        deleted += 1
+                        if claim is not True:
+                            claimed = claimed or {}
+                            counts = claimed.setdefault(claim, [0, 0])
+                            counts[0] += 1
+                            counts[1] += size
+                            if job.on_file:
+                                job.on_file(entry.path, size, claim)
+                        elif job.on_file:
+                            job.on_file(entry.path, size)
+                    except OSError as e:
+                        failures = failures or []
+                        failures.append((classify_failure(e), entry.path, size, claim))
+        except OSError:
+            pass
+        if job.remove_dirs:
+            if subdirs:
+                with job.lock:
+                    job.children[path] = len(subdirs)
+                    for subdir in subdirs:
+                        job.parents[subdir] = path
+            else:
+                self._remove_empty(job, path)
+        self._add_totals(job, freed, deleted, scanned, failures, claimed, subdirs)
+        return subdirs
+    
+    def _delete_entries(self, job):
+        """Delete the listed entries of a job"""
+        token = job.token
+        skip = job.skip
+        verify = job.verify
+        freed = 0
+        deleted = 0
+        scanned = 0
+        changed = 0
+        failures = None
+        for path, size, mtime_ns in job.entries:
+            if token is not None and token.interrupted:
+                try:
+                    token.check()
+                except CleaningCancelled:
+                    break
+            if skip and path in skip:
+                failures = failures or []
+                failures.append(("known_locked", None, 0, True))
+                continue
+            try:
+                scanned += 1
+                st = os.stat(path, follow_symlinks=False)
+                if verify and (st.st_size != size or st.st_mtime_ns != mtime_ns):
+                    changed += 1
+                    continue
+                size = st.st_size
+                os.remove(path)
+            except FileNotFoundError:
+                changed += 1
+                continue
+            except OSError as e:
+                failures = failures or []
+                failures.append((classify_failure(e), path, size, True))
+                continue
+            freed += size
+            deleted += 1
+            if job.on_file:
+                job.on_file(path, size)
+        job.entries = None
+        self._add_totals(job, freed, deleted, scanned, failures, changed=changed)
+        return []
+    
+    def _add_totals(self, job, freed, deleted, scanned, failures, claimed=None, subdirs=(), changed=0):
+        """Add the totals of one unit of work to its job, completing it after the last"""
+        with job.lock:
+            job.freed_bytes += freed
+            job.files_deleted += deleted
+            job.files_scanned += scanned
+            job.changed += changed
+            for target, (files, nbytes) in (claimed or {}).items():
+                counts = job.claimed.setdefault(target, [0, 0])
+                counts[0] += files
+                counts[1] += nbytes
+            for kind, failed_path, size, claim in failures or ():
+                if claim is True:
+                    job.failures[kind] += 1
+                    claim = None
+                else:
+                    counts = job.claimed_failures.get(claim)
+                    if counts is None:
+                        counts = job.claimed_failures[claim] = dict.fromkeys(FAILURE_KINDS, 0)
+                    counts[kind] += 1
+                if kind == "in_use":
+                    job.locked.append((failed_path, size, claim))
+            job.pending += len(subdirs) - 1
+            finished = job.pending == 0
+        if job.on_progress and deleted:
+            try:
+                job.on_progress(deleted, freed)
+            except Exception as e:
+                with job.lock:
+                    job.error = job.error or e
+        if finished:
+            job.finished_at = time.perf_counter()
+            job.done.set()
+    
+    def _remove_empty(self, job, path):
+        """Remove a finished directory, then each parent it was the last child of"""
+        while path != job.root:
+            try:
+                os.rmdir(path)
+                removed = 1
+            except OSError:
+                removed = 0
+            with job.lock:
+                job.dirs_removed += removed
+                parent = job.parents.pop(path)
+                job.children[parent] -= 1
+                if job.children[parent]:
+                    return
+                del job.children[parent]
+            path = parent
+
+
+def prune_empty_dirs(root, token=None):
+    """Remove the empty directories below root, deepest first; returns how many"""
+    found = []
+    stack = [root]
+    while stack:
+        path = stack.pop()
+        try:
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    if token is not None and token.interrupted:
+                        token.check()
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            stack.append(entry.path)
+                            found.append(entry.path)
+                    except OSError:
+                        pass
+        except OSError:
+            pass
+    removed = 0
+    # Subdirectories are found after their parents, so walking the list
+    # backwards empties every directory before trying to remove it
+    for path in reversed(found):
+        try:
+            os.rmdir(path)
+            removed += 1
+        except OSError:
+            pass
+    return removed
+
+
+# =============================================================================
+# EXTERNAL TOOLS
+# =============================================================================
+
+# Windows tools run by the system targets: argv (no shell) and timeout in
+# seconds, or None to wait until the tool exits
+SYSTEM_COMMANDS = {
+    "flush_dns": (["ipconfig", "/flushdns"], 30),
+    "run_disk_cleanup": (["cleanmgr", "/sagerun:1"], 60),
+    "clean_store_cache": (["wsreset.exe"], 30),
+}
+
+
+class CommandResult:
+    """Outcome of one external command"""
+    
+    def __init__(self, name, argv, timeout=None):
+        self.name = name
+        self.argv = argv
+        self.timeout = timeout
+        self.returncode = None
+        self.duration = 0.0
+        self.timed_out = False
+        self.cancelled = False
+        self.error = None
+    
+    @property
+    def ok(self):
+        """Whether the command ran to completion with exit code 0"""
+        return self.returncode == 0 and not (self.timed_out or self.cancelled or self.error)
+
+
+class CommandRunner:
+    """Run external tools concurrently on one asyncio event loop thread
+    
+    Commands are started directly, without a shell, and their combined
+    stdout and stderr is streamed line by line to on_output(name, line).
+    Each command runs in its own process group, so one that overruns its
+    timeout or is cancelled is killed together with any children it
+    started.
+    """
+    
+    # How often a running command checks its cancel token
+    POLL_SECONDS = 0.02
+    
+    def __init__(self, on_output=None):
+        self.on_output = on_output
+        self._loop = None
+        self._thread = None
+        self._lock = threading.Lock()
+    
+    def start(self):
+        """Start the event loop thread if it is not running yet"""
+        import asyncio
+        with self._lock:
+            if self._loop is None:
+                self._loop = asyncio.new_event_loop()
+                self._thread = threading.Thread(target=self._loop.run_forever, daemon=True)
+                self._thread.start()
+    
+    def submit(self, name, argv, timeout=None, token=None):
+        """Start a command and return a concurrent.futures.Future of its CommandResult"""
+        import asyncio
+        self.start()
+        result = CommandResult(name, list(argv), timeout)
+        return asyncio.run_coroutine_threadsafe(self._run(result, token), self._loop)
+    
+    def run(self, name, argv, timeout=None, token=None):
+        """Run a command and wait for its CommandResult"""
+        return self.submit(name, argv, timeout, token).result()
+    
+    def close(self):
+        """Stop the event loop thread"""
+        with self._lock:
+            loop, self._loop = self._loop, None
+            thread, self._thread = self._thread, None
+        if loop is not None:
+            loop.call_soon_threadsafe(loop.stop)
+            thread.join()
+            loop.close()
+    
+    async def _run(self, result, token):
+        import asyncio
+        start = time.perf_counter()
+        if IS_WINDOWS:
+            group = {"creationflags": 0x00000200}  # CREATE_NEW_PROCESS_GROUP
+        else:
+            group = {"start_new_session": True}
+        try:
+            process = await asyncio.create_subprocess_exec(
+                *result.argv, stdin=asyncio.subprocess.DEVNULL,
+                stdout=asyncio.subprocess.PIPE, stderr=asyncio.subprocess.STDOUT, **group)
+        except OSError as e:
+            result.error = str(e)
+            result.duration = time.perf_counter() - start
+            return result
+        reader = asyncio.ensure_future(self._stream(result.name, process.stdout))
+        waiter = asyncio.ensure_future(process.wait())
+        while not waiter.done():
+            await asyncio.wait({waiter}, timeout=self.POLL_SECONDS)
+            if waiter.done():
+                break
+            if token is not None and token.cancelled:
+                result.cancelled = True
+            elif result.timeout is not None and time.perf_counter() - start > result.timeout:
+                result.timed_out = True
+            else:
+                continue
+            await self._kill_tree(process)
+            await waiter
+        result.returncode = process.returncode
+        try:
+            # Orphaned grandchildren may keep the pipe open after a kill
+            await asyncio.wait_for(reader, 1)
+        except asyncio.TimeoutError:
+            pass
+        result.duration = time.perf_counter() - start
+        return result
+    
+    async def _stream(self, name, stream):
+        encoding = "oem" if IS_WINDOWS else "utf-8"
+        async for line in stream:
+            line = line.decode(encoding, "replace").rstrip()
+            if line and self.on_output:
+                self.on_output(name, line)
+    
+    async def _kill_tree(self, process):
+        import asyncio
+        if IS_WINDOWS:
+            try:
+                killer = await asyncio.create_subprocess_exec(
+                    "taskkill", "/PID", str(process.pid), "/T", "/F",
+                    stdout=asyncio.subprocess.DEVNULL, stderr=asyncio.subprocess.DEVNULL)
+                await killer.wait()
+            except OSError:
+                pass
+        else:
+            import signal
+            try:
+                os.killpg(process.pid, signal.SIGKILL)
+            except OSError:
+                pass
+        try:
+            process.kill()
+        except ProcessLookupError:
+            pass
+
+
+# =============================================================================
+# FILE DISTRIBUTIONS
+# =============================================================================
+
+# Upper bounds of the size histogram buckets, and of the age buckets in days
+SIZE_BUCKETS = (4 * 1024, 64 * 1024, 1024 * 1024, 16 * 1024 * 1024, 256 * 1024 * 1024)
+AGE_BUCKETS = (1, 7, 30, 90)
+PERCENTILES = (50, 90, 99)
+TOP_FILES = 10
+
+
+def format_bytes(size):
+    """Format a byte count with the largest unit that keeps it above 1"""
+    for unit in ("B", "KB", "MB", "GB"):
+        if size < 1024 or unit == "GB":
+            return f"{size:.0f} {unit}" if unit == "B" else f"{size:.1f} {unit}"
+        size /= 1024
+
+
+class FileColumns:
+    """File sizes and ages per category, kept in compact array columns
+    
+    Each category holds two array('q') columns, sizes and mtimes in
+    nanoseconds, so a file costs 16 bytes instead of a tuple of Python
+    objects; only the TOP_FILES largest files of each category keep their
+    path.
+    Reports are computed over whole columns with map/compress/sum and a
+    sort, which run in C without a Python frame per file; a sorted copy of
+    one category's sizes is the only temporary that grows with the files.
+    """
+    
+    def __init__(self):
+        self.columns = {}
+        self.top = {}
+    
+    def add(self, category, entries):
+        """Append (path, size, mtime_ns) entries to the columns of a category"""
+        from array import array
+        from operator import gt, itemgetter
+        from itertools import compress, repeat
+        if not entries:
+            return
+        columns = self.columns.get(category)
+        if columns is None:
+            columns = self.columns[category] = (array("q"), array("q"))
+        sizes, mtimes = columns
+        start = len(sizes)
+        sizes.extend(map(itemgetter(1), entries))
+        mtimes.extend(map(itemgetter(2), entries))
+        top = self.top.get(category, [])
+        smallest = top[-1][0] if len(top) == TOP_FILES else -1
+        larger = list(compress(entries, map(gt, sizes[start:], repeat(smallest))))
+        if larger:
+            import heapq
+            top = heapq.nlargest(TOP_FILES, top + [(entry[1], entry[0]) for entry in larger])
+            self.top[category] = top
+    
+    def __len__(self):
+        return sum(len(sizes) for sizes, _ in self.columns.values())
+    
+    def summary(self, now=None):
+        """Get the distribution of sizes and ages of each category"""
+        from bisect import bisect_left
+        from itertools import compress, islice, repeat
+        from operator import lt
+        now = int(now or time.time())
+        report = {}
+        for category, (sizes, mtimes) in self.columns.items():
+            count = len(sizes)
+            total = sum(sizes)
+            ordered = sorted(sizes)
+            percentiles = {f"p{p}": ordered[min(count - 1, count * p // 100)] for p in PERCENTILES}
+            size_histogram = []
+            start = 0
+            for bound in SIZE_BUCKETS + (None,):
+                end = count if bound is None else bisect_left(ordered, bound)
+                size_histogram.append({"below": bound, "files": end - start,
+                                       "bytes": sum(islice(ordered, start, end))})
+                start = end
+            del ordered
+            age_histogram = []
+            newer_files = newer_bytes = 0
+            for days in AGE_BUCKETS + (None,):
+                if days is None:
+                    files, nbytes = count, total
+                else:
+                    # Files modified after the cutoff are younger than days
+                    cutoff = (now - days * 86400) * 10**9
+                    files = sum(map(lt, repeat(cutoff), mtimes))
+                    nbytes = sum(compress(sizes, map(lt, repeat(cutoff), mtimes)))
+                age_histogram.append({"days": days, "files": files - newer_files,
+                                      "bytes": nbytes - newer_bytes})
+                newer_files, newer_bytes = files, nbytes
+            report[category] = {
+                "files": count,
+                "bytes": total,
+                "size_percentiles": percentiles,
+                "size_histogram": size_histogram,
+                "age_histogram": age_histogram,
+                "top": [{"path": path, "bytes": size} for size, path in self.top.get(category, [])],
+            }
+        return report
+
+
+class ScanStore(FileColumns):
+    """FileColumns that also keep the path of every file
+    
+    Paths are split into directory and name. Each directory string is
+    stored once and referred to by id, and the files a scan lists together
+    from one directory form a run: one id, a count, and their names packed
+    into a single NUL-separated string. Along with the size and mtime
+    columns a file costs 17 bytes plus the length of its name, instead of
+    a tuple holding a full path string. files() rebuilds the entries lazily
+    over memoryviews of the columns, so iterating never copies them.
+    """
+    
+    def __init__(self):
+        super().__init__()
+        # Directory paths by id, each ending in a separator
+        self.dirs = []
+        # Per category: array of directory ids, array of run lengths, names
+        self.runs = {}
+        self._dir_ids = {}
+    
+    def add(self, category, entries):
+        """Append (path, size, mtime_ns) entries to a category"""
+        from array import array
+        if not entries:
+            return
+        super().add(category, entries)
+        runs = self.runs.get(category)
+        if runs is None:
+            runs = self.runs[category] = (array("I"), array("I"), [])
+        run_dirs, run_lengths, run_names = runs
+        names = []
+        last = None
+        for entry in entries:
+            folder, _, name = entry[0].rpartition(os.sep)
+            if folder != last:
+                if names:
+                    run_dirs.append(self._dir_id(last))
+                    run_lengths.append(len(names))
+                    run_names.append("\0".join(names))
+                    names = []
+                last = folder
+            names.append(name)
+        run_dirs.append(self._dir_id(last))
+        run_lengths.append(len(names))
+        run_names.append("\0".join(names))
+    
+    def _dir_id(self, folder):
+        dir_id = self._dir_ids.get(folder)
+        if dir_id is None:
+            dir_id = self._dir_ids[folder] = len(self.dirs)
+            self.dirs.append(folder + os.sep)
+        return dir_id
+    
+    def files(self, category):
+        """Iterate over the (path, size, mtime_ns) entries of a category"""
+        from itertools import repeat
+        from operator import add
+        runs = self.runs.get(category)
+        if runs is None:
+            return
+        sizes, mtimes = (memoryview(column) for column in self.columns[category])
+        dirs = self.dirs
+        start = 0
+        for dir_id, length, names in zip(*runs):
+            end = start + length
+            yield from zip(map(add, repeat(dirs[dir_id]), names.split("\0")),
+                           sizes[start:end], mtimes[start:end])
+            start = end
+
+
+def distribution_line(category, info, age_days=30, small=SIZE_BUCKETS[0]):
+    """One-line summary of a category from FileColumns.summary()"""
+    old = sum(bucket["bytes"] for bucket in info["age_histogram"]
+              if bucket["days"] is None or bucket["days"] > age_days)
+    small_bytes = sum(bucket["bytes"] for bucket in info["size_histogram"]
+                      if bucket["below"] is not None and bucket["below"] <= small)
+    percentiles = info["size_percentiles"]
+    return (f"{category}: {info['files']} files, median {format_bytes(percentiles['p50'])}, "
+            f"p90 {format_bytes(percentiles['p90'])}; {format_bytes(old)} older than {age_days} days, "
+            f"{format_bytes(small_bytes)} in files under {format_bytes(small)}")
+
+
+# =============================================================================
+# PREVIEW INDEX
+# =============================================================================
+
+# Scan entries added to an index at a time
+INDEX_CHUNK = 4096
+
+
+class PreviewIndex:
+    """Candidate files found by a preview, grouped by category
+    
+    Entries go into a ScanStore, keeping the size and mtime seen during
+    the preview so a later clean can skip files that changed in between.
+    With keep_entries=False only the totals and the FileColumns of sizes
+    and ages are kept, which is enough for estimates.
+    """
+    
+    def __init__(self, keep_entries=True):
+        self.keep_entries = keep_entries
+        self.totals = {}
+        self.created = time.time()
+        self.columns = ScanStore() if keep_entries else FileColumns()
+        self._lock = threading.Lock()
+    
+    def add_files(self, category, entries):
+        """Add a list of (path, size, mtime_ns) entries and return it
+        
+        The scan plan walks every folder once and gives each file a single
+        category, so entries are not checked for duplicates.
+        """
+        with self._lock:
+            totals = self.totals.setdefault(category, [0, 0])
+            totals[0] += len(entries)
+            totals[1] += sum(size for _, size, _ in entries)
+            self.columns.add(category, entries)
+        return entries
+    
+    @property
+    def categories(self):
+        """Names of the categories with entries"""
+        return list(self.totals)
+    
+    def files(self, category):
+        """Iterate over the indexed entries of a category"""
+        return self.columns.files(category) if self.keep_entries else iter(())
+    
+    @property
+    def total_files(self):
+        """Number of candidate files"""
+        return sum(files for files, _ in self.totals.values())
+    
+    @property
+    def total_bytes(self):
+        """Reclaimable space in bytes"""
+        return sum(size for _, size in self.totals.values())
+    
+    def summary(self):
+        """Get {category: (files, bytes)} for every category"""
+        return {category: tuple(totals) for category, totals in self.totals.items()}
+
+
+# =============================================================================
+# PROGRESS TRACKING
+# =============================================================================
+
+class ProgressInfo:
+    """Snapshot of cleaning progress passed to progress_callback"""
+    
+    def __init__(self, percent, files_done, files_total, bytes_done, bytes_total, rate, eta):
+        self.percent = percent
+        self.files_done = files_done
+        self.files_total = files_total
+        self.bytes_done = bytes_done
+        self.bytes_total = bytes_total
+        self.rate = rate    # bytes per second, smoothed
+        self.eta = eta      # seconds left, None while unknown
+
+
+class ProgressTracker:
+    """Track files and bytes processed against an estimate
+    
+    The completed fraction is the mean of the file and byte fractions, since
+    deleting many small files costs time per file rather than per byte.
+    Without an estimate it falls back to the share of finished targets. The
+    rate and ETA are exponentially smoothed and the callback is throttled to
+    one report per interval.
+    """
+    
+    def __init__(self, callback, total_files=0, total_bytes=0, total_targets=1,
+                 interval=0.25, smoothing=0.3):
+        self.callback = callback
+        self.total_files = total_files
+        self.total_bytes = total_bytes
+        self.total_targets = max(1, total_targets)
+        self.interval = interval
+        self.smoothing = smoothing
+        self.files_done = 0
+        self.bytes_done = 0
+        self.targets_done = 0
+        self.rate = 0.0
+        self.fraction_rate = 0.0
+        self._last_time = time.perf_counter()
+        self._last_bytes = 0
+        self._last_fraction = 0.0
+        self._lock = threading.Lock()
+    
+    def advance(self, files, nbytes):
+        """Record processed files and bytes"""
+        with self._lock:
+            self.files_done += files
+            self.bytes_done += nbytes
+            info = self._sample(force=False)
+        if info and self.callback:
+            self.callback(info)
+    
+    def complete_target(self):
+        """Record a finished target"""
+        with self._lock:
+            self.targets_done += 1
+            info = self._sample(force=not (self.total_files or self.total_bytes))
+        if info and self.callback:
+            self.callback(info)
+    
+    def finish(self):
+        """Report completion"""
+        with self._lock:
+            self.targets_done = self.total_targets
+            info = self._sample(force=True)
+            info.percent = 100
+            info.eta = 0
+        if self.callback:
+            self.callback(info)
+    
+    def fraction(self):
+        """Completed fraction between 0 and 1"""
+        parts = []
+        if self.total_files:
+            parts.append(min(1.0, self.files_done / self.total_files))
+        if self.total_bytes:
+            parts.append(min(1.0, self.bytes_done / self.total_bytes))
+        if not parts:
+            return min(1.0, self.targets_done / self.total_targets)
+        return sum(parts) / len(parts)
+    
+    def _sample(self, force):
+        now = time.perf_counter()
+        elapsed = now - self._last_time
+        if not force and elapsed < self.interval:
+            return None
+        fraction = self.fraction()
+        if elapsed > 0:
+            alpha = self.smoothing
+            self.rate = alpha * (self.bytes_done - self._last_bytes) / elapsed + (1 - alpha) * self.rate
+            self.fraction_rate = (alpha * (fraction - self._last_fraction) / elapsed
+                                  + (1 - alpha) * self.fraction_rate)
+        self._last_time = now
+        self._last_bytes = self.bytes_done
+        self._last_fraction = fraction
+        eta = (1.0 - fraction) / self.fraction_rate if self.fraction_rate > 0 else None
+        return ProgressInfo(int(fraction * 100), self.files_done, self.total_files,
+                            self.bytes_done, self.total_bytes, self.rate, eta)
+
+
+# =============================================================================
+# TARGET STATISTICS
+# =============================================================================
+
+class TargetStats:
+    """Statistics collected by a single cleaning target"""
+    
+    def __init__(self, name):
+        self.name = name
+        self.freed_bytes = 0
+        self.files_deleted = 0
+        self.errors = []
+        self.elapsed = 0.0
+        self.cancelled = False
+        self.files_scanned = 0
+        self.stat_calls = 0
+        self.dirs_removed = 0
+        self.failures = dict.fromkeys(FAILURE_KINDS, 0)
+    
+    @property
+    def freed_mb(self):
+        """Space freed by this target in MB"""
+        return self.freed_bytes / (1024 * 1024)
+    
+    @property
+    def files_per_second(self):
+        """Files deleted per second of wall time"""
+        return self.files_deleted / self.elapsed if self.elapsed else 0.0
+    
+    @property
+    def mb_per_second(self):
+        """MB freed per second of wall time"""
+        return self.freed_mb / self.elapsed if self.elapsed else 0.0
+    
+    def to_dict(self):
+        """Figures of this target for the run report"""
+        return {
+            "target": self.name,
+            "elapsed": round(self.elapsed, 4),
+            "files_scanned": self.files_scanned,
+            "files_deleted": self.files_deleted,
+            "bytes": self.freed_bytes,
+            "dirs_removed": self.dirs_removed,
+            "stat_calls": self.stat_calls,
+            "errors": len(self.errors),
+            "files_per_second": round(self.files_per_second, 1),
+            "mb_per_second": round(self.mb_per_second, 2),
+            "failures": dict(self.failures),
+            "cancelled": self.cancelled,
+        }
+
+
+class RunTrace:
+    """Timed spans of a run, exported in Chrome trace-event format
+    
+    Targets, the folders they clean, external tools and run phases are
+    recorded as complete ("X") events per thread. Load the file written by
+    write() in chrome://tracing or ui.perfetto.dev for a flame-style view
+    of where a run spent its time.
+    """
+    
+    def __init__(self):
+        self.origin = time.perf_counter()
+        self.events = []
+        self._threads = {}
+        self._lock = threading.Lock()
+    
+    def add(self, name, category, start, end=None, **args):
+        """Record a span between two time.perf_counter() readings"""
+        if end is None:
+            end = time.perf_counter()
+        thread = threading.current_thread()
+        event = {
+            "name": name,
+            "cat": category,
+            "ph": "X",
+            "ts": round((start - self.origin) * 1e6, 1),
+            "dur": round((end - start) * 1e6, 1),
+            "pid": os.getpid(),
+            "tid": thread.ident,
+            "args": args,
+        }
+        with self._lock:
+            self.events.append(event)
+            self._threads.setdefault(thread.ident, thread.name)
+    
+    def to_dict(self):
+        """The trace as a Chrome trace-event document"""
+        with self._lock:
+            names = [{"name": "thread_name", "ph": "M", "pid": os.getpid(), "tid": tid,
+                      "args": {"name": name}} for tid, name in self._threads.items()]
+            return {"traceEvents": names + self.events, "displayTimeUnit": "ms"}
+    
+    def write(self, path):
+        """Write the trace to a JSON file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.to_dict(), f)
+
+
+# =============================================================================
+# PROFILING
+# =============================================================================
+
+PROFILE_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fresher_profile.pstats")
+PROFILE_MODES = ("sample", "cprofile")
+
+
+class SamplingProfiler:
+    """Statistical profiler covering every thread of a run
+    
+    A daemon thread wakes every interval seconds and walks the current
+    stack of each other thread through sys._current_frames(), so the run
+    itself executes no extra code and keeps its concurrency; at the default
+    5ms interval the overhead is low enough for field diagnostics. Threads
+    parked in threading, queue or selectors waits are counted as idle.
+    
+    It mirrors the cProfile.Profile interface used here (enable, disable,
+    create_stats, dump_stats), so pstats reads its output. Call counts in
+    that output are sample counts and times are samples x interval.
+    """
+    
+    IDLE_MODULES = ("threading.py", "queue.py", "selectors.py")
+    
+    def __init__(self, interval=0.005):
+        self.interval = interval
+        self.samples = 0
+        self.idle_samples = 0
+        self.stats = {}
+        self._self_counts = {}
+        self._total_counts = {}
+        self._call_counts = {}
+        self._stop = threading.Event()
+        self._thread = None
+    
+    def enable(self):
+        """Start sampling"""
+        self._stop.clear()
+        self._thread = threading.Thread(target=self._run, daemon=True)
+        self._thread.start()
+    
+    def disable(self):
+        """Stop sampling"""
+        self._stop.set()
+        if self._thread is not None:
+            self._thread.join()
+            self._thread = None
+    
+    def create_stats(self):
+        """Build the pstats dictionary from the samples"""
+        interval = self.interval
+        callers = {}
+        for (caller, callee), count in self._call_counts.items():
+            callers.setdefault(callee, {})[caller] = (count, count, 0.0, count * interval)
+        self.stats = {
+            func: (count, count, self._self_counts.get(func, 0) * interval,
+                   count * interval, callers.get(func, {}))
+            for func, count in self._total_counts.items()
+        }
+    
+    def dump_stats(self, path):
+        """Write the samples as a .pstats file"""
+        import marshal
+        self.create_stats()
+        with open(path, "wb") as f:
+            marshal.dump(self.stats, f)
+    
+    def _run(self):
+        own = threading.get_ident()
+        self_counts = self._self_counts
+        total_counts = self._total_counts
+        call_counts = self._call_counts
+        while not self._stop.wait(self.interval):
+            for ident, frame in sys._current_frames().items():
+                if ident == own:
+                    continue
+                if frame.f_code.co_filename.endswith(self.IDLE_MODULES):
+                    self.idle_samples += 1
+                    continue
+                self.samples += 1
+                seen = set()
+                callee = None
+                while frame is not None:
+                    code = frame.f_code
+                    func = (code.co_filename, code.co_firstlineno, code.co_name)
+                    if callee is None:
+                        self_counts[func] = self_counts.get(func, 0) + 1
+                    else:
+                        call_counts[func, callee] = call_counts.get((func, callee), 0) + 1
+                    if func not in seen:
+                        seen.add(func)
+                        total_counts[func] = total_counts.get(func, 0) + 1
+                    callee = func
+                    frame = frame.f_back
+
+
+def profile_summary(profiler, top=20):
+    """The top functions of a profiler by own time, for the run report"""
+    import pstats
+    stats = pstats.Stats(profiler)
+    stats.sort_stats("tottime")
+    summary = []
+    for func in stats.fcn_list[:top]:
+        calls, _, own_time, cumulative, _ = stats.stats[func]
+        filename, line, name = func
+        location = f"{os.path.basename(filename)}:{line}" if line else filename
+        summary.append({
+            "function": f"{name} ({location})" if line else name,
+            "calls": calls,
+            "self": round(own_time, 4),
+            "cumulative": round(cumulative, 4),
+        })
+    return summary
+
+
+# =============================================================================
+# RUN HISTORY
+# =============================================================================
+
+HISTORY_FILE = os.path.join(os.path.dirname(os.path.abspath(__file__)), "fresher_history.db")
+
+# Cleans used to estimate how fast a target regrows
+REGROWTH_WINDOW = 5
+
+
+class RunHistory:
+    """Append-only SQLite log of cleaning runs, per target
+    
+    Every run adds one row per target with what it freed and how long it
+    took. The bytes a clean frees are what regrew since the clean before,
+    so the history yields a regrowth rate per target.
+    """
+    
+    def __init__(self, path=HISTORY_FILE):
+        self.path = path
+        self._lock = threading.Lock()
+        import sqlite3
+        try:
+            self._conn = sqlite3.connect(path, check_same_thread=False)
+            self._conn.execute("CREATE TABLE IF NOT EXISTS runs ("
+                               "id INTEGER PRIMARY KEY, started REAL, elapsed REAL, "
+                               "cancelled INTEGER, version TEXT)")
+            self._conn.execute("CREATE TABLE IF NOT EXISTS targets ("
+                               "run_id INTEGER, target TEXT, bytes INTEGER, files INTEGER, "
+                               "scanned INTEGER, elapsed REAL, cancelled INTEGER, skipped INTEGER)")
+            self._conn.execute("CREATE INDEX IF NOT EXISTS targets_by_name ON targets (target, run_id)")
+            self._conn.commit()
+        except sqlite3.Error:
+            self._conn = None
+    
+    def record(self, started, elapsed, cancelled, results, skipped=()):
+        """Append a run: its TargetStats results and the targets skipped"""
+        if self._conn is None:
+            return
+        import sqlite3
+        rows = [(stats.name, stats.freed_bytes, stats.files_deleted, stats.files_scanned,
+                 stats.elapsed, stats.cancelled, False) for stats in results]
+        rows += [(name, 0, 0, 0, 0.0, False, True) for name in skipped]
+        with self._lock:
+            try:
+                with self._conn:
+                    run_id = self._conn.execute(
+                        "INSERT INTO runs (started, elapsed, cancelled, version) VALUES (?, ?, ?, ?)",
+                        (started, elapsed, cancelled, APP_VERSION)).lastrowid
+                    self._conn.executemany(
+                        "INSERT INTO targets VALUES (?, ?, ?, ?, ?, ?, ?, ?)",
+                        [(run_id,) + row for row in rows])
+            except sqlite3.Error:
+                pass
+    
+    def cleans(self, target, limit=REGROWTH_WINDOW + 1):
+        """Get (started, bytes, files) of the latest completed cleans of a target"""
+        if self._conn is None:
+            return []
+        with self._lock:
+            return self._conn.execute(
+                "SELECT runs.started, targets.bytes, targets.files FROM targets "
+                "JOIN runs ON runs.id = targets.run_id "
+                "WHERE targets.target = ? AND NOT targets.skipped AND NOT targets.cancelled "
+                "ORDER BY runs.started DESC LIMIT ?", (target, limit)).fetchall()
+    
+    def regrowth(self, target, window=REGROWTH_WINDOW):
+        """Get (bytes per day, files per day, last clean) of a target
+        
+        Rates are totals over the last window intervals between cleans, so
+        one unusual run does not swing them. None with fewer than two cleans.
+        """
+        cleans = self.cleans(target, window + 1)
+        if len(cleans) < 2:
+            return None
+        days = (cleans[0][0] - cleans[-1][0]) / 86400
+        if days <= 0:
+            return None
+        regrown = cleans[:-1]
+        return (sum(row[1] for row in regrown) / days, sum(row[2] for row in regrown) / days,
+                cleans[0][0])
+    
+    def trends(self):
+        """Per-target summary of the history, most regrowth first"""
+        if self._conn is None:
+            return []
+        with self._lock:
+            rows = self._conn.execute(
+                "SELECT target, COUNT(*), SUM(bytes), SUM(files), AVG(elapsed) FROM targets "
+                "WHERE NOT skipped GROUP BY target").fetchall()
+            skips = dict(self._conn.execute(
+                "SELECT target, COUNT(*) FROM targets WHERE skipped GROUP BY target").fetchall())
+        trends = []
+        for target, cleans, total_bytes, total_files, mean_elapsed in rows:
+            rate = self.regrowth(target)
+            trends.append({
+                "target": target,
+                "cleans": cleans,
+                "skipped": skips.get(target, 0),
+                "bytes": total_bytes,
+                "files": total_files,
+                "mean_elapsed": round(mean_elapsed, 3),
+                "bytes_per_day": round(rate[0]) if rate else None,
+                "files_per_day": round(rate[1], 1) if rate else None,
+                "last_clean": datetime.fromtimestamp(rate[2]).isoformat(timespec="seconds") if rate else None,
+            })
+        trends.sort(key=lambda trend: trend["bytes_per_day"] or 0, reverse=True)
+        return trends
+
+
+class CleanSchedule:
+    """Skip targets that cannot have regrown enough to be worth a clean
+    
+    A target is skipped when its regrowth rate predicts less than
+    min_bytes since its last clean. Targets without enough history, and
+    targets last cleaned max_days ago or more, always run.
+    """
+    
+    def __init__(self, history, min_bytes=1024 * 1024, max_days=7):
+        self.history = history
+        self.min_bytes = min_bytes
+        self.max_age = max_days * 86400
+    
+    def skip(self, targets, now=None):
+        """Get {target: predicted bytes} for the targets to skip this run"""
+        now = now or time.time()
+        skipped = {}
+        for target in targets:
+            rate = self.history.regrowth(target)
+            if rate is None:
+                continue
+            age = now - rate[2]
+            predicted = rate[0] * age / 86400
+            if age < self.max_age and predicted < self.min_bytes:
+                skipped[target] = predicted
+        return skipped
+
+
 # =============================================================================
 # WINDOWS 11 CLEANER CORE
 # =============================================================================
@@ -58,16 +2330,71 @@ COLORS = {
 class Windows11Cleaner:
     """Core cleaning engine for Windows 11"""
     
-    def __init__(self, log_callback=None, progress_callback=None, status_callback=None):
+    # Targets that only walk the filesystem, in their original run order;
+    # these are declared in DEFAULT_TARGETS and the user targets file
+    FILE_TARGETS = tuple(spec["name"] for spec in DEFAULT_TARGETS)
+    
+    # Targets that call into Windows or wait on external tools; these get
+    # their own threads and are skipped by preview()
+    SYSTEM_TARGETS = (
+        "clean_recycle_bin",
+        "flush_dns",
+        "run_disk_cleanup",
+        "clean_store_cache",
+    )
+    
+    def __init__(self, log_callback=None, progress_callback=None, status_callback=None,
+                 max_workers=None, delete_workers=None, scan_cache=None,
+                 file_callback=None, target_callback=None, targets=None, resolver=None,
+                 rules=None, commands=None, locked_paths=None, history=None, schedule=None):
         self.log_callback = log_callback
         self.progress_callback = progress_callback
         self.status_callback = status_callback
-        self.total_operations = 15
-        self.current_operation = 0
-        self.cleaned_size = 0
-        self.errors = []
+        self.file_callback = file_callback
+        self.target_callback = target_callback
+        self.resolver = resolver or PathResolver()
+        self.rules = rules if rules is not None else load_target_rules()
+        self.file_targets = tuple(t for t in self.rules if targets is None or t in targets)
+        self.system_targets = tuple(t for t in self.SYSTEM_TARGETS if targets is None or t in targets)
+        self.commands = {**SYSTEM_COMMANDS, **(commands or {})}
+        if self.resolver.root:
+            # A fixture root only stands in for the filesystem targets and
+            # for tools given stand-in commands
+            self.system_targets = tuple(t for t in self.system_targets if t in (commands or {}))
+        self.max_workers = max_workers or min(8, os.cpu_count() or 4)
+        self.delete_workers = delete_workers if delete_workers is not None else 4
+        self.deletion_pool = None
+        self.command_runner = None
+        self.browser_profiles = None
+        self.plan = None
+        # TargetStats of what other targets' walks did for each target
+        self.credits = {}
+        self.preview_index = None
+        self.scan_cache = scan_cache
+        self.locked_paths = locked_paths
+        self.history = history
+        self.schedule = schedule
+        # Targets the schedule skips this run, with the bytes predicted
+        self.skipped = {}
+        # Paths known to stay locked, skipped this run
+        self.skip = set()
+        # (stats, path, size) of files in use, retried at the end of a run
+        self.locked = []
+        self.progress = ProgressTracker(None)
+        self.results = []
+        self.default_stats = TargetStats("manual")
         self.start_time = None
+        self.elapsed = 0.0
+        self.mode = None
+        self.found = {}
+        # Size and age distribution per category, from the last scan
+        self.distribution = {}
+        self.profile = None
+        self.trace = RunTrace()
         self.is_running = False
+        self.token = CancelToken()
+        self._lock = threading.Lock()
+        self._local = threading.local()
         
     def log(self, message, level="INFO"):
         """Log message with timestamp"""
@@ -75,322 +2402,1390 @@ class Windows11Cleaner:
             timestamp = datetime.now().strftime("%H:%M:%S")
             self.log_callback(f"[{timestamp}] [{level}] {message}")
     
-    def update_progress(self):
-        """Update progress bar"""
-        self.current_operation += 1
+    def report_progress(self, info):
+        """Forward a progress snapshot to the progress callback"""
         if self.progress_callback:
-            progress = int((self.current_operation / self.total_operations) * 100)
-            self.progress_callback(progress)
+            self.progress_callback(info)
     
     def update_status(self, status):
         """Update status message"""
         if self.status_callback:
             self.status_callback(status)
     
+    @property
+    def stats(self):
+        """Statistics of the target running on the current thread"""
+        stats = getattr(self._local, "stats", None)
+        return stats if stats is not None else self.default_stats
+    
+    @property
+    def cleaned_size(self):
+        """Total space freed in MB across all targets"""
+        with self._lock:
+            targets = self.results + [self.default_stats]
+        return sum(stats.freed_bytes for stats in targets) / (1024 * 1024)
+    
+    @property
+    def errors(self):
+        """All errors recorded across all targets"""
+        with self._lock:
+            targets = self.results + [self.default_stats]
+        return [error for stats in targets for error in stats.errors]
+    
+    @property
+    def active_targets(self):
+        """Filesystem targets that run, leaving out those skipped by the schedule"""
+        return tuple(name for name in self.file_targets if name not in self.skipped)
+    
+    @property
+    def failures(self):
+        """Failed deletes by kind across all targets"""
+        with self._lock:
+            targets = self.results + [self.default_stats]
+        return {kind: sum(stats.failures[kind] for stats in targets) for kind in FAILURE_KINDS}
+    
+    @property
+    def cancelled(self):
+        """Whether the current run has been cancelled"""
+        return self.token.cancelled
+    
+    def cancel(self):
+        """Stop the run as soon as every thread reaches its next file"""
+        if not self.token.cancelled:
+            self.token.cancel()
+            self.log("⏹️ Stopping...", "WARNING")
+    
+    def pause(self):
+        """Pause the run at the next file"""
+        if self.is_running and not self.token.paused:
+            self.token.pause()
+            self.log("⏸️ Paused")
+            self.update_status("Paused")
+    
+    def resume(self):
+        """Resume a paused run"""
+        if self.token.paused:
+            self.token.resume()
+            self.log("▶️ Resumed")
+            self.update_status("Resumed")
+    
+    def log_command_output(self, name, line):
+        """Log a line printed by an external tool"""
+        self.log(f"  [{name}] {line}")
+    
+    def run_command(self, name):
+        """Run the external tool of a system target and log its outcome
+        
+        The tool runs on the shared CommandRunner event loop, so tools of
+        different targets and the filesystem targets all overlap.
+        """
+        argv, timeout = self.commands[name]
+        with self._lock:
+            if self.command_runner is None:
+                self.command_runner = CommandRunner(self.log_command_output)
+            runner = self.command_runner
+        result = runner.run(name, argv, timeout, self.token)
+        end = time.perf_counter()
+        self.trace.add(os.path.basename(argv[0]), "tool", end - result.duration, end,
+                       argv=result.argv, returncode=result.returncode, timed_out=result.timed_out)
+        if result.cancelled:
+            self.token.check()
+        if result.error:
+            self.log(f"✗ Failed: {result.error}", "ERROR")
+            self.stats.errors.append(result.error)
+            return result
+        if result.timed_out:
+            self.log(f"⚠️ {argv[0]} timed out after {timeout}s and was stopped", "WARNING")
+        elif result.returncode:
+            self.log(f"⚠️ {argv[0]} exited with code {result.returncode}", "WARNING")
+        self.log(f"⏱️ {argv[0]} took {result.duration:.1f}s")
+        return result
+    
+    def get_deletion_pool(self):
+        """Get the shared deletion pool, creating it on first use"""
+        with self._lock:
+            if self.deletion_pool is None:
+                self.deletion_pool = DeletionPool(self.delete_workers)
+            return self.deletion_pool
+    
     def get_size_mb(self, path):
         """Get size of file/folder in MB"""
         try:
-            if os.path.isfile(path):
-                return os.path.getsize(path) / (1024 * 1024)
-            elif os.path.isdir(path):
-                total = 0
-                for root, dirs, files in os.walk(path):
-                    for f in files:
-                        try:
-                            fp = os.path.join(root, f)
-                            total += os.path.getsize(fp)
-                        except:
-                            pass
-                return total / (1024 * 1024)
-        except:
+            st = os.stat(path)
+        except OSError:
             return 0
-        return 0
+        if stat.S_ISDIR(st.st_mode):
+            return sum(map(entry_size, scan_files(path))) / (1024 * 1024)
+        return st.st_size / (1024 * 1024)
     
-    def safe_delete_file(self, path):
-        """Safely delete a single file"""
+    def safe_delete_file(self, path, size=None, mtime_ns=None):
+        """Safely delete a single file
+        
+        Pass size (and for a preview mtime_ns) from an earlier stat or scan
+        entry so the file, however large, is removed without another stat.
+        """
+        if self.token.interrupted:
+            self.token.check()
+        stats = self.stats
+        stats.files_scanned += 1
+        if self.preview_index is not None:
+            if size is None or mtime_ns is None:
+                stats.stat_calls += 1
+                try:
+                    st = os.stat(path, follow_symlinks=False)
+                except OSError:
+                    return False
+                size, mtime_ns = st.st_size, st.st_mtime_ns
+            return self.index_files([(path, size, mtime_ns)])[0] > 0
+        if path in self.skip:
+            stats.failures["known_locked"] += 1
+            return False
         try:
-            if os.path.exists(path):
-                size = self.get_size_mb(path)
-                os.remove(path)
-                self.cleaned_size += size
-                self.log(f"✓ Deleted: {os.path.basename(path)} ({size:.2f} MB)")
-                return True
+            if size is None:
+                stats.stat_calls += 1
+                size = os.stat(path, follow_symlinks=False).st_size
+            os.remove(path)
+            stats.freed_bytes += size
+            stats.files_deleted += 1
+            self.progress.advance(1, size)
+            if self.file_callback:
+                self.file_callback(stats.name, path, size)
+            size_mb = size / (1024 * 1024)
+            self.log(f"✓ Deleted: {os.path.basename(path)} ({size_mb:.2f} MB)")
+            return True
+        except OSError as e:
+            kind = self.record_failure(stats, e, path, size)
+            if kind == "in_use":
+                self.log(f"🔒 In use, retrying later: {os.path.basename(path)}")
+            elif kind != "vanished":
+                stats.errors.append(str(e))
+                self.log(f"✗ Failed: {os.path.basename(path)} - {str(e)}", "ERROR")
         except Exception as e:
-            self.errors.append(str(e))
+            stats.errors.append(str(e))
             self.log(f"✗ Failed: {os.path.basename(path)} - {str(e)}", "ERROR")
         return False
     
-    def safe_clean_folder(self, path):
-        """Clean folder contents but preserve folder structure"""
+    def record_failure(self, stats, error, path, size):
+        """Count a failed delete by kind, queueing files in use for a retry"""
+        kind = classify_failure(error)
+        if kind == "in_use" and size is not None:
+            with self._lock:
+                stats.failures[kind] += 1
+                self.locked.append((stats, path, size))
+        else:
+            stats.failures[kind] += 1
+        return kind
+    
+    def safe_clean_folder(self, path, rule=None):
+        """Clean folder contents but preserve folder structure
+        
+        Only files matching rule (a TargetRule) are removed.
+        """
+        start = time.perf_counter()
         try:
             if os.path.exists(path):
-                total_size = 0
-                file_count = 0
-                for root, dirs, files in os.walk(path):
-                    for file in files:
-                        file_path = os.path.join(root, file)
-                        try:
-                            size = os.path.getsize(file_path) / (1024 * 1024)
-                            os.remove(file_path)
-                            total_size += size
-                            file_count += 1
-                        except:
-                            pass
-                if file_count > 0:
-                    self.cleaned_size += total_size
-                    self.log(f"✓ Cleaned: {os.path.basename(path)} - {file_count} files ({total_size:.2f} MB)")
+                if self.preview_index is not None:
+                    scan = self.scan_cache.scan if self.scan_cache else scan_file_stats
+                    entries = scan(path, rule is None or rule.recursive, self.token, self.stats)
+                    claims = isinstance(rule, ClaimSet)
+                    if rule is not None and not claims:
+                        entries = rule.filter(entries, path)
+                    files = nbytes = 0
+                    # Indexed a chunk at a time, so even a folder of millions
+                    # of files is never held as a list of tuples
+                    while True:
+                        chunk = list(islice(entries, INDEX_CHUNK))
+                        if not chunk:
+                            break
+                        groups = rule.split(chunk, path).items() if claims else ((True, chunk),)
+                        for claim, claimed in groups:
+                            added = self.index_files(claimed, None if claim is True else claim)
+                            files += added[0]
+                            nbytes += added[1]
+                    if files and self.preview_index.keep_entries and self.mode == "preview":
+                        self.log(f"🔍 Found: {os.path.basename(path)} - {files} files ({nbytes / (1024 * 1024):.2f} MB)")
+                    return files > 0
+                self.finish_folder(path, self.submit_folder(path, rule).wait())
+                self.token.check()
                 return True
         except Exception as e:
             self.log(f"✗ Failed to clean {os.path.basename(path)}", "ERROR")
+        finally:
+            self.trace.add(os.path.basename(path) or path, "folder", start, path=path)
         return False
     
-    def clean_windows_temp(self):
-        """Clean Windows temporary files"""
-        self.update_status("Cleaning Windows Temp...")
-        self.log("📁 Cleaning Windows Temporary Files")
+    def submit_folder(self, path, rule=None, base=None, recursive=None):
+        """Queue a folder on the deletion pool and return its job"""
+        on_file = None
+        if self.file_callback:
+            report = self.report_file if isinstance(rule, ClaimSet) else self.file_callback
+            on_file = partial(report, self.stats.name)
+        return self.get_deletion_pool().submit(path, self.progress.advance, on_file, rule, self.token,
+                                               self.skip, base, recursive)
+    
+    def report_file(self, name, path, size, target=None):
+        """Pass a deleted file to file_callback under the target it counts for"""
+        self.file_callback(target or name, path, size)
+    
+    def finish_folder(self, path, job):
+        """Add a finished deletion job to the current target's statistics"""
+        total_bytes = job.freed_bytes
+        file_count = job.files_deleted
+        for target, (files, nbytes) in job.claimed.items():
+            self.credit(target, files, nbytes)
+            file_count -= files
+            total_bytes -= nbytes
+        for target, failures in job.claimed_failures.items():
+            self.credit(target, 0, 0, failures)
+        stats = self.stats
+        stats.files_scanned += job.files_scanned
+        stats.stat_calls += job.files_scanned  # one stat per file
+        stats.dirs_removed += job.dirs_removed
+        for kind, count in job.failures.items():
+            stats.failures[kind] += count
+        if job.locked:
+            # Retries free space for the target each file counts for
+            locked = [(stats if target is None else self.credit_stats(target), path, size)
+                      for path, size, target in job.locked]
+            with self._lock:
+                self.locked.extend(locked)
+        if file_count > 0 or job.dirs_removed:
+            stats.freed_bytes += total_bytes
+            stats.files_deleted += file_count
+            total_size = total_bytes / (1024 * 1024)
+            folders = f", {job.dirs_removed} folders" if job.dirs_removed else ""
+            self.log(f"✓ Cleaned: {os.path.basename(path)} - {file_count} files{folders} ({total_size:.2f} MB)")
+    
+    def credit_stats(self, name):
+        """Get the TargetStats collecting what other targets' walks did for target name"""
+        with self._lock:
+            stats = self.credits.get(name)
+            if stats is None:
+                stats = self.credits[name] = TargetStats(name)
+            return stats
+    
+    def credit(self, name, files, nbytes, failures=None):
+        """Credit files deleted (and failures) by another target's walk to target name"""
+        stats = self.credit_stats(name)
+        with self._lock:
+            stats.files_deleted += files
+            stats.freed_bytes += nbytes
+            for kind, count in (failures or {}).items():
+                stats.failures[kind] += count
+    
+    def apply_credits(self):
+        """Add their credits to the guests of the plan and report them
         
-        paths = [
-            os.environ.get('TEMP', ''),
-            os.environ.get('TMP', ''),
-            r"C:\Windows\Temp",
-            os.path.expandvars(r"%LOCALAPPDATA%\Temp"),
-        ]
+        Guests are reported here rather than when their own run ends, as
+        the walks crediting them may finish later.
+        """
+        with self._lock:
+            credits, self.credits = self.credits, {}
+            results = {stats.name: stats for stats in self.results}
+        for name in sorted(self.plan.guests) if self.plan else ():
+            credit = credits.get(name) or TargetStats(name)
+            files, nbytes = credit.files_deleted, credit.freed_bytes
+            stats = results.get(name)
+            if stats is None:
+                # Stopped before it started
+                if not (files or any(credit.failures.values())):
+                    continue
+                stats = TargetStats(name)
+                stats.cancelled = True
+                with self._lock:
+                    self.results.append(stats)
+            stats.files_deleted += files
+            stats.freed_bytes += nbytes
+            for kind, count in credit.failures.items():
+                stats.failures[kind] += count
+            if files:
+                self.log(f"✓ Cleaned: {name} - {files} files ({nbytes / (1024 * 1024):.2f} MB) "
+                         f"in folders shared with other targets")
+            if self.target_callback:
+                self.target_callback(stats)
+    
+    def index_files(self, entries, category=None):
+        """Record a list of (path, size, mtime_ns) entries in the preview index
         
-        for path in paths:
-            if path and os.path.exists(path):
-                self.safe_clean_folder(path)
-        self.update_progress()
+        Returns the files and bytes added.
+        """
+        index = self.preview_index
+        category = category or self.stats.name
+        index.add_files(category, entries)
+        # The estimate pass of a clean run finds files quietly
+        if index.keep_entries and self.file_callback and self.mode == "preview":
+            for path, size, _ in entries:
+                self.file_callback(category, path, size)
+        return len(entries), sum(size for _, size, _ in entries)
+    
+    def clean_indexed(self, index, category, verify=True):
+        """Delete the indexed files of a category that are unchanged since the preview
+        
+        Entries go to the deletion pool in batches, a few per worker at a
+        time, so files are deleted in parallel while only those batches are
+        held in memory. With verify=False files that changed since the index
+        was built are deleted anyway, for an index scanned earlier in the
+        same run; their bytes always come from a fresh stat.
+        """
+        rule = self.rules.get(category)
+        if rule is not None:
+            self.update_status(rule.status)
+            self.log(rule.message)
+        else:
+            self.update_status(f"Cleaning {category}...")
+        stats = self.stats
+        token = self.token
+        pool = self.get_deletion_pool()
+        on_file = partial(self.file_callback, category) if self.file_callback else None
+        files = index.files(category)
+        jobs = deque()
+        skipped = 0
+        
+        def collect(job):
+            nonlocal skipped
+            job.wait()
+            stats.freed_bytes += job.freed_bytes
+            stats.files_deleted += job.files_deleted
+            stats.files_scanned += job.files_scanned
+            stats.stat_calls += job.files_scanned  # one stat per listed file
+            skipped += job.changed
+            for kind, count in job.failures.items():
+                stats.failures[kind] += count
+            if job.locked:
+                with self._lock:
+                    self.locked.extend((stats, path, size) for path, size, _ in job.locked)
+        
+        try:
+            while True:
+                if token.interrupted:
+                    token.check()
+                batch = list(islice(files, DELETE_BATCH))
+                if not batch:
+                    break
+                jobs.append(pool.submit_entries(batch, self.progress.advance, on_file, token, self.skip, verify))
+                if len(jobs) > 2 * max(1, pool.workers):
+                    collect(jobs.popleft())
+        finally:
+            # Batches already queued finish (or stop at the cancel) first
+            while jobs:
+                collect(jobs.popleft())
+        token.check()
+        if rule is not None and rule.remove_dirs and rule.recursive:
+            for path in self.target_paths(rule):
+                if os.path.isdir(path):
+                    stats.dirs_removed += prune_empty_dirs(path, token)
+        self.log(f"✓ Cleaned: {category} - {stats.files_deleted} files ({stats.freed_mb:.2f} MB)")
+        if skipped:
+            self.log(f"⚠️ {category}: {skipped} files changed since they were scanned were skipped", "WARNING")
+    
+    def retry_locked(self, rounds=RETRY_ROUNDS, delay=RETRY_DELAY):
+        """Retry deleting the files found in use, backing off between rounds
+        
+        Runs once every target is done, so the processes holding the files
+        have had the whole run to let go of them. Files still in use after
+        the last round are counted in locked_paths and returned.
+        """
+        pending = self.locked
+        self.locked = []
+        for attempt in range(rounds):
+            if not pending:
+                break
+            self.update_status(f"Retrying {len(pending)} files in use...")
+            self.token.sleep(delay * 2 ** attempt)
+            still_locked = []
+            for stats, path, size in pending:
+                self.token.check()
+                try:
+                    os.remove(path)
+                except OSError as e:
+                    kind = classify_failure(e)
+                    if kind == "in_use":
+                        still_locked.append((stats, path, size))
+                    else:
+                        stats.failures["in_use"] -= 1
+                        stats.failures[kind] += 1
+                    continue
+                stats.failures["in_use"] -= 1
+                stats.freed_bytes += size
+                stats.files_deleted += 1
+                if self.file_callback:
+                    self.file_callback(stats.name, path, size)
+            if len(still_locked) < len(pending):
+                self.log(f"🔓 Retry {attempt + 1}: deleted {len(pending) - len(still_locked)} files "
+                         f"that were in use")
+            pending = still_locked
+        return [path for _, path, _ in pending]
+    
+    def settle_locked(self):
+        """Retry the files found in use and remember those that stay locked
+        
+        Empties the locked list, so it never outlives a run or a watch
+        clean, and refreshes the known-locked paths later scans skip.
+        """
+        start = time.perf_counter()
+        locked = [path for _, path, _ in self.locked]
+        try:
+            if self.locked:
+                locked = self.retry_locked()
+        except CleaningCancelled:
+            pass
+        else:
+            self.trace.add("retry_locked", "phase", start, files=len(locked))
+        if self.locked_paths:
+            self.locked_paths.failed(locked)
+            self.locked_paths.save()
+            self.skip = self.locked_paths.skip_set()
+    
+    def get_browser_profiles(self):
+        """Get the browser profile index, loading it on first use"""
+        with self._lock:
+            if self.browser_profiles is None:
+                self.browser_profiles = BrowserProfiles(self.resolver,
+                                                        self.resolver.state_file(BROWSER_INDEX_FILE))
+            return self.browser_profiles
+    
+    def target_paths(self, rule):
+        """Get the resolved paths of a target rule, declared and discovered"""
+        paths = self.resolver.paths(rule.paths)
+        if rule.discover == "browsers":
+            paths += self.get_browser_profiles().cache_dirs()
+        return paths
+    
+    def refresh_rules(self):
+        """Move the age cutoff of every rule to now"""
+        now_ns = time.time_ns()
+        for rule in self.rules.values():
+            rule.refresh(now_ns)
+    
+    def plan_targets(self):
+        """Plan the walks of the selected filesystem targets for this run"""
+        self.refresh_rules()
+        plan = ScanPlan([(self.rules[name], self.target_paths(self.rules[name]))
+                         for name in self.active_targets])
+        if plan.walks < plan.paths_listed:
+            self.log(f"🧭 Scan plan: {plan.walks} folders for {plan.paths_listed} target paths")
+        self.plan = plan
+        return plan
+    
+    def clean_paths(self, rule):
+        """Clean every path of a target rule, as laid out by the scan plan"""
+        if self.plan is not None:
+            walks = self.plan.paths(rule.name)
+        else:
+            walks = [(path, rule) for path in self.target_paths(rule)]
+        folders = []
+        for path, rule in walks:
+            # One lstat tells folders from files and sizes the file, so a
+            # dump of many GB is removed with no further metadata calls
+            self.stats.stat_calls += 1
+            try:
+                st = os.stat(path, follow_symlinks=False)
+                if stat.S_ISLNK(st.st_mode) and os.path.isdir(path):
+                    st = os.stat(path)
+            except OSError:
+                continue
+            if stat.S_ISDIR(st.st_mode):
+                folders.append((path, rule))
+            elif stat.S_ISREG(st.st_mode) or stat.S_ISLNK(st.st_mode):
+                if rule.matches(os.path.basename(path), st.st_size, st.st_mtime_ns):
+                    self.safe_delete_file(path, st.st_size, st.st_mtime_ns)
+        if self.preview_index is None and len(folders) > 1:
+            # Every folder goes to the deletion pool at once, so its workers
+            # spread over all of them instead of one folder at a time
+            start = time.perf_counter()
+            jobs = [(path, self.submit_folder(path, rule)) for path, rule in folders]
+            for path, job in jobs:
+                self.finish_folder(path, job.wait())
+                self.trace.add(os.path.basename(path) or path, "folder", start, job.finished_at, path=path)
+            self.token.check()
+        else:
+            for path, rule in folders:
+                self.safe_clean_folder(path, rule)
+    
+    def clear_results(self):
+        """Take the results of the targets run so far, for long-running use"""
+        with self._lock:
+            results, self.results = self.results, []
+        self.trace = RunTrace()
+        return results
+    
+    def clean_folders(self, name, rule, base, folders):
+        """Clean only the files directly inside folders below base, for target name
+        
+        Lets the watcher clean the directories that changed without walking
+        the rest of the target. rule filters as it does for the whole
+        target, with paths relative to base.
+        """
+        def clean():
+            jobs = [(path, self.submit_folder(path, rule, base, recursive=False)) for path in folders]
+            for path, job in jobs:
+                self.finish_folder(path, job.wait())
+        
+        return self.run_target(name, clean)
+    
+    def clean_target(self, rule):
+        """Clean a filesystem target declared by a rule"""
+        self.token.check()
+        self.update_status(rule.status)
+        self.log(rule.message)
+        
+        self.clean_paths(rule)
     
     def clean_recycle_bin(self):
         """Empty recycle bin"""
         self.update_status("Emptying Recycle Bin...")
         self.log("🗑️ Emptying Recycle Bin")
         
+        if not IS_WINDOWS:
+            self.log("⚠️ Recycle bin skipped (Windows only)", "WARNING")
+            return
+        self.token.check()
         try:
-            ctypes.windll.shell32.SHEmptyRecycleBinW(None, None, 0x0001)
+            windows_dll("shell32").SHEmptyRecycleBinW(None, None, 0x0001)
             self.log("✓ Recycle bin emptied")
         except Exception as e:
             self.log(f"✗ Failed: {str(e)}", "ERROR")
-            self.errors.append(str(e))
-        self.update_progress()
-    
-    def clean_browser_caches(self):
-        """Clean browser cache files"""
-        self.update_status("Cleaning Browser Caches...")
-        self.log("🌐 Cleaning Browser Caches")
-        
-        # Chrome
-        chrome_path = os.path.expandvars(r"%LOCALAPPDATA%\Google\Chrome\User Data\Default\Cache")
-        if os.path.exists(chrome_path):
-            self.safe_clean_folder(chrome_path)
-        
-        # Edge
-        edge_path = os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\Edge\User Data\Default\Cache")
-        if os.path.exists(edge_path):
-            self.safe_clean_folder(edge_path)
-        
-        # Firefox
-        firefox_profiles = os.path.expandvars(r"%APPDATA%\Mozilla\Firefox\Profiles")
-        if os.path.exists(firefox_profiles):
-            for profile in os.listdir(firefox_profiles):
-                cache_path = os.path.join(firefox_profiles, profile, "cache2")
-                if os.path.exists(cache_path):
-                    self.safe_clean_folder(cache_path)
-        
-        self.update_progress()
-    
-    def clean_windows_logs(self):
-        """Clean Windows log files"""
-        self.update_status("Cleaning Windows Logs...")
-        self.log("📋 Cleaning Windows Log Files")
-        
-        log_paths = [
-            r"C:\Windows\Logs",
-            os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\Windows\WebCache"),
-            os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\Windows\Explorer"),
-        ]
-        
-        for path in log_paths:
-            if os.path.exists(path):
-                self.safe_clean_folder(path)
-        self.update_progress()
+            self.stats.errors.append(str(e))
     
     def flush_dns(self):
         """Flush DNS cache"""
         self.update_status("Flushing DNS Cache...")
         self.log("🌐 Flushing DNS Cache")
         
-        try:
-            subprocess.run("ipconfig /flushdns", shell=True, capture_output=True)
+        if self.run_command("flush_dns").ok:
             self.log("✓ DNS cache flushed")
-        except Exception as e:
-            self.log(f"✗ Failed: {str(e)}", "ERROR")
-            self.errors.append(str(e))
-        self.update_progress()
-    
-    def clean_prefetch(self):
-        """Clean Windows Prefetch"""
-        self.update_status("Cleaning Prefetch...")
-        self.log("⚡ Cleaning Windows Prefetch")
-        
-        prefetch_path = r"C:\Windows\Prefetch"
-        if os.path.exists(prefetch_path):
-            self.safe_clean_folder(prefetch_path)
-        self.update_progress()
-    
-    def clean_thumbnails(self):
-        """Clean thumbnail cache"""
-        self.update_status("Cleaning Thumbnail Cache...")
-        self.log("🖼️ Cleaning Thumbnail Cache")
-        
-        thumb_path = os.path.expandvars(r"%LOCALAPPDATA%\Microsoft\Windows\Explorer")
-        if os.path.exists(thumb_path):
-            for file in os.listdir(thumb_path):
-                if file.startswith("thumbcache_"):
-                    file_path = os.path.join(thumb_path, file)
-                    self.safe_delete_file(file_path)
-        self.update_progress()
-    
-    def clean_recent_files(self):
-        """Clean recent files list (shortcuts only)"""
-        self.update_status("Cleaning Recent Files...")
-        self.log("📂 Cleaning Recent Files List")
-        
-        recent_path = os.path.expandvars(r"%APPDATA%\Microsoft\Windows\Recent")
-        if os.path.exists(recent_path):
-            self.safe_clean_folder(recent_path)
-        self.update_progress()
     
     def run_disk_cleanup(self):
         """Run Windows built-in disk cleanup"""
         self.update_status("Running Disk Cleanup...")
         self.log("💿 Running Windows Disk Cleanup")
         
-        try:
-            subprocess.run("cleanmgr /sagerun:1", shell=True, timeout=60)
+        if self.run_command("run_disk_cleanup").ok:
             self.log("✓ Disk cleanup completed")
-        except subprocess.TimeoutExpired:
-            self.log("⚠️ Disk cleanup timeout", "WARNING")
-        except Exception as e:
-            self.log(f"✗ Failed: {str(e)}", "ERROR")
-            self.errors.append(str(e))
-        self.update_progress()
     
     def clean_store_cache(self):
         """Clean Windows Store cache"""
         self.update_status("Cleaning Store Cache...")
         self.log("🛒 Cleaning Windows Store Cache")
         
-        try:
-            subprocess.run("wsreset.exe", shell=True, timeout=30)
+        if self.run_command("clean_store_cache").ok:
             self.log("✓ Windows Store cache cleared")
+    
+    def run_target(self, name, action=None):
+        """Run a single cleaning target with its own statistics"""
+        if self.token.cancelled:
+            return None
+        stats = TargetStats(name)
+        self._local.stats = stats
+        start = time.perf_counter()
+        if action is None:
+            rule = self.rules.get(name)
+            action = partial(self.clean_target, rule) if rule else getattr(self, name)
+        try:
+            self.token.check()
+            action()
+        except CleaningCancelled:
+            stats.cancelled = True
+            if stats.files_deleted:
+                self.log(f"⏹️ {name} stopped after {stats.files_deleted} files ({stats.freed_mb:.2f} MB)",
+                         "WARNING")
         except Exception as e:
-            self.log(f"✗ Failed: {str(e)}", "ERROR")
-            self.errors.append(str(e))
-        self.update_progress()
-    
-    def clean_font_cache(self):
-        """Clean font cache"""
-        self.update_status("Cleaning Font Cache...")
-        self.log("🔤 Cleaning Font Cache")
-        
-        font_cache = r"C:\Windows\ServiceProfiles\LocalService\AppData\Local\FontCache"
-        if os.path.exists(font_cache):
-            self.safe_clean_folder(font_cache)
-        self.update_progress()
-    
-    def clean_error_reports(self):
-        """Clean Windows error reports"""
-        self.update_status("Cleaning Error Reports...")
-        self.log("⚠️ Cleaning Windows Error Reports")
-        
-        wer_path = r"C:\ProgramData\Microsoft\Windows\WER"
-        if os.path.exists(wer_path):
-            self.safe_clean_folder(wer_path)
-        self.update_progress()
-    
-    def clean_setup_logs(self):
-        """Clean Windows setup logs"""
-        self.update_status("Cleaning Setup Logs...")
-        self.log("🔧 Cleaning Windows Setup Logs")
-        
-        setup_paths = [
-            r"C:\Windows\Panther",
-            r"C:\Windows\Setup Logs",
-        ]
+            stats.errors.append(str(e))
+            self.log(f"✗ {name} failed: {str(e)}", "ERROR")
+        finally:
+            stats.elapsed = time.perf_counter() - start
+            self._local.stats = None
+            self.progress.complete_target()
+            self.trace.add(name, "scan" if self.preview_index is not None else "target",
+                           start, start + stats.elapsed, **stats.to_dict())
+        with self._lock:
+            self.results.append(stats)
+        if self.target_callback and self.preview_index is None and not (self.plan and name in self.plan.guests):
+            self.target_callback(stats)
+        return stats
+    
+    def scan_targets(self, index):
+        """Run every filesystem target in preview mode, filling index"""
+        self.results = []
+        self.preview_index = index
+        try:
+            if self.max_workers <= 1:
+                # On the calling thread, where a cProfile run can see it
+                for name in self.active_targets:
+                    self.run_target(name)
+            else:
+                from concurrent.futures import ThreadPoolExecutor
+                with ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                    list(pool.map(self.run_target, self.active_targets))
+        finally:
+            self.preview_index = None
+            if self.scan_cache:
+                self.scan_cache.save()
+        return index
+    
+    def preview(self):
+        """Scan every filesystem target without deleting anything"""
+        self.is_running = True
+        self.start_time = time.time()
+        self.mode = "preview"
+        self.skipped = {}
+        self.trace = RunTrace()
+        self.progress = ProgressTracker(self.report_progress, total_targets=len(self.file_targets))
+        self.log("🔍 Analyzing reclaimable space...")
+        self.plan_targets()
+        try:
+            index = self.scan_targets(PreviewIndex())
+        finally:
+            self.is_running = False
+            self.elapsed = time.time() - self.start_time
+        self.progress.finish()
+        self.found = index.summary()
+        self.distribution = index.columns.summary()
         
-        for path in setup_paths:
-            if os.path.exists(path):
-                self.safe_clean_folder(path)
-        self.update_progress()
+        for category, (files, size) in index.summary().items():
+            self.log(f"  {category}: {files} files ({size / (1024 * 1024):.2f} MB)")
+        self.log(f"📊 Reclaimable: {index.total_bytes / (1024 * 1024):.2f} MB in {index.total_files} files")
+        self.log_distribution()
+        if self.token.cancelled:
+            self.log("⏹️ Preview stopped; results are partial", "WARNING")
+            self.update_status("Preview stopped")
+        else:
+            self.update_status("Preview ready")
+        return index
     
-    def clean_memory_dumps(self):
-        """Clean memory dump files"""
-        self.update_status("Cleaning Memory Dumps...")
-        self.log("💾 Cleaning Memory Dump Files")
+    def estimate(self):
+        """Index the files a run would process, without deleting
         
-        dump_paths = [
-            r"C:\Windows\Minidump",
-            r"C:\Windows\MEMORY.DMP",
-        ]
+        The run then cleans from the returned PreviewIndex, so the estimate
+        costs no second walk of the targets.
+        """
+        self.update_status("Estimating...")
+        self.progress = ProgressTracker(None)
+        index = self.scan_targets(PreviewIndex())
+        if not self.token.cancelled:
+            self.log(f"📏 Estimated: {index.total_files} files ({index.total_bytes / (1024 * 1024):.2f} MB)")
+        return index
+    
+    def log_distribution(self):
+        """Log the size and age distribution of each category"""
+        if self.distribution:
+            self.log("📐 Files by category:")
+        for category, info in sorted(self.distribution.items(), key=lambda item: item[1]["bytes"], reverse=True):
+            self.log(f"  {distribution_line(category, info)}")
+    
+    def run_report(self):
+        """Structured report of the last run or preview, per target"""
+        with self._lock:
+            results = list(self.results)
+        targets = []
+        for stats in results:
+            record = stats.to_dict()
+            if stats.name in self.found:
+                record["files_found"], record["bytes_found"] = self.found[stats.name]
+            targets.append(record)
+        totals = {key: sum(record[key] for record in targets)
+                  for key in ("files_scanned", "files_deleted", "bytes", "dirs_removed",
+                              "stat_calls", "errors")}
+        totals["failures"] = {kind: sum(record["failures"][kind] for record in targets)
+                              for kind in FAILURE_KINDS}
+        return {
+            "app": APP_NAME,
+            "version": APP_VERSION,
+            "mode": self.mode,
+            "started": datetime.fromtimestamp(self.start_time).isoformat(timespec="seconds")
+                       if self.start_time else None,
+            "elapsed": round(self.elapsed, 3),
+            "cancelled": self.token.cancelled,
+            "skipped": {name: round(predicted) for name, predicted in self.skipped.items()},
+            "totals": totals,
+            "targets": targets,
+            "profile": self.profile,
+            "distribution": self.distribution,
+        }
+    
+    def write_report(self, path):
+        """Write the run report to a JSON file"""
+        with open(path, "w", encoding="utf-8") as f:
+            json.dump(self.run_report(), f, ensure_ascii=False, indent=2)
+    
+    def run_all(self, index=None, estimate=True, profile=None, profile_file=None, profile_top=20):
+        """Run all cleaning operations, or clean straight from a preview index
         
-        for path in dump_paths:
-            if os.path.exists(path):
-                if os.path.isfile(path):
-                    self.safe_delete_file(path)
-                else:
-                    self.safe_clean_folder(path)
-        self.update_progress()
+        Without an index an estimate pass first indexes every target, so
+        progress can be reported in files and bytes, and the targets are
+        then cleaned from that index; pass estimate=False to walk and
+        delete in one pass instead, with progress by finished targets.
+        
+        profile ("sample" or "cprofile") profiles the run and writes a
+        .pstats file to profile_file (PROFILE_FILE by default); the
+        profile_top hottest functions are added to the run report. The
+        sampler covers every thread as the run normally executes. cProfile
+        only sees its own thread, so that mode runs every target and
+        deletion on the calling thread, trading speed for exact call counts.
+        """
+        if profile is None:
+            return self._run_all(index, estimate)
+        if profile not in PROFILE_MODES:
+            raise ValueError(f"Unknown profile mode: {profile}")
+        profile_file = profile_file or PROFILE_FILE
+        workers = self.max_workers, self.delete_workers
+        if profile == "cprofile":
+            import cProfile
+            profiler = cProfile.Profile()
+            self.max_workers, self.delete_workers = 1, 0
+        else:
+            profiler = SamplingProfiler()
+        profiler.enable()
+        try:
+            return self._run_all(index, estimate)
+        finally:
+            profiler.disable()
+            self.max_workers, self.delete_workers = workers
+            profiler.dump_stats(profile_file)
+            self.profile = {"mode": profile, "file": profile_file,
+                            "top": profile_summary(profiler, profile_top)}
+            if profile == "sample":
+                self.profile.update(interval=profiler.interval, samples=profiler.samples,
+                                    idle_samples=profiler.idle_samples)
+            self.log(f"🔬 Profile written to {profile_file}")
     
-    def run_all(self):
-        """Run all cleaning operations"""
+    def _run_all(self, index, estimate):
         self.is_running = True
         self.start_time = time.time()
-        self.current_operation = 0
-        self.cleaned_size = 0
-        self.errors = []
+        self.mode = "clean"
+        self.found = {}
+        self.distribution = {}
+        self.profile = None
+        self.trace = RunTrace()
+        self.results = []
+        self.default_stats = TargetStats("manual")
+        self.locked = []
+        self.skip = self.locked_paths.skip_set() if self.locked_paths else set()
+        self.plan = None
+        self.credits = {}
+        self.skipped = {}
         
         self.log("=" * 60)
         self.log(f"🚀 {APP_NAME} v{APP_VERSION} STARTED")
         self.log("=" * 60)
         
-        # Run all cleaners
-        self.clean_windows_temp()
-        self.clean_recycle_bin()
-        self.clean_browser_caches()
-        self.clean_windows_logs()
-        self.flush_dns()
-        self.clean_prefetch()
-        self.clean_thumbnails()
-        self.clean_recent_files()
-        self.run_disk_cleanup()
-        self.clean_store_cache()
-        self.clean_font_cache()
-        self.clean_error_reports()
-        self.clean_setup_logs()
-        self.clean_memory_dumps()
+        if index is None and self.schedule is not None:
+            self.skipped = self.schedule.skip(self.file_targets)
+            for name, predicted in self.skipped.items():
+                self.log(f"⏭️ Skipped {name}: about {predicted / (1024 * 1024):.2f} MB regrown since its last clean")
+        if index is None:
+            self.plan_targets()
+        # Scan statistics of the estimate pass, per target
+        scans = {}
+        if index is not None:
+            file_targets = [(category, partial(self.clean_indexed, index, category))
+                            for category in index.categories]
+        elif estimate:
+            start = time.perf_counter()
+            index = self.estimate()
+            scans = {stats.name: stats for stats in self.results}
+            self.trace.add("estimate", "phase", start, files=index.total_files, bytes=index.total_bytes)
+            # Files were just checked against their rule, so only targets
+            # with filters skip files that changed since
+            file_targets = [(name, partial(self.clean_indexed, index, name, not self.rules[name].match_all))
+                            for name in self.active_targets]
+        else:
+            file_targets = [(name, None) for name in self.active_targets]
+        if index is not None:
+            total_files, total_bytes = index.total_files, index.total_bytes
+            self.distribution = index.columns.summary()
+        else:
+            total_files = total_bytes = 0
+        system_targets = [(name, None) for name in self.system_targets]
+        self.results = []
+        self.progress = ProgressTracker(self.report_progress, total_files, total_bytes,
+                                        len(file_targets) + len(system_targets))
+        
+        if self.max_workers <= 1:
+            # Sequential run in the original order
+            for name, action in file_targets + system_targets:
+                self.run_target(name, action)
+        else:
+            # External tools run alongside the filesystem targets instead
+            # of blocking them; the run ends when the slowest target does
+            from concurrent.futures import ThreadPoolExecutor
+            with ThreadPoolExecutor(max_workers=max(1, len(system_targets))) as tools, \
+                    ThreadPoolExecutor(max_workers=self.max_workers) as pool:
+                futures = [tools.submit(self.run_target, *target) for target in system_targets]
+                futures += [pool.submit(self.run_target, *target) for target in file_targets]
+                for future in futures:
+                    future.result()
+        
+        for stats in self.results:
+            scan = scans.get(stats.name)
+            if scan is not None:
+                # The scan saw every file, including those the clean verified
+                stats.files_scanned = scan.files_scanned
+                stats.stat_calls += scan.stat_calls
+        self.settle_locked()
+        self.apply_credits()
+        
+        with self._lock:
+            pool, self.deletion_pool = self.deletion_pool, None
+            runner, self.command_runner = self.command_runner, None
+        if pool:
+            pool.close()
+        if runner:
+            runner.close()
+        self.progress.finish()
         
         # Final stats
         elapsed_time = time.time() - self.start_time
+        self.elapsed = elapsed_time
+        cleaned_size = self.cleaned_size
+        errors = self.errors
         self.log("=" * 60)
-        self.log("✅ CLEANING COMPLETED!")
-        self.log(f"📊 Space Freed: {self.cleaned_size:.2f} MB")
+        if self.token.cancelled:
+            finished = sum(1 for stats in self.results if not stats.cancelled)
+            self.log("⏹️ CLEANING STOPPED BY USER")
+            self.log(f"🎯 Targets Finished: {finished} of {len(file_targets) + len(system_targets)}")
+        else:
+            self.log("✅ CLEANING COMPLETED!")
+        self.log(f"📊 Space Freed: {cleaned_size:.2f} MB")
         self.log(f"⏱️ Time Taken: {elapsed_time:.1f} seconds")
-        self.log(f"⚠️ Errors: {len(self.errors)}")
+        self.log(f"⚠️ Errors: {len(errors)}")
+        if self.skipped:
+            self.log(f"⏭️ Skipped: {len(self.skipped)} targets not regrown enough to clean")
+        failures = self.failures
+        if any(failures.values()):
+            self.log(f"🔒 Not deleted: {failures['in_use']} in use, {failures['permission']} access denied, "
+                     f"{failures['vanished']} vanished, {failures['other']} other, "
+                     f"{failures['known_locked']} known locked")
+        self.log("⏱️ Time per target:")
+        for stats in sorted(self.results, key=lambda stats: stats.elapsed, reverse=True):
+            self.log(f"  {stats.name}: {stats.elapsed:.2f}s - {stats.files_deleted}/{stats.files_scanned} files, "
+                     f"{stats.freed_mb:.2f} MB ({stats.mb_per_second:.1f} MB/s)")
+        self.log_distribution()
         self.log("=" * 60)
         
+        if self.history is not None:
+            self.history.record(self.start_time, elapsed_time, self.token.cancelled, self.results, self.skipped)
         self.is_running = False
-        self.update_status("Cleaning completed")
+        self.update_status("Cleaning stopped" if self.token.cancelled else "Cleaning completed")
+        
+        return cleaned_size, len(errors), elapsed_time
+
+
+# =============================================================================
+# WATCH MODE
+# =============================================================================
+
+# Targets watched by default: caches that keep growing between cleans
+WATCH_TARGETS = ("windows_temp", "browser_caches", "error_reports", "memory_dumps")
+WATCH_BACKENDS = ("auto", "windows", "inotify", "poll")
+WATCH_THRESHOLD = 100 * 1024 * 1024
+# Changes are gathered this long before the folders are rescanned
+WATCH_SETTLE = 2.0
+WATCH_POLL_SECONDS = 5.0
+
+
+class DirectoryTotals:
+    """Per-directory file and byte totals of watched trees
+    
+    Only the files directly in a directory are summed, so memory grows with
+    the number of directories rather than files, and a change is accounted
+    for by rescanning the one directory it touched. Each record also keeps
+    the directory mtime and subdirectory names, which show the polling
+    backend what changed and which subtrees appeared or went away.
+    """
+    
+    def __init__(self):
+        # path -> [files, bytes, mtime_ns, subdirectory names]
+        self.dirs = {}
+    
+    def add_tree(self, root):
+        """Scan a tree and return the directories added"""
+        added = []
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            record = self._read(path)
+            if record is None:
+                continue
+            self.dirs[path] = record
+            added.append(path)
+            stack.extend(os.path.join(path, name) for name in record[3])
+        return added
+    
+    def remove_tree(self, root):
+        """Forget a tree and return the bytes it held"""
+        nbytes = 0
+        stack = [root]
+        while stack:
+            path = stack.pop()
+            record = self.dirs.pop(path, None)
+            if record is not None:
+                nbytes += record[1]
+                stack.extend(os.path.join(path, name) for name in record[3])
+        return nbytes
+    
+    def update(self, path):
+        """Rescan a known directory
         
-        return self.cleaned_size, len(self.errors), elapsed_time
+        Returns (byte change of its tree, whether its own files grew,
+        directories added below it).
+        """
+        old = self.dirs.get(path)
+        if old is None:
+            return 0, False, []
+        record = self._read(path)
+        if record is None:
+            return -self.remove_tree(path), False, []
+        self.dirs[path] = record
+        delta = record[1] - old[1]
+        grew = record[1] > old[1] or record[0] > old[0]
+        added = []
+        for name in set(record[3]) - set(old[3]):
+            new = self.add_tree(os.path.join(path, name))
+            delta += sum(self.dirs[subdir][1] for subdir in new)
+            added += new
+        for name in set(old[3]) - set(record[3]):
+            delta -= self.remove_tree(os.path.join(path, name))
+        return delta, grew, added
+    
+    def total(self, root):
+        """Get the bytes of the tree at root"""
+        return sum(record[1] for path, record in self.dirs.items()
+                   if path == root or path.startswith(root + os.sep))
+    
+    @staticmethod
+    def _read(path):
+        files = nbytes = 0
+        subdirs = []
+        try:
+            mtime_ns = os.stat(path).st_mtime_ns
+            with os.scandir(path) as entries:
+                for entry in entries:
+                    try:
+                        if entry.is_dir(follow_symlinks=False):
+                            subdirs.append(entry.name)
+                        else:
+                            files += 1
+                            nbytes += entry.stat(follow_symlinks=False).st_size
+                    except OSError:
+                        pass
+        except OSError:
+            return None
+        return [files, nbytes, mtime_ns, tuple(subdirs)]
+
+
+class PollingWatch:
+    """Find changed directories by comparing their mtimes every interval
+    
+    Costs one stat per watched directory per round and works anywhere. A
+    file growing in place does not touch its directory's mtime, so only
+    files created, renamed or deleted are noticed. Given a set of dirs,
+    only those directories are checked.
+    """
+    
+    def __init__(self, totals, interval=WATCH_POLL_SECONDS, dirs=None):
+        self.totals = totals
+        self.interval = interval
+        self.dirs = dirs
+        self._next = time.monotonic() + interval
+    
+    def watch(self, paths):
+        """Directories are found through totals; nothing to register, nothing fails"""
+        return []
+    
+    def changes(self, timeout):
+        """Wait up to timeout; get the changed directories of a due round"""
+        wait = self._next - time.monotonic()
+        if wait > timeout:
+            time.sleep(timeout)
+            return set()
+        time.sleep(max(0.0, wait))
+        self._next = time.monotonic() + self.interval
+        changed = set()
+        dirs = self.totals.dirs
+        for path in list(dirs if self.dirs is None else self.dirs):
+            record = dirs.get(path)
+            if record is None:
+                if self.dirs is not None:
+                    self.dirs.discard(path)
+                continue
+            try:
+                if os.stat(path).st_mtime_ns != record[2]:
+                    changed.add(path)
+            except OSError:
+                changed.add(path)
+        return changed
+    
+    def close(self):
+        """Nothing to release"""
+
+
+class InotifyWatch:
+    """Linux inotify watches, one per directory
+    
+    Reports the directory of every create, delete, move and write. A
+    queue overflow is reported as None: anything may have changed.
+    Directories that cannot be watched, typically once
+    fs.inotify.max_user_watches is reached, are polled for mtime changes
+    instead.
+    """
+    
+    # IN_MODIFY, IN_CLOSE_WRITE, IN_MOVED_FROM, IN_MOVED_TO, IN_CREATE,
+    # IN_DELETE, IN_DELETE_SELF
+    MASK = 0x2 | 0x8 | 0x40 | 0x80 | 0x100 | 0x200 | 0x400
+    IN_Q_OVERFLOW = 0x4000
+    IN_IGNORED = 0x8000
+    
+    def __init__(self, totals, interval=WATCH_POLL_SECONDS):
+        import ctypes
+        import ctypes.util
+        self._libc = ctypes.CDLL(ctypes.util.find_library("c") or "libc.so.6", use_errno=True)
+        self._fd = self._libc.inotify_init1(os.O_NONBLOCK | os.O_CLOEXEC)
+        if self._fd < 0:
+            raise OSError(ctypes.get_errno(), "inotify_init1 failed")
+        self._paths = {}
+        # Directories inotify refused, and why the last one was refused
+        self.unwatched = set()
+        self.error = None
+        self._poll = PollingWatch(totals, interval, self.unwatched)
+    
+    def watch(self, paths):
+        """Start watching directories; returns those left to polling"""
+        import ctypes
+        failed = []
+        for path in paths:
+            wd = self._libc.inotify_add_watch(self._fd, os.fsencode(path), self.MASK)
+            if wd >= 0:
+                self._paths[wd] = path
+            else:
+                self.error = os.strerror(ctypes.get_errno())
+                failed.append(path)
+        self.unwatched.update(failed)
+        return failed
+    
+    def changes(self, timeout):
+        """Wait up to timeout for events; get the changed directories"""
+        import select
+        import struct
+        changed = self._poll.changes(0) if self.unwatched else set()
+        if not select.select([self._fd], [], [], timeout)[0]:
+            return changed
+        while True:
+            try:
+                data = os.read(self._fd, 64 * 1024)
+            except BlockingIOError:
+                break
+            offset = 0
+            while offset < len(data):
+                wd, mask, _, length = struct.unpack_from("iIII", data, offset)
+                offset += 16 + length
+                if mask & self.IN_Q_OVERFLOW:
+                    changed.add(None)
+                elif wd in self._paths:
+                    changed.add(self._paths[wd])
+                    if mask & self.IN_IGNORED:
+                        del self._paths[wd]
+        return changed
+    
+    def close(self):
+        """Drop every watch"""
+        os.close(self._fd)
+
+
+class WindowsChangeWatch:
+    """ReadDirectoryChangesW on each watched root, one thread per root
+    
+    Every change below a root names the entry that changed; its directory
+    is reported, and the entry itself too in case it is a directory. A
+    buffer overflow is reported as None: anything may have changed.
+    """
+    
+    # FILE_NOTIFY_CHANGE_FILE_NAME, _DIR_NAME, _SIZE, _LAST_WRITE
+    FILTER = 0x1 | 0x2 | 0x8 | 0x10
+    
+    def __init__(self, roots):
+        import ctypes
+        self._kernel32 = windows_dll("kernel32")
+        self._kernel32.CreateFileW.restype = ctypes.c_void_p
+        self._queue = queue.Queue()
+        self._handles = []
+        for root in roots:
+            # FILE_LIST_DIRECTORY, shared read/write/delete, OPEN_EXISTING,
+            # FILE_FLAG_BACKUP_SEMANTICS to open a directory
+            handle = self._kernel32.CreateFileW(root, 0x1, 0x7, None, 3, 0x02000000, None)
+            if handle is None or handle == ctypes.c_void_p(-1).value:
+                continue
+            self._handles.append(handle)
+            threading.Thread(target=self._read, args=(root, handle), daemon=True).start()
+    
+    def _read(self, root, handle):
+        import ctypes
+        import struct
+        from ctypes import wintypes
+        buffer = ctypes.create_string_buffer(64 * 1024)
+        returned = wintypes.DWORD()
+        while self._kernel32.ReadDirectoryChangesW(ctypes.c_void_p(handle), buffer, len(buffer), True,
+                                                   self.FILTER, ctypes.byref(returned), None, None):
+            if not returned.value:
+                self._queue.put(None)
+                continue
+            offset = 0
+            while True:
+                next_offset, _, length = struct.unpack_from("III", buffer.raw, offset)
+                name = buffer.raw[offset + 12:offset + 12 + length].decode("utf-16-le")
+                path = os.path.join(root, name)
+                self._queue.put(os.path.dirname(path))
+                self._queue.put(path)
+                if not next_offset:
+                    break
+                offset += next_offset
+    
+    def watch(self, paths):
+        """Subtrees are watched with their root; nothing to register, nothing fails"""
+        return []
+    
+    def changes(self, timeout):
+        """Wait up to timeout for events; get the changed directories"""
+        try:
+            changed = {self._queue.get(timeout=timeout)}
+        except queue.Empty:
+            return set()
+        while True:
+            try:
+                changed.add(self._queue.get_nowait())
+            except queue.Empty:
+                return changed
+    
+    def close(self):
+        """Stop every reader thread"""
+        import ctypes
+        for handle in self._handles:
+            self._kernel32.CancelIoEx(ctypes.c_void_p(handle), None)
+            self._kernel32.CloseHandle(ctypes.c_void_p(handle))
+
+
+def open_watch_backend(kind, roots, totals, interval=WATCH_POLL_SECONDS):
+    """Open a change watcher: "windows", "inotify", "poll" or "auto" for the best one"""
+    if kind == "auto":
+        kind = "windows" if IS_WINDOWS else "inotify" if sys.platform.startswith("linux") else "poll"
+    if kind == "windows":
+        return WindowsChangeWatch(roots)
+    if kind == "inotify":
+        try:
+            return InotifyWatch(totals, interval)
+        except (OSError, AttributeError):
+            pass
+    return PollingWatch(totals, interval)
+
+
+class TargetWatcher:
+    """Keep live sizes of targets and clean them as they grow
+    
+    The folders of the targets are scanned once into DirectoryTotals, then
+    kept current from change notifications: only the directories a change
+    touched are rescanned. A target is cleaned once it has grown by
+    threshold bytes since its last clean, and then only in the directories
+    whose files grew, through Windows11Cleaner.clean_folders(). Nothing
+    has been cleaned when watching starts, so every directory counts as
+    grown and a target already past the threshold is cleaned in full.
+    """
+    
+    def __init__(self, cleaner, threshold=WATCH_THRESHOLD, backend="auto",
+                 settle=WATCH_SETTLE, poll_interval=WATCH_POLL_SECONDS):
+        self.cleaner = cleaner
+        self.threshold = threshold
+        self.backend_kind = backend
+        self.settle = settle
+        self.poll_interval = poll_interval
+        self.totals = DirectoryTotals()
+        self.backend = None
+        # Watched roots: [target, root, rule, bytes, bytes after last clean, grown dirs]
+        self.roots = []
+        self.cleans = 0
+        self.files_deleted = 0
+        self.freed_bytes = 0
+    
+    def start(self):
+        """Scan the targets and open the change watcher"""
+        cleaner = self.cleaner
+        cleaner.skip = cleaner.locked_paths.skip_set() if cleaner.locked_paths else set()
+        plan = cleaner.plan_targets()
+        for name, walks in plan.roots.items():
+            for root, rule in walks:
+                if os.path.isdir(root):
+                    dirs = self.totals.add_tree(root)
+                    self.roots.append([name, root, rule, self.totals.total(root), 0, set(dirs)])
+        self.backend = open_watch_backend(self.backend_kind, [root[1] for root in self.roots],
+                                          self.totals, self.poll_interval)
+        failed = self.backend.watch(list(self.totals.dirs))
+        total = sum(root[3] for root in self.roots)
+        self.cleaner.log(f"👁️ Watching {len(self.roots)} folders ({len(self.totals.dirs)} directories, "
+                         f"{total / (1024 * 1024):.2f} MB) with {type(self.backend).__name__}")
+        self.report_unwatched(failed)
+    
+    def report_unwatched(self, failed):
+        """Warn about directories the backend could not watch and polls instead"""
+        if failed:
+            self.cleaner.log(f"⚠️ Could not watch {len(failed)} directories ({self.backend.error}); "
+                             f"polling them every {self.poll_interval:g}s instead", "WARNING")
+    
+    def run(self):
+        """Watch and clean until the cleaner's run is cancelled"""
+        token = self.cleaner.token
+        self.start()
+        try:
+            self.clean_grown()
+            while not token.cancelled:
+                changed = self.backend.changes(1.0)
+                if not changed:
+                    continue
+                deadline = time.monotonic() + self.settle
+                while not token.cancelled and time.monotonic() < deadline:
+                    changed |= self.backend.changes(max(0.0, deadline - time.monotonic()))
+                self.apply(changed)
+                self.clean_grown()
+        finally:
+            self.backend.close()
+    
+    def root_of(self, path):
+        """Get the watched root a directory belongs to"""
+        best = None
+        for root in self.roots:
+            if (path == root[1] or path.startswith(root[1] + os.sep)) and \
+                    (best is None or len(root[1]) > len(best[1])):
+                best = root
+        return best
+    
+    def apply(self, changed):
+        """Rescan the changed directories, parents first"""
+        if None in changed:
+            changed = set(self.totals.dirs)
+        for path in sorted(changed, key=len):
+            root = self.root_of(path)
+            if root is None:
+                continue
+            delta, grew, added = self.totals.update(path)
+            root[3] += delta
+            if grew:
+                root[5].add(path)
+            if added:
+                root[5].update(added)
+                self.report_unwatched(self.backend.watch(added))
+    
+    def clean_grown(self):
+        """Clean the grown directories of every target past the threshold"""
+        targets = {}
+        for root in self.roots:
+            targets.setdefault(root[0], []).append(root)
+        for name, roots in targets.items():
+            grown = sum(root[3] - root[4] for root in roots)
+            if grown < self.threshold or self.cleaner.token.cancelled:
+                continue
+            folders = sum(len(root[5]) for root in roots)
+            self.cleaner.log(f"👁️ {name} grew by {grown / (1024 * 1024):.2f} MB; "
+                             f"cleaning {folders} changed folders")
+            self.cleaner.refresh_rules()
+            cleaned = []
+            for root in roots:
+                dirs = sorted(path for path in root[5] if path in self.totals.dirs)
+                if dirs:
+                    self.cleaner.clean_folders(name, root[2], root[1], dirs)
+                cleaned.append((root, dirs))
+            # Files in use are retried now rather than piling up until exit
+            self.cleaner.settle_locked()
+            for root, dirs in cleaned:
+                for path in dirs:
+                    root[3] += self.totals.update(path)[0]
+                root[4] = root[3]
+                root[5].clear()
+            self.cleaner.apply_credits()
+            for stats in self.cleaner.clear_results():
+                self.files_deleted += stats.files_deleted
+                self.freed_bytes += stats.freed_bytes
+            self.cleans += 1
+
+
+# =============================================================================
+# LOG STORAGE
+# =============================================================================
+
+def log_level(line):
+    """Get the level of a line formatted by Windows11Cleaner.log"""
+    if line[11:12] == "[":
+        end = line.find("]", 12)
+        if end > 0:
+            return line[12:end]
+    return "INFO"
+
+
+class LogBuffer:
+    """Fixed-capacity log storage backed by a ring buffer
+    
+    Lines pushed out of the buffer are appended to a rotating log file, so
+    memory stays bounded however many lines a run produces.
+    """
+    
+    def __init__(self, capacity=LOG_BUFFER_LINES, spill_path=LOG_FILE,
+                 max_bytes=5 * 1024 * 1024, backups=3):
+        self.lines = deque(maxlen=capacity)
+        self.spill_path = spill_path
+        self.max_bytes = max_bytes
+        self.backups = backups
+        self._handler = None
+    
+    def append(self, line):
+        """Add a line, spilling the oldest one to disk when full"""
+        if len(self.lines) == self.lines.maxlen:
+            self.spill(self.lines[0])
+        self.lines.append(line)
+    
+    def spill(self, line):
+        """Write a line to the rotating log file"""
+        if not self.spill_path:
+            return
+        import logging
+        if self._handler is None:
+            from logging.handlers import RotatingFileHandler
+            try:
+                self._handler = RotatingFileHandler(self.spill_path, maxBytes=self.max_bytes,
+                                                    backupCount=self.backups,
+                                                    encoding="utf-8", delay=True)
+            except OSError:
+                self.spill_path = None
+                return
+        self._handler.handle(logging.makeLogRecord({"msg": line}))
+    
+    def clear(self):
+        """Drop all lines held in memory"""
+        self.lines.clear()
+    
+    @staticmethod
+    def matches(line, level=None, text=None):
+        """Check a line against a level and a case-insensitive search text"""
+        if level and log_level(line) != level:
+            return False
+        return not text or text.lower() in line.lower()
+    
+    def filter(self, level=None, text=None):
+        """Get the buffered lines matching a level and search text"""
+        return [line for line in self.lines if self.matches(line, level, text)]
 
 
 # =============================================================================
 # PROFESSIONAL GUI - GITHUB READY
 # =============================================================================
 
+def load_gui_modules():
+    """Import tkinter on first use so headless runs never load it"""
+    global tk, ttk, messagebox, tkfont
+    import tkinter as tk
+    from tkinter import ttk, messagebox
+    from tkinter import font as tkfont
+
+
 class FresherProGUI:
     def __init__(self):
+        load_gui_modules()
         self.root = tk.Tk()
         self.root.title(f"{APP_NAME} v{APP_VERSION}")
         self.root.geometry("900x700")
@@ -411,6 +3806,20 @@ class FresherProGUI:
         # Variables
         self.cleaner = None
         self.is_running = False
+        self.preview_index = None
+        self.scan_cache = None
+        
+        # Log storage; the text widget only renders the visible window
+        self.log_buffer = LogBuffer()
+        self.log_view = self.log_buffer.lines
+        self.log_view_start = 0
+        self.log_follow = True
+        self.log_filter = None
+        
+        # Updates queued by the cleaner thread, applied on the Tk thread
+        self.log_queue = deque()
+        self.pending_progress = None
+        self.pending_status = None
         
         # Create UI
         self.create_header()
@@ -419,6 +3828,7 @@ class FresherProGUI:
         
         # Bind events
         self.root.protocol("WM_DELETE_WINDOW", self.on_closing)
+        self.root.after(UI_REFRESH_MS, self.drain_ui_queue)
     
     def center_window(self):
         """Center window on screen"""
@@ -685,6 +4095,22 @@ class FresherProGUI:
                                     bg=COLORS['bg_medium'],
                                     fg=COLORS['text_primary'])
         self.status_label.pack()
+        
+        # Size and age distribution of the largest categories
+        self.distribution_label = tk.Label(stats_frame,
+                                          text="",
+                                          font=('Consolas', 8),
+                                          bg=COLORS['bg_dark'],
+                                          fg=COLORS['text_muted'],
+                                          justify=tk.LEFT,
+                                          anchor=tk.W)
+        self.distribution_label.pack(fill=tk.X, padx=5, pady=(5,0))
+    
+    def update_distribution(self, distribution, limit=4):
+        """Show the distribution lines of the largest categories"""
+        largest = sorted(distribution.items(), key=lambda item: item[1]["bytes"], reverse=True)[:limit]
+        self.distribution_label.config(text="\n".join(distribution_line(category, info)
+                                                      for category, info in largest))
     
     def create_log_section(self, parent):
         """Create log section with controls"""
@@ -726,6 +4152,31 @@ class FresherProGUI:
                                  state=tk.DISABLED)
         self.stop_btn.pack(side=tk.LEFT, padx=2)
         
+        self.pause_btn = tk.Button(control_frame,
+                                  text="⏸ PAUSE",
+                                  bg=COLORS['warning'],
+                                  fg='white',
+                                  font=('Segoe UI', 11, 'bold'),
+                                  width=10,
+                                  height=2,
+                                  bd=0,
+                                  cursor='hand2',
+                                  command=self.toggle_pause,
+                                  state=tk.DISABLED)
+        self.pause_btn.pack(side=tk.LEFT, padx=2)
+        
+        self.preview_btn = tk.Button(control_frame,
+                                    text="🔍 PREVIEW",
+                                    bg=COLORS['accent'],
+                                    fg='white',
+                                    font=('Segoe UI', 11, 'bold'),
+                                    width=12,
+                                    height=2,
+                                    bd=0,
+                                    cursor='hand2',
+                                    command=self.start_preview)
+        self.preview_btn.pack(side=tk.LEFT, padx=2)
+        
         self.clear_btn = tk.Button(control_frame,
                                   text="🗑️ CLEAR LOG",
                                   bg=COLORS['bg_light'],
@@ -738,23 +4189,54 @@ class FresherProGUI:
                                   command=self.clear_log)
         self.clear_btn.pack(side=tk.LEFT, padx=2)
         
+        # Level filter and search
+        self.log_search_var = tk.StringVar()
+        search_entry = tk.Entry(control_frame,
+                                textvariable=self.log_search_var,
+                                bg=COLORS['bg_light'],
+                                fg=COLORS['text_primary'],
+                                insertbackground=COLORS['text_primary'],
+                                font=('Segoe UI', 10),
+                                width=20,
+                                bd=0)
+        search_entry.pack(side=tk.RIGHT, padx=2, ipady=6)
+        
+        self.log_level_var = tk.StringVar(value="ALL")
+        level_menu = tk.OptionMenu(control_frame, self.log_level_var, "ALL", *LOG_LEVELS)
+        level_menu.config(bg=COLORS['bg_light'],
+                          fg=COLORS['text_primary'],
+                          activebackground=COLORS['bg_hover'],
+                          font=('Segoe UI', 10),
+                          highlightthickness=0,
+                          bd=0)
+        level_menu.pack(side=tk.RIGHT, padx=2)
+        
+        self.log_search_var.trace_add("write", self.apply_log_filter)
+        self.log_level_var.trace_add("write", self.apply_log_filter)
+        
         # Log text area with scrollbar
         text_frame = tk.Frame(log_frame, bg=COLORS['bg_dark'])
         text_frame.pack(fill=tk.BOTH, expand=True, padx=10, pady=5)
         
+        log_font = tkfont.Font(family='Consolas', size=10)
+        self.log_line_height = log_font.metrics('linespace')
         self.log_text = tk.Text(text_frame,
                                bg=COLORS['bg_light'],
                                fg='#00ff00',
-                               font=('Consolas', 10),
-                               wrap=tk.WORD,
+                               font=log_font,
+                               wrap=tk.NONE,
                                height=12,
                                bd=1,
                                relief=tk.SUNKEN)
         self.log_text.pack(side=tk.LEFT, fill=tk.BOTH, expand=True)
         
-        scrollbar = tk.Scrollbar(text_frame, command=self.log_text.yview)
-        scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
-        self.log_text.config(yscrollcommand=scrollbar.set)
+        self.log_scrollbar = tk.Scrollbar(text_frame, command=self.scroll_log)
+        self.log_scrollbar.pack(side=tk.RIGHT, fill=tk.Y)
+        
+        self.log_text.bind("<MouseWheel>", self.on_log_wheel)
+        self.log_text.bind("<Button-4>", self.on_log_wheel)
+        self.log_text.bind("<Button-5>", self.on_log_wheel)
+        self.log_text.bind("<Configure>", lambda event: self.render_log())
     
     def create_footer(self):
         """Create application footer"""
@@ -779,67 +4261,243 @@ class FresherProGUI:
                                   fg=COLORS['text_muted'])
         copyright_label.pack(side=tk.RIGHT, padx=15, pady=10)
     
+    def queue_log(self, message):
+        """Queue a log line from the cleaner thread"""
+        self.log_queue.append(message)
+    
+    def queue_progress(self, value):
+        """Queue a progress update; only the latest value is shown"""
+        self.pending_progress = value
+    
+    def queue_status(self, status):
+        """Queue a status update; only the latest value is shown"""
+        self.pending_status = status
+    
+    def flush_ui_queue(self):
+        """Apply queued updates with one text insert per batch"""
+        lines = []
+        while self.log_queue and len(lines) < UI_MAX_LINES_PER_BATCH:
+            lines.append(self.log_queue.popleft())
+        if lines:
+            self.add_log_lines(lines)
+        
+        progress, self.pending_progress = self.pending_progress, None
+        if progress is not None:
+            self.update_progress(progress)
+        status, self.pending_status = self.pending_status, None
+        if status is not None:
+            self.update_status(status)
+    
+    def drain_ui_queue(self):
+        """Periodically apply updates queued by the cleaner thread"""
+        self.flush_ui_queue()
+        self.root.after(UI_REFRESH_MS, self.drain_ui_queue)
+    
+    def add_log_lines(self, lines):
+        """Store log lines and render the view once"""
+        for line in lines:
+            self.log_buffer.append(line)
+            if self.log_filter and self.log_buffer.matches(line, *self.log_filter):
+                self.log_view.append(line)
+        self.render_log()
+    
+    def log_rows(self):
+        """Number of log lines that fit in the text widget"""
+        height = self.log_text.winfo_height()
+        if height <= 1:
+            return int(self.log_text.cget('height'))
+        return max(1, height // self.log_line_height)
+    
+    def render_log(self):
+        """Render the visible window of the log view"""
+        rows = self.log_rows()
+        total = len(self.log_view)
+        last_start = max(0, total - rows)
+        if self.log_follow:
+            self.log_view_start = last_start
+        start = self.log_view_start = min(self.log_view_start, last_start)
+        self.log_text.delete(1.0, tk.END)
+        self.log_text.insert(tk.END, "\n".join(islice(self.log_view, start, start + rows)))
+        if total:
+            self.log_scrollbar.set(start / total, min(1.0, (start + rows) / total))
+        else:
+            self.log_scrollbar.set(0.0, 1.0)
+    
+    def scroll_log(self, *args):
+        """Scroll the log view (scrollbar command)"""
+        rows = self.log_rows()
+        total = len(self.log_view)
+        if args[0] == "moveto":
+            start = int(float(args[1]) * total)
+        else:
+            step = int(args[1]) * (rows if args[2] == "pages" else 1)
+            start = self.log_view_start + step
+        self.log_view_start = max(0, min(start, total - rows))
+        self.log_follow = self.log_view_start >= total - rows
+        self.render_log()
+    
+    def on_log_wheel(self, event):
+        """Scroll the log view with the mouse wheel"""
+        if event.num == 4 or event.delta > 0:
+            self.scroll_log("scroll", -3, "units")
+        else:
+            self.scroll_log("scroll", 3, "units")
+        return "break"
+    
+    def apply_log_filter(self, *args):
+        """Show only buffered lines matching the level and search text"""
+        level = self.log_level_var.get()
+        text = self.log_search_var.get().strip()
+        self.log_filter = (None if level == "ALL" else level, text) if level != "ALL" or text else None
+        if self.log_filter:
+            self.log_view = deque(self.log_buffer.filter(*self.log_filter), maxlen=LOG_BUFFER_LINES)
+        else:
+            self.log_view = self.log_buffer.lines
+        self.log_follow = True
+        self.render_log()
+    
     def log_message(self, message):
         """Add message to log"""
-        self.log_text.insert(tk.END, message + "\n")
-        self.log_text.see(tk.END)
-        self.root.update_idletasks()
+        self.add_log_lines(message.split("\n"))
     
-    def update_progress(self, value):
-        """Update progress bar"""
-        self.progress_var.set(value)
-        self.progress_label.config(text=f"{value}% Complete")
-        self.root.update_idletasks()
+    def update_progress(self, info):
+        """Update progress bar from a ProgressInfo snapshot"""
+        self.progress_var.set(info.percent)
+        text = f"{info.percent}% Complete"
+        if info.files_total:
+            text += (f" • {info.files_done}/{info.files_total} files"
+                     f" • {info.bytes_done / (1024 * 1024):.0f}/{info.bytes_total / (1024 * 1024):.0f} MB"
+                     f" • {info.rate / (1024 * 1024):.1f} MB/s")
+        if info.eta and info.percent < 100:
+            minutes, seconds = divmod(int(info.eta), 60)
+            text += f" • ETA {minutes}:{seconds:02d}"
+        self.progress_label.config(text=text)
     
     def update_status(self, status):
         """Update status display"""
         self.status_label.config(text=status)
-        self.root.update_idletasks()
     
     def update_stats(self, freed, errors, elapsed):
         """Update statistics"""
         self.freed_label.config(text=f"{freed:.2f} MB")
         self.errors_label.config(text=str(errors))
         self.time_label.config(text=f"{elapsed:.1f}s")
-        self.root.update_idletasks()
+    
+    def create_cleaner(self, **options):
+        """Create the cleaner for a run; None (after telling the user) if the targets file is invalid"""
+        try:
+            return Windows11Cleaner(
+                log_callback=self.queue_log,
+                progress_callback=self.queue_progress,
+                status_callback=self.queue_status,
+                locked_paths=LockedPaths(),
+                history=RunHistory(),
+                **options
+            )
+        except (OSError, ValueError, KeyError) as e:
+            messagebox.showerror("❌ Invalid Targets File",
+                                 f"{TARGETS_FILE} could not be loaded:\n\n{e}\n\n"
+                                 f"Fix or remove the file and try again.")
+            return None
     
     def start_cleaning(self):
         """Start cleaning process"""
         if not self.is_running:
+            if self.scan_cache is None:
+                self.scan_cache = ScanCache()
+            # Built before any UI state changes, so a bad targets file
+            # leaves the window ready to try again
+            cleaner = self.create_cleaner(scan_cache=self.scan_cache)
+            if cleaner is None:
+                return
+            self.cleaner = cleaner
             self.is_running = True
             self.start_btn.config(state=tk.DISABLED, bg=COLORS['bg_light'])
             self.stop_btn.config(state=tk.NORMAL)
+            self.pause_btn.config(state=tk.NORMAL, text="⏸ PAUSE")
+            self.preview_btn.config(state=tk.DISABLED)
             self.badge_label.config(text="● CLEANING", fg=COLORS['warning'])
             self.clear_log()
             
             # Reset stats
             self.update_stats(0, 0, 0)
             
-            # Create cleaner instance
-            self.cleaner = Windows11Cleaner(
-                log_callback=self.log_message,
-                progress_callback=self.update_progress,
-                status_callback=self.update_status
-            )
-            
             # Start cleaning in thread
             self.thread = threading.Thread(target=self.run_cleaner, daemon=True)
             self.thread.start()
     
+    def start_preview(self):
+        """Start a preview scan of reclaimable space"""
+        if not self.is_running:
+            if self.scan_cache is None:
+                self.scan_cache = ScanCache()
+            cleaner = self.create_cleaner(scan_cache=self.scan_cache)
+            if cleaner is None:
+                return
+            self.cleaner = cleaner
+            self.is_running = True
+            self.start_btn.config(state=tk.DISABLED, bg=COLORS['bg_light'])
+            self.stop_btn.config(state=tk.NORMAL)
+            self.pause_btn.config(state=tk.NORMAL, text="⏸ PAUSE")
+            self.preview_btn.config(state=tk.DISABLED)
+            self.badge_label.config(text="● ANALYZING", fg=COLORS['accent'])
+            self.clear_log()
+            
+            self.thread = threading.Thread(target=self.run_preview, daemon=True)
+            self.thread.start()
+    
+    def run_preview(self):
+        """Run preview in background thread"""
+        index = self.cleaner.preview()
+        self.root.after(0, self.preview_completed, index)
+    
+    def preview_completed(self, index):
+        """Show the reclaimable space found by a preview"""
+        self.flush_ui_queue()
+        self.is_running = False
+        self.start_btn.config(state=tk.NORMAL, bg=COLORS['success'])
+        self.stop_btn.config(state=tk.DISABLED)
+        self.pause_btn.config(state=tk.DISABLED, text="⏸ PAUSE")
+        self.preview_btn.config(state=tk.NORMAL)
+        if self.cleaner.cancelled:
+            # A partial index would clean only part of each target
+            self.badge_label.config(text="● STOPPED", fg=COLORS['danger'])
+            return
+        self.preview_index = index
+        self.badge_label.config(text="● READY", fg=COLORS['success'])
+        self.update_distribution(self.cleaner.distribution)
+        reclaimable = index.total_bytes / (1024 * 1024)
+        self.freed_label.config(text=f"{reclaimable:.2f} MB")
+        self.update_status(f"{reclaimable:.0f} MB reclaimable")
+    
     def run_cleaner(self):
         """Run cleaner in background thread"""
-        freed, errors, elapsed = self.cleaner.run_all()
+        index, self.preview_index = self.preview_index, None
+        freed, errors, elapsed = self.cleaner.run_all(index)
         
         # Update UI in main thread
         self.root.after(0, self.cleaning_completed, freed, errors, elapsed)
     
     def cleaning_completed(self, freed, errors, elapsed):
         """Handle cleaning completion"""
+        self.flush_ui_queue()
         self.is_running = False
         self.start_btn.config(state=tk.NORMAL, bg=COLORS['success'])
         self.stop_btn.config(state=tk.DISABLED)
-        self.badge_label.config(text="● READY", fg=COLORS['success'])
+        self.pause_btn.config(state=tk.DISABLED, text="⏸ PAUSE")
+        self.preview_btn.config(state=tk.NORMAL)
         self.update_stats(freed, errors, elapsed)
+        self.update_distribution(self.cleaner.distribution)
+        
+        if self.cleaner.cancelled:
+            self.badge_label.config(text="● STOPPED", fg=COLORS['danger'])
+            messagebox.showinfo("⏹ Cleaning Stopped",
+                               f"Cleaning was stopped before it finished.\n\n"
+                               f"📊 Space Freed: {freed:.2f} MB\n"
+                               f"⏱️ Time Taken: {elapsed:.1f} seconds\n"
+                               f"⚠️ Errors: {errors}")
+            return
+        self.badge_label.config(text="● READY", fg=COLORS['success'])
         
         # Show completion message
         messagebox.showinfo("✅ Cleaning Complete",
@@ -850,19 +4508,35 @@ class FresherProGUI:
                            f"Your system is now running fresh!")
     
     def stop_cleaning(self):
-        """Stop cleaning process"""
+        """Stop cleaning process
+        
+        The worker threads stop at their next file; the completion handler
+        then reports what was done so far.
+        """
         if self.is_running and self.cleaner:
-            self.cleaner.is_running = False
-            self.is_running = False
-            self.start_btn.config(state=tk.NORMAL, bg=COLORS['success'])
+            self.cleaner.cancel()
             self.stop_btn.config(state=tk.DISABLED)
-            self.badge_label.config(text="● STOPPED", fg=COLORS['danger'])
-            self.log_message("\n⚠️ Cleaning stopped by user")
-            self.update_status("Stopped")
+            self.pause_btn.config(state=tk.DISABLED, text="⏸ PAUSE")
+            self.badge_label.config(text="● STOPPING", fg=COLORS['danger'])
+            self.update_status("Stopping...")
+    
+    def toggle_pause(self):
+        """Pause or resume the running operation"""
+        if not (self.is_running and self.cleaner):
+            return
+        if self.cleaner.token.paused:
+            self.cleaner.resume()
+            self.pause_btn.config(text="⏸ PAUSE")
+            self.badge_label.config(text="● CLEANING", fg=COLORS['warning'])
+        else:
+            self.cleaner.pause()
+            self.pause_btn.config(text="▶ RESUME")
+            self.badge_label.config(text="● PAUSED", fg=COLORS['accent'])
     
     def clear_log(self):
         """Clear log text"""
-        self.log_text.delete(1.0, tk.END)
+        self.log_buffer.clear()
+        self.apply_log_filter()
     
     def on_closing(self):
         """Handle window closing"""
@@ -871,7 +4545,7 @@ class FresherProGUI:
                                   "Cleaning is in progress.\n"
                                   "Are you sure you want to exit?"):
                 self.stop_cleaning()
-                time.sleep(0.5)
+                self.thread.join(timeout=5)
                 self.root.destroy()
         else:
             self.root.destroy()
@@ -882,26 +4556,276 @@ class FresherProGUI:
         self.root.mainloop()
 
 
+# =============================================================================
+# HEADLESS MODE
+# =============================================================================
+
+def target_names(rules=None):
+    """Get {short name: target name} for every cleaning target"""
+    names = {name: name for name in (rules if rules is not None else Windows11Cleaner.FILE_TARGETS)}
+    for name in Windows11Cleaner.SYSTEM_TARGETS:
+        short = name[len("clean_"):] if name.startswith("clean_") else name
+        names[short] = name
+    return names
+
+
+class EventWriter:
+    """Write cleaner events to a stream as text, NDJSON or one JSON summary"""
+    
+    def __init__(self, output="text", stream=None):
+        self.output = output
+        self.stream = stream or sys.stdout
+        self.targets = []
+        self._lock = threading.Lock()
+    
+    def emit(self, event, flush=True, **fields):
+        """Write one NDJSON event"""
+        line = json.dumps({"event": event, **fields}, ensure_ascii=False)
+        with self._lock:
+            self.stream.write(line + "\n")
+            if flush:
+                self.stream.flush()
+    
+    def on_log(self, line):
+        """Handle a log line from the cleaner"""
+        if self.output == "text":
+            with self._lock:
+                self.stream.write(line + "\n")
+                self.stream.flush()
+        elif self.output == "ndjson":
+            self.emit("log", level=log_level(line), message=line)
+    
+    def on_file(self, target, path, size):
+        """Handle a deleted (or, in a dry run, found) file"""
+        if self.output == "ndjson":
+            self.emit("file", flush=False, target=target, path=path, bytes=size)
+    
+    def on_target(self, stats):
+        """Handle a finished target"""
+        self.add_target(target=stats.name, files=stats.files_deleted, bytes=stats.freed_bytes,
+                        errors=len(stats.errors), elapsed=round(stats.elapsed, 3))
+    
+    def add_target(self, **record):
+        """Record per-target totals for the summary"""
+        self.targets.append(record)
+        if self.output == "ndjson":
+            self.emit("target", **record)
+    
+    def on_progress(self, info):
+        """Handle a progress snapshot"""
+        if self.output == "ndjson":
+            self.emit("progress", percent=info.percent, files=info.files_done,
+                      files_total=info.files_total, bytes=info.bytes_done,
+                      bytes_total=info.bytes_total, rate=round(info.rate),
+                      eta=None if info.eta is None else round(info.eta, 1))
+    
+    def summary(self, **fields):
+        """Write the final summary"""
+        if self.output == "ndjson":
+            self.emit("summary", **fields)
+        elif self.output == "json":
+            fields["targets"] = self.targets
+            with self._lock:
+                json.dump(fields, self.stream, ensure_ascii=False, indent=2)
+                self.stream.write("\n")
+                self.stream.flush()
+
+
+def build_arg_parser():
+    """Command line options"""
+    import argparse
+    parser = argparse.ArgumentParser(description=f"{APP_NAME} v{APP_VERSION}")
+    parser.add_argument("--headless", action="store_true",
+                        help="run without the GUI")
+    parser.add_argument("--targets",
+                        help="comma separated targets to run (default: all)")
+    parser.add_argument("--list-targets", action="store_true",
+                        help="list target names and exit")
+    parser.add_argument("--dry-run", action="store_true",
+                        help="report what would be removed without deleting")
+    parser.add_argument("--workers", type=int,
+                        help="targets cleaned in parallel")
+    parser.add_argument("--delete-workers", type=int,
+                        help="threads deleting files inside large trees (0: on the target's own thread)")
+    parser.add_argument("--no-estimate", action="store_true",
+                        help="skip the estimate pass used for progress")
+    parser.add_argument("--output", choices=("text", "json", "ndjson"), default="text",
+                        help="output format on stdout")
+    parser.add_argument("--rules", metavar="FILE",
+                        help="targets file (JSON, or TOML with [[targets]]) to load instead of fresher_targets.json")
+    parser.add_argument("--report", metavar="FILE",
+                        help="write a per-target timing report (JSON) to FILE")
+    parser.add_argument("--trace", metavar="FILE",
+                        help="write Chrome trace events (chrome://tracing, Perfetto) to FILE")
+    parser.add_argument("--profile", choices=PROFILE_MODES,
+                        help="profile the run (sampling across threads, or single-threaded cProfile)")
+    parser.add_argument("--profile-out", metavar="FILE",
+                        help="where to write the .pstats profile (default: fresher_profile.pstats)")
+    parser.add_argument("--adaptive", action="store_true",
+                        help="skip targets whose regrowth rate predicts little to free since their last clean")
+    parser.add_argument("--history", action="store_true",
+                        help="show regrowth trends from the run history and exit")
+    parser.add_argument("--history-file", metavar="FILE",
+                        help="run history database (default: fresher_history.db, or one inside --root)")
+    parser.add_argument("--scan-cache", nargs="?", const="", metavar="FILE",
+                        help="reuse listings of unchanged directories between runs (default file: "
+                             "fresher_scan_cache.db, or one inside --root)")
+    parser.add_argument("--watch", action="store_true",
+                        help=f"keep running, cleaning targets (default: {','.join(WATCH_TARGETS)}) as they grow")
+    parser.add_argument("--watch-threshold", type=float, default=WATCH_THRESHOLD / (1024 * 1024), metavar="MB",
+                        help="growth in MB that starts a clean of a watched target")
+    parser.add_argument("--watch-backend", choices=WATCH_BACKENDS, default="auto",
+                        help="how changes are noticed (default: the native one for this OS)")
+    parser.add_argument("--root",
+                        help="resolve target paths under this fixture root instead of the live system")
+    parser.add_argument("--make-fixture", metavar="DIR",
+                        help="build a fixture tree for benchmarking under DIR and exit")
+    parser.add_argument("--fixture-scale", type=float, default=1.0,
+                        help="multiply fixture file counts by this factor")
+    return parser
+
+
+def run_headless(args):
+    """Run the cleaner from the command line; returns the exit code"""
+    if args.watch and args.dry_run:
+        # Watching cleans as targets grow; there is nothing to preview
+        print("--watch cannot be combined with --dry-run", file=sys.stderr)
+        return 2
+    if args.rules and not os.path.isfile(args.rules):
+        print(f"Targets file not found: {args.rules}", file=sys.stderr)
+        return 2
+    try:
+        rules = load_target_rules(args.rules)
+    except (OSError, ValueError, KeyError) as e:
+        print(f"Invalid targets file: {e}", file=sys.stderr)
+        return 2
+    names = target_names(rules)
+    if args.make_fixture:
+        files, size = generate_fixture(args.make_fixture, args.fixture_scale)
+        print(f"Fixture created: {files} files ({size / (1024 * 1024):.2f} MB) in {args.make_fixture}")
+        return 0
+    if args.list_targets:
+        for short, name in names.items():
+            print(short)
+        return 0
+    if not IS_WINDOWS and not args.root:
+        # %TEMP% and friends would expand from this system's environment
+        print("Off Windows the cleaner only runs against a fixture tree; pass --root DIR",
+              file=sys.stderr)
+        return 2
+
+    # Fixture runs keep their own history, locked list and caches
+    resolver = PathResolver(args.root)
+    history = RunHistory(args.history_file or resolver.state_file(HISTORY_FILE))
+    if args.history:
+        trends = history.trends()
+        if args.output == "text":
+            for trend in trends:
+                rate = trend["bytes_per_day"]
+                rate = f"{rate / (1024 * 1024):.2f} MB/day" if rate is not None else "-"
+                print(f"{trend['target']}: {trend['cleans']} cleans, {trend['skipped']} skipped, "
+                      f"regrows {rate}, last clean {trend['last_clean'] or '-'}")
+        else:
+            json.dump(trends, sys.stdout, ensure_ascii=False, indent=2 if args.output == "json" else None)
+            print()
+        return 0
+    
+    targets = None
+    if args.targets:
+        targets = set()
+        for short in args.targets.split(","):
+            short = short.strip()
+            if short not in names and short not in names.values():
+                print(f"Unknown target: {short}", file=sys.stderr)
+                return 2
+            targets.add(names.get(short, short))
+    
+    if args.watch and targets is None:
+        targets = set(WATCH_TARGETS)
+    
+    scan_cache = None
+    if args.scan_cache is not None:
+        scan_cache = ScanCache(args.scan_cache or resolver.state_file(SCAN_CACHE_FILE))
+    
+    writer = EventWriter(args.output)
+    cleaner = Windows11Cleaner(
+        log_callback=writer.on_log,
+        progress_callback=writer.on_progress,
+        file_callback=writer.on_file,
+        target_callback=writer.on_target,
+        max_workers=args.workers,
+        delete_workers=args.delete_workers,
+        scan_cache=scan_cache,
+        targets=targets,
+        resolver=resolver,
+        rules=rules,
+        locked_paths=LockedPaths(resolver.state_file(LOCKED_PATHS_FILE)),
+        history=history,
+        schedule=CleanSchedule(history) if args.adaptive else None
+    )
+    
+    # The first Ctrl+C stops the run and still writes the summary of what
+    # was done; a second one interrupts immediately
+    import signal
+    
+    def interrupt(signum, frame):
+        signal.signal(signal.SIGINT, signal.default_int_handler)
+        cleaner.cancel()
+    
+    signal.signal(signal.SIGINT, interrupt)
+    
+    if args.watch:
+        # Runs until Ctrl+C, which is how watching normally ends
+        watcher = TargetWatcher(cleaner, int(args.watch_threshold * 1024 * 1024), args.watch_backend)
+        watcher.run()
+        writer.summary(watch=True, cleans=watcher.cleans, files=watcher.files_deleted,
+                       bytes=watcher.freed_bytes)
+        if scan_cache is not None:
+            scan_cache.close()
+        return 0
+    if args.dry_run:
+        index = cleaner.preview()
+        for category, (files, size) in index.summary().items():
+            writer.add_target(target=category, files=files, bytes=size)
+        writer.summary(dry_run=True, cancelled=cleaner.cancelled,
+                       files=index.total_files, bytes=index.total_bytes)
+    else:
+        freed, errors, elapsed = cleaner.run_all(estimate=not args.no_estimate, profile=args.profile,
+                                                 profile_file=args.profile_out)
+        writer.summary(dry_run=False, cancelled=cleaner.cancelled,
+                       files=sum(t.files_deleted for t in cleaner.results),
+                       bytes=sum(t.freed_bytes for t in cleaner.results),
+                       errors=errors, failures=cleaner.failures, skipped=sorted(cleaner.skipped),
+                       elapsed=round(elapsed, 3))
+    if args.report:
+        cleaner.write_report(args.report)
+    if args.trace:
+        cleaner.trace.write(args.trace)
+    if scan_cache is not None:
+        scan_cache.close()
+    return 130 if cleaner.cancelled else 0
+
+
 # =============================================================================
 # MAIN ENTRY POINT
 # =============================================================================
 
 def main():
     """Main function"""
+    args = build_arg_parser().parse_args()
+    if args.headless or args.list_targets or args.make_fixture:
+        sys.exit(run_headless(args))
+    
     # Check if running on Windows
-    if not sys.platform.startswith('win'):
+    if not IS_WINDOWS:
         print("❌ This tool is designed for Windows 11 only!")
         input("\nPress Enter to exit...")
         sys.exit(1)
     
     # Check for admin privileges
-    try:
-        is_admin = ctypes.windll.shell32.IsUserAnAdmin()
-        if not is_admin:
-            print("⚠️ Some features require Administrator privileges!")
-            print("   For best results, run as Administrator.\n")
-    except:
-        pass
+    if is_admin() is False:
+        print("⚠️ Some features require Administrator privileges!")
+        print("   For best results, run as Administrator.\n")
     
     # Run the GUI
     try:
@@ -0,0 +1,101 @@
+"""First and follow-up clean of a deep cache hierarchy, with and without remove_dirs
+
+Builds a browser-cache-like tree: --dirs leaf folders nested --depth
+levels below the target folder (Chrome's Cache_Data and Firefox's
+cache2 look like this), --files in each. A fresh copy is cleaned four
+ways:
+
+  files only   DeletionPool without remove_dirs; every folder stays
+  remove_dirs  DeletionPool removing emptied subtrees bottom-up
+  prune        files only, then prune_empty_dirs (how cleans from a
+               preview index remove folders)
+  rmtree       shutil.rmtree of the target folder and mkdir, for reference
+
+and then cleaned again, which is what every later run pays for the
+folders left behind. Each way runs --rounds times and the best times are
+reported.
+
+    python benchmarks/bench_deep_tree.py --dirs 4096 --depth 3 --files 5
+"""
+import argparse
+import os
+import shutil
+import sys
+
+from common import load_engine, make_root, remove, timed
+
+
+def make_deep_tree(root, dirs, depth, files, size):
+    """Create dirs leaf folders depth levels deep, named by hex digits as in cache folders"""
+    data = bytes(size)
+    for number in range(dirs):
+        digits = f"{number:0{depth}x}"[-depth:] if depth else ""
+        parts = [digits[level] for level in range(depth - 1)] + [f"{number:06x}"]
+        path = os.path.join(root, *parts)
+        os.makedirs(path, exist_ok=True)
+        for file_number in range(files):
+            with open(os.path.join(path, f"{file_number:04d}_0"), "wb") as f:
+                f.write(data)
+    return dirs * files
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--dirs", type=int, default=4096, help="leaf folders")
+    parser.add_argument("--depth", type=int, default=3, help="levels of folders above each leaf")
+    parser.add_argument("--files", type=int, default=5, help="files in each leaf folder")
+    parser.add_argument("--size", type=int, default=4096, help="bytes per file")
+    parser.add_argument("--workers", type=int, default=4, help="DeletionPool workers")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--dir", help="parent folder of the trees (default: system temp)")
+    args = parser.parse_args()
+    engine = load_engine()
+    rule = engine.TargetRule({"name": "cache", "remove_dirs": True})
+    pool = engine.DeletionPool(args.workers)
+
+    def files_only(root):
+        return pool.clean(root).dirs_removed
+
+    def remove_dirs(root):
+        return pool.submit(root, rule=rule).wait().dirs_removed
+
+    def prune(root):
+        pool.clean(root)
+        return engine.prune_empty_dirs(root)
+
+    def rmtree(root):
+        folders = sum(len(names) for _, names, _ in os.walk(root))
+        shutil.rmtree(root)
+        os.mkdir(root)
+        return folders
+
+    print(f"{args.dirs} leaf folders {args.depth} deep, {args.files} files each, {args.workers} workers")
+    print(f"{'clean':<12}{'first s':>9}{'removed':>9}{'next s':>9}{'folders left':>14}")
+    try:
+        for name, clean in (("files only", files_only), ("remove_dirs", remove_dirs),
+                            ("prune", prune), ("rmtree", rmtree)):
+            runs = []
+            for _ in range(args.rounds):
+                parent = make_root(args.dir)
+                try:
+                    target = os.path.join(parent, "Cache_Data")
+                    made = make_deep_tree(target, args.dirs, args.depth, args.files, args.size)
+                    first, removed = timed(clean, target)
+                    left = sum(len(names) for _, names, _ in os.walk(target))
+                    assert not any(files for _, _, files in os.walk(target)), name
+                    following, job = timed(pool.clean, target)
+                    assert job.files_deleted == 0
+                    runs.append((first, removed, following, left))
+                finally:
+                    remove(parent)
+            first = min(run[0] for run in runs)
+            following = min(run[2] for run in runs)
+            _, removed, _, left = runs[-1]
+            print(f"{name:<12}{first:9.3f}{removed:9d}{following:9.4f}{left:14d}")
+    finally:
+        pool.close()
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
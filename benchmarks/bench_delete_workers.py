@@ -0,0 +1,67 @@
+"""Deletion throughput of DeletionPool with 1, 4 and 16 workers on tmpfs and disk
+
+Builds one tree of small files (1000 to a folder, folders nested two
+deep) in each --dir, by default /dev/shm (tmpfs) and the system temp
+folder (ext4 on most Linux machines), and deletes a fresh copy of it
+with each worker count. Every run must delete exactly --files files and
+--files * --size bytes.
+
+    python benchmarks/bench_delete_workers.py --files 200000 --workers 1,4,16
+"""
+import argparse
+import os
+import sys
+import tempfile
+
+from common import copy_tree, load_engine, make_root, make_tree, remove, timed
+
+
+def filesystem(path):
+    """Type of the filesystem holding path, from /proc/mounts"""
+    try:
+        with open("/proc/mounts", encoding="utf-8") as f:
+            mounts = dict(line.split()[1:3] for line in f)
+    except OSError:
+        return "?"
+    path = os.path.realpath(path)
+    while path not in mounts and os.path.dirname(path) != path:
+        path = os.path.dirname(path)
+    return mounts.get(path, "?")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--files", type=int, default=200000)
+    parser.add_argument("--size", type=int, default=512, help="bytes per file")
+    parser.add_argument("--workers", default="1,4,16", help="comma separated worker counts")
+    parser.add_argument("--dir", action="append", dest="dirs",
+                        help="parent folder of the trees, repeatable (default: /dev/shm and system temp)")
+    args = parser.parse_args()
+    engine = load_engine()
+    counts = [int(count) for count in args.workers.split(",")]
+    dirs = args.dirs or [path for path in ("/dev/shm", tempfile.gettempdir()) if os.path.isdir(path)]
+
+    print(f"{args.files} files of {args.size} bytes, {os.cpu_count()} CPUs")
+    for parent in dirs:
+        source = make_root(parent)
+        try:
+            make_tree(source, args.files, depth=2, size=args.size)
+            print(f"{parent} ({filesystem(parent)})")
+            for workers in counts:
+                tree = copy_tree(source, parent)
+                pool = engine.DeletionPool(workers)
+                try:
+                    elapsed, job = timed(pool.clean, tree)
+                finally:
+                    pool.close()
+                    remove(tree)
+                assert job.files_deleted == args.files, job.files_deleted
+                assert job.freed_bytes == args.files * args.size, job.freed_bytes
+                print(f"  {workers:3d} workers: {elapsed:7.2f}s  {args.files / elapsed:9.0f} files/s")
+        finally:
+            remove(source)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
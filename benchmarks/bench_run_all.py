@@ -0,0 +1,70 @@
+"""Full run_all over every filesystem target of a generated fixture
+
+Generates a fixture tree (generate_fixture is the same for a given
+scale) for each run and cleans it with run_all, with and without the
+estimate pass, at each --scales value and --workers count. Reports the
+best time of --rounds runs, files and MB freed, and the per-target times
+of the slowest targets. Every run must leave only the browser profile
+lists behind.
+
+    python benchmarks/bench_run_all.py --scales 1,2 --workers 1,8
+"""
+import argparse
+import os
+import sys
+
+from common import load_engine, make_root, remove, timed
+
+# Files that are not cleaning targets and stay behind
+PROFILE_LISTS = ("Local State", "profiles.ini")
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scales", default="1,2", help="comma separated generate_fixture scales")
+    parser.add_argument("--workers", default="1,8", help="comma separated max_workers values")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--top", type=int, default=3, help="slowest targets listed per run")
+    parser.add_argument("--dir", help="parent folder of the fixture roots (default: system temp)")
+    args = parser.parse_args()
+    engine = load_engine()
+    state = make_root()
+
+    def run(scale, workers, estimate):
+        root = make_root(args.dir)
+        try:
+            files, size = engine.generate_fixture(root, scale)
+            resolver = engine.PathResolver(root)
+            cleaner = engine.Windows11Cleaner(resolver=resolver, max_workers=workers)
+            cleaner.browser_profiles = engine.BrowserProfiles(resolver, os.path.join(state, "browsers.json"))
+            elapsed, _ = timed(cleaner.run_all, estimate=estimate)
+            report = cleaner.run_report()
+            left = [name for _, _, names in os.walk(root) for name in names if name not in PROFILE_LISTS]
+            assert not left, left[:5]
+            assert report["totals"]["files_deleted"] == files, (report["totals"]["files_deleted"], files)
+            assert report["totals"]["bytes"] == size
+            return elapsed, report
+        finally:
+            remove(root)
+
+    try:
+        print(f"{'scale':>5}{'workers':>8}  {'estimate':<9}{'best s':>8}{'files':>9}{'files/s':>10}{'MB':>10}"
+              f"  slowest targets")
+        for scale in (float(value) for value in args.scales.split(",")):
+            for workers in (int(value) for value in args.workers.split(",")):
+                for estimate in (True, False):
+                    elapsed, report = min((run(scale, workers, estimate) for _ in range(args.rounds)),
+                                          key=lambda result: result[0])
+                    totals = report["totals"]
+                    slowest = sorted(report["targets"], key=lambda target: -target["elapsed"])[:args.top]
+                    targets = ", ".join(f"{target['target']} {target['elapsed']:.2f}s" for target in slowest)
+                    print(f"{scale:5g}{workers:8d}  {'yes' if estimate else 'no':<9}{elapsed:8.2f}"
+                          f"{totals['files_deleted']:9d}{totals['files_deleted'] / elapsed:10.0f}"
+                          f"{totals['bytes'] / (1024 * 1024):10.0f}  {targets}")
+    finally:
+        remove(state)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
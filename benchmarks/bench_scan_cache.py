@@ -0,0 +1,87 @@
+"""Preview time with the ScanCache: no cache, cold cache, warm cache and after a change
+
+Builds a fixture tree with generate_fixture and previews every target
+four times:
+
+  no cache    plain scandir scans
+  cold        an empty cache file, filled by this scan
+  warm        the cache reopened from disk, every directory unchanged
+  changed     warm again after adding --added files to one temp folder
+
+Cache timings include opening and loading the cache file. Every preview
+must find the same files as the uncached one (plus the added files).
+Each preview is run --rounds times and the best time is reported.
+
+    python benchmarks/bench_scan_cache.py --scale 2
+"""
+import argparse
+import os
+import sys
+import time
+
+from common import load_engine, make_root, remove, timed
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=2.0, help="generate_fixture scale")
+    parser.add_argument("--added", type=int, default=100, help="files added before the last preview")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--dir", help="parent folder of the fixture root (default: system temp)")
+    args = parser.parse_args()
+    engine = load_engine()
+
+    root = make_root(args.dir)
+    state = make_root()
+    cache_file = os.path.join(state, "scan_cache.db")
+    resolver = engine.PathResolver(root)
+
+    def preview(use_cache):
+        cache = engine.ScanCache(cache_file) if use_cache else None
+        cleaner = engine.Windows11Cleaner(resolver=resolver, scan_cache=cache)
+        cleaner.browser_profiles = engine.BrowserProfiles(resolver, os.path.join(state, "browsers.json"))
+        index = cleaner.preview()
+        if cache is not None:
+            cache.close()
+        return index.total_files, index.total_bytes, cache
+
+    def best(use_cache, reset=False):
+        runs = []
+        for _ in range(args.rounds):
+            if reset and os.path.exists(cache_file):
+                os.remove(cache_file)
+            runs.append(timed(preview, use_cache))
+        return min(runs, key=lambda run: run[0])
+
+    def report(name, run, expected):
+        elapsed, (files, size, cache) = run
+        assert (files, size) == expected, (name, files, size, expected)
+        counts = f"  {cache.hits:6d} hits {cache.misses:6d} misses" if cache else ""
+        print(f"{name:<10}{elapsed:8.3f}s{counts}")
+
+    try:
+        files, size = engine.generate_fixture(root, args.scale)
+        # Directories changed within ScanCache.SETTLE_NS are not cached yet
+        time.sleep(engine.ScanCache.SETTLE_NS / 1e9)
+        print(f"fixture: {files} files under {root}")
+
+        plain = best(False)
+        expected = plain[1][:2]
+        report("no cache", plain, expected)
+        report("cold", best(True, reset=True), expected)
+        report("warm", best(True), expected)
+        print(f"cache file: {os.path.getsize(cache_file) / (1024 * 1024):.1f} MB")
+
+        temp = resolver.resolve("%TEMP%")[0]
+        for number in range(args.added):
+            with open(os.path.join(temp, f"added_{number:05d}.tmp"), "wb") as f:
+                f.write(b"x")
+        report("changed", timed(preview, True), (expected[0] + args.added, expected[1] + args.added))
+    finally:
+        remove(root)
+        remove(state)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
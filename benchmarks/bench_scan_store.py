@@ -0,0 +1,101 @@
+"""Memory of scan results: ScanStore against plain lists, and a streamed preview
+
+Part one stores the same synthetic entries (Chrome-cache-like paths,
+1000 files to a folder) as a list of dicts, a list of tuples and a
+ScanStore, and reports the bytes per entry traced by tracemalloc and
+the time to iterate them all. Part two previews a real flat temp folder
+and reports the peak memory of the whole scan per file found, which
+stays far below a tuple per file because scans are indexed in chunks.
+
+    python benchmarks/bench_scan_store.py --entries 1000000 --preview-files 200000
+"""
+import argparse
+import gc
+import os
+import sys
+import time
+import tracemalloc
+
+from common import load_engine, make_root, make_tree, remove
+
+
+def entries(count, base):
+    """Yield (path, size, mtime_ns) entries in folders of 1000 files"""
+    now = time.time_ns()
+    for number in range(count):
+        folder = os.path.join(base, "Cache", "Cache_Data", f"{number // 1000:04d}")
+        yield os.path.join(folder, f"f_{number:06x}"), 512 + number % 65536, now - number * 10**6
+
+
+def traced(build):
+    """Return (object, bytes allocated while building it)"""
+    gc.collect()
+    tracemalloc.start()
+    result = build()
+    size = tracemalloc.get_traced_memory()[0]
+    tracemalloc.stop()
+    return result, size
+
+
+def iterate(rows):
+    start = time.perf_counter()
+    for _ in rows:
+        pass
+    return time.perf_counter() - start
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--entries", type=int, default=1000000)
+    parser.add_argument("--preview-files", type=int, default=200000,
+                        help="files in the previewed temp folder (0 to skip)")
+    args = parser.parse_args()
+    engine = load_engine()
+    base = os.path.join(os.sep, "Users", "fixture", "AppData", "Local", "Google", "Chrome",
+                        "User Data", "Default")
+    count = args.entries
+
+    print(f"{count} entries")
+    dicts, size = traced(lambda: [{"path": p, "size": s, "mtime_ns": m} for p, s, m in entries(count, base)])
+    print(f"  list of dicts: {size / count:6.1f} bytes/entry, iterate {iterate(dicts):.2f}s")
+    del dicts
+    tuples, size = traced(lambda: list(entries(count, base)))
+    print(f"  list of tuples: {size / count:6.1f} bytes/entry, iterate {iterate(tuples):.2f}s")
+    del tuples
+
+    def build_store():
+        store = engine.ScanStore()
+        source = entries(count, base)
+        while True:
+            chunk = list(engine.islice(source, engine.INDEX_CHUNK))
+            if not chunk:
+                return store
+            store.add("browser_caches", chunk)
+
+    store, size = traced(build_store)
+    print(f"  ScanStore:      {size / count:6.1f} bytes/entry, "
+          f"iterate {iterate(store.files('browser_caches')):.2f}s")
+    del store
+
+    if args.preview_files:
+        root = make_root()
+        try:
+            temp = engine.PathResolver(root).resolve("%TEMP%")[0]
+            make_tree(temp, args.preview_files, per_dir=args.preview_files)
+            cleaner = engine.Windows11Cleaner(resolver=engine.PathResolver(root), targets={"windows_temp"},
+                                              max_workers=1)
+            gc.collect()
+            tracemalloc.start()
+            index = cleaner.preview()
+            current, peak = tracemalloc.get_traced_memory()
+            tracemalloc.stop()
+            files = index.total_files
+            print(f"preview of one folder of {files} files")
+            print(f"  index {current / files:.1f} bytes/file, peak during the scan {peak / files:.1f} bytes/file")
+        finally:
+            remove(root)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
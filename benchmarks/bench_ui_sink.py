@@ -0,0 +1,171 @@
+"""Engine throughput with and without a UI sink attached
+
+Cleans a freshly generated fixture tree (generate_fixture is the same
+for every run) with run_all three ways:
+
+  no sink     no callbacks at all
+  batched     the GUI's pipeline: log lines go on a deque and progress and
+              status keep only their latest value; a drain thread applies
+              them every UI_REFRESH_MS with one render per batch
+  per call    every callback renders at once on the cleaner's thread under
+              a lock, as the GUI did before the queue
+
+Rendering stands in for the Tk text widget: it stores lines in a
+LogBuffer, joins the visible rows into one string and then sleeps
+--render-ms for the insert, see and redraw, so the benchmark runs without
+a display. Each mode runs --rounds times and the best time is reported.
+Trees go in /dev/shm when there is one, so disk writeback does not
+drown out the difference.
+
+    python benchmarks/bench_ui_sink.py --scale 2 --render-ms 2
+"""
+import argparse
+import os
+import sys
+import threading
+import time
+from collections import deque
+from itertools import islice
+
+from common import load_engine, make_root, remove, timed
+
+VISIBLE_ROWS = 40
+
+
+class Screen:
+    """Headless stand-in for the log widget, progress bar and status label"""
+
+    def __init__(self, engine, render_ms):
+        self.log = engine.LogBuffer(spill_path=None)
+        self.render_seconds = render_ms / 1000
+        self.text = ""
+        self.progress = None
+        self.status = None
+        self.renders = 0
+
+    def add_lines(self, lines):
+        for line in lines:
+            self.log.append(line)
+        start = max(0, len(self.log.lines) - VISIBLE_ROWS)
+        self.text = "\n".join(islice(self.log.lines, start, None))
+        self.redraw()
+
+    def set_progress(self, info):
+        self.progress = f"{info.percent}% Complete • {info.files_done}/{info.files_total} files"
+        self.redraw()
+
+    def set_status(self, status):
+        self.status = status
+        self.redraw()
+
+    def redraw(self):
+        self.renders += 1
+        time.sleep(self.render_seconds)
+
+
+class BatchedSink:
+    """The GUI's queue_* callbacks with a timer thread in place of root.after"""
+
+    def __init__(self, engine, screen):
+        self.screen = screen
+        self.interval = engine.UI_REFRESH_MS / 1000
+        self.max_lines = engine.UI_MAX_LINES_PER_BATCH
+        self.log_queue = deque()
+        self.pending_progress = None
+        self.pending_status = None
+        self._stop = threading.Event()
+        self._thread = threading.Thread(target=self._drain, daemon=True)
+        self._thread.start()
+
+    def callbacks(self):
+        return {"log_callback": self.log_queue.append,
+                "progress_callback": lambda info: setattr(self, "pending_progress", info),
+                "status_callback": lambda status: setattr(self, "pending_status", status)}
+
+    def flush(self):
+        lines = []
+        while self.log_queue and len(lines) < self.max_lines:
+            lines.append(self.log_queue.popleft())
+        if lines:
+            self.screen.add_lines(lines)
+        progress, self.pending_progress = self.pending_progress, None
+        if progress is not None:
+            self.screen.set_progress(progress)
+        status, self.pending_status = self.pending_status, None
+        if status is not None:
+            self.screen.set_status(status)
+
+    def _drain(self):
+        while not self._stop.wait(self.interval):
+            self.flush()
+
+    def close(self):
+        self._stop.set()
+        self._thread.join()
+        self.flush()
+
+
+class DirectSink:
+    """Every callback renders at once, one call at a time"""
+
+    def __init__(self, engine, screen):
+        self.screen = screen
+        self._lock = threading.Lock()
+
+    def callbacks(self):
+        def locked(func):
+            def call(value):
+                with self._lock:
+                    func(value)
+            return call
+        return {"log_callback": locked(lambda message: self.screen.add_lines(message.split("\n"))),
+                "progress_callback": locked(self.screen.set_progress),
+                "status_callback": locked(self.screen.set_status)}
+
+    def close(self):
+        pass
+
+
+def main():
+    parser = argparse.ArgumentParser(description=__doc__.splitlines()[0])
+    parser.add_argument("--scale", type=float, default=2.0, help="generate_fixture scale")
+    parser.add_argument("--rounds", type=int, default=3)
+    parser.add_argument("--render-ms", type=float, default=2.0, help="cost of one redraw of the UI")
+    parser.add_argument("--dir", help="parent folder of the fixture roots (default: /dev/shm or system temp)")
+    args = parser.parse_args()
+    engine = load_engine()
+    parent = args.dir or ("/dev/shm" if os.path.isdir("/dev/shm") else None)
+
+    state = make_root()
+    try:
+        def clean(sink_type):
+            root = make_root(parent)
+            engine.generate_fixture(root, args.scale)
+            screen = Screen(engine, args.render_ms)
+            sink = sink_type(engine, screen) if sink_type else None
+            try:
+                resolver = engine.PathResolver(root)
+                cleaner = engine.Windows11Cleaner(resolver=resolver, **(sink.callbacks() if sink else {}))
+                cleaner.browser_profiles = engine.BrowserProfiles(resolver, os.path.join(state, "browsers.json"))
+                elapsed, _ = timed(cleaner.run_all)
+                if sink:
+                    sink.close()
+                return elapsed, sum(stats.files_deleted for stats in cleaner.results), screen.renders
+            finally:
+                remove(root)
+
+        print(f"{'sink':<10}{'best s':>9}{'files/s':>12}{'renders':>10}")
+        deleted = set()
+        for name, sink_type in (("no sink", None), ("batched", BatchedSink), ("per call", DirectSink)):
+            elapsed, files, renders = min((clean(sink_type) for _ in range(args.rounds)),
+                                          key=lambda run: run[0])
+            deleted.add(files)
+            print(f"{name:<10}{elapsed:9.3f}{files / elapsed:12.0f}{renders:10d}")
+        assert len(deleted) == 1, deleted
+    finally:
+        remove(state)
+    return 0
+
+
+if __name__ == "__main__":
+    sys.exit(main())
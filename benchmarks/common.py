@@ -0,0 +1,64 @@
+"""Shared helpers for the benchmark scripts
+
+Each script runs on its own (python benchmarks/bench_<name>.py) and
+builds its trees under a fixture root, so nothing touches the live
+system.
+"""
+import importlib.util
+import os
+import shutil
+import tempfile
+import time
+
+ENGINE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "Winodows CLeanner-PRO.py")
+
+
+def load_engine():
+    """Import the cleaner script as a module"""
+    spec = importlib.util.spec_from_file_location("fresher", ENGINE_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+def make_root(parent=None):
+    """Create an empty fixture root"""
+    return tempfile.mkdtemp(prefix="fresher-bench-", dir=parent)
+
+
+def make_tree(root, files, per_dir=1000, depth=1, size=0):
+    """Create files of size bytes under root, per_dir to a folder, folders nested depth deep"""
+    made = 0
+    folder = 0
+    while made < files:
+        parts = [f"d{(folder // 10 ** level) % 10:d}" for level in range(depth - 1, 0, -1)]
+        path = os.path.join(root, *parts, f"f{folder:05d}")
+        os.makedirs(path, exist_ok=True)
+        data = bytes(size)
+        for number in range(min(per_dir, files - made)):
+            with open(os.path.join(path, f"{number:06d}.tmp"), "wb") as f:
+                f.write(data)
+        made += min(per_dir, files - made)
+        folder += 1
+    return made
+
+
+def copy_tree(source, parent=None):
+    """Copy a fixture root, so every measured run starts from the same tree"""
+    target = make_root(parent)
+    shutil.rmtree(target)
+    shutil.copytree(source, target, symlinks=True)
+    return target
+
+
+def timed(func, *args, **kwargs):
+    """Call func and return (seconds, result)"""
+    start = time.perf_counter()
+    result = func(*args, **kwargs)
+    return time.perf_counter() - start, result
+
+
+def remove(path):
+    """Delete a fixture root"""
+    shutil.rmtree(path, ignore_errors=True)
@@ -0,0 +1,35 @@
+import importlib.util
+import os
+
+import pytest
+
+ENGINE_FILE = os.path.join(os.path.dirname(os.path.dirname(os.path.abspath(__file__))),
+                           "Winodows CLeanner-PRO.py")
+
+
+@pytest.fixture(scope="session")
+def engine():
+    """The cleaner script imported as a module"""
+    spec = importlib.util.spec_from_file_location("fresher", ENGINE_FILE)
+    module = importlib.util.module_from_spec(spec)
+    spec.loader.exec_module(module)
+    return module
+
+
+@pytest.fixture
+def make_cleaner(engine, tmp_path):
+    """Build a Windows11Cleaner for a fixture root, keeping its state files in tmp_path"""
+    def make(root, **options):
+        resolver = engine.PathResolver(root)
+        cleaner = engine.Windows11Cleaner(resolver=resolver, **options)
+        cleaner.browser_profiles = engine.BrowserProfiles(resolver, str(tmp_path / "browsers.json"))
+        return cleaner
+    return make
+
+
+@pytest.fixture
+def fixture_root(engine, tmp_path):
+    """A small generated fixture tree"""
+    root = str(tmp_path / "root")
+    engine.generate_fixture(root, scale=0.05)
+    return root
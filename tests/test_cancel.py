@@ -0,0 +1,61 @@
+import os
+import threading
+import time
+
+import pytest
+
+FILES = 120000
+CANCEL_BOUND = 0.05
+
+
+@pytest.fixture(scope="module")
+def large_root(engine, tmp_path_factory):
+    """A fixture root whose temp folder holds one flat directory of FILES empty files"""
+    root = str(tmp_path_factory.mktemp("large"))
+    temp = engine.PathResolver(root).resolve("%TEMP%")[0]
+    os.makedirs(temp)
+    for number in range(FILES):
+        open(os.path.join(temp, f"f_{number:06d}.tmp"), "wb").close()
+    return root
+
+
+def cancel_midway(make_cleaner, root, run, after=5000):
+    """Cancel once after files have been seen and return (cleaner, seconds from cancel to return)"""
+    seen = threading.Event()
+    count = [0]
+
+    def on_file(target, path, size):
+        count[0] += 1
+        if count[0] == after:
+            seen.set()
+
+    cleaner = make_cleaner(root, targets={"windows_temp"}, file_callback=on_file)
+    worker = threading.Thread(target=run, args=(cleaner,))
+    worker.start()
+    assert seen.wait(60)
+    start = time.perf_counter()
+    cleaner.cancel()
+    worker.join(10)
+    assert not worker.is_alive()
+    return cleaner, time.perf_counter() - start
+
+
+def remaining(engine, root):
+    return len(os.listdir(engine.PathResolver(root).resolve("%TEMP%")[0]))
+
+
+def test_cancel_mid_preview(engine, make_cleaner, large_root):
+    cleaner, latency = cancel_midway(make_cleaner, large_root, lambda cleaner: cleaner.preview())
+    assert cleaner.cancelled
+    assert latency < CANCEL_BOUND
+    assert remaining(engine, large_root) == FILES
+
+
+@pytest.mark.parametrize("estimate", [False, True])
+def test_cancel_mid_delete(engine, make_cleaner, large_root, estimate):
+    before = remaining(engine, large_root)
+    cleaner, latency = cancel_midway(make_cleaner, large_root,
+                                     lambda cleaner: cleaner.run_all(estimate=estimate))
+    assert cleaner.cancelled
+    assert latency < CANCEL_BOUND
+    assert remaining(engine, large_root) > before // 2
@@ -0,0 +1,96 @@
+import os
+import sys
+import threading
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(sys.platform == "win32", reason="stand-in commands are POSIX scripts")
+
+
+@pytest.fixture
+def runner(engine):
+    runner = engine.CommandRunner()
+    yield runner
+    runner.close()
+
+
+def python(code):
+    return [sys.executable, "-c", code]
+
+
+def alive(pid):
+    """Whether pid is running, counting zombies as gone"""
+    try:
+        with open(f"/proc/{pid}/stat") as stat:
+            return stat.read().rsplit(")", 1)[1].split()[0] != "Z"
+    except FileNotFoundError:
+        return False
+
+
+def test_output_is_streamed_while_running(engine):
+    lines = []
+    first = threading.Event()
+
+    def on_output(name, line):
+        lines.append((name, line))
+        first.set()
+
+    runner = engine.CommandRunner(on_output)
+    try:
+        future = runner.submit("stand_in", python(
+            "import sys, time\n"
+            "print('one', flush=True)\n"
+            "time.sleep(1)\n"
+            "print('two', file=sys.stderr, flush=True)\n"))
+        assert first.wait(5)
+        assert not future.done()
+        result = future.result(10)
+    finally:
+        runner.close()
+    assert result.ok
+    assert lines == [("stand_in", "one"), ("stand_in", "two")]
+
+
+def test_timeout_kills_the_process_tree(runner, tmp_path):
+    pid_file = tmp_path / "child.pid"
+    result = runner.run("stand_in", python(
+        "import subprocess, sys, time\n"
+        "child = subprocess.Popen([sys.executable, '-c', 'import time; time.sleep(60)'])\n"
+        f"open({str(pid_file)!r}, 'w').write(str(child.pid))\n"
+        "time.sleep(60)\n"), timeout=1)
+    assert result.timed_out
+    assert not result.ok
+    assert result.duration < 5
+    child = int(pid_file.read_text())
+    deadline = time.monotonic() + 5
+    while alive(child) and time.monotonic() < deadline:
+        time.sleep(0.05)
+    assert not alive(child)
+
+
+def test_missing_executable(runner, tmp_path):
+    result = runner.run("stand_in", [str(tmp_path / "no-such-tool")])
+    assert result.error
+    assert result.returncode is None
+    assert not result.ok
+
+
+def test_cancel_stops_the_command(engine, runner):
+    token = engine.CancelToken()
+    future = runner.submit("stand_in", python("import time; time.sleep(60)"), token=token)
+    time.sleep(0.5)
+    start = time.perf_counter()
+    token.cancel()
+    result = future.result(10)
+    assert result.cancelled
+    assert not result.ok
+    assert time.perf_counter() - start < 1
+
+
+def test_commands_run_concurrently(runner):
+    start = time.perf_counter()
+    futures = [runner.submit(f"stand_in_{number}", python("import time; time.sleep(1)"))
+               for number in range(4)]
+    assert all(future.result(10).ok for future in futures)
+    assert time.perf_counter() - start < 3
@@ -0,0 +1,59 @@
+import pytest
+
+
+def test_unverified_entries_count_bytes_from_a_fresh_stat(engine, tmp_path):
+    path = tmp_path / "grown.log"
+    path.write_bytes(b"x" * 100)
+    entry = (str(path), 100, path.stat().st_mtime_ns)
+    with open(path, "ab") as f:
+        f.write(b"y" * 5000)
+
+    pool = engine.DeletionPool(2)
+    try:
+        job = pool.submit_entries([entry], verify=False).wait()
+    finally:
+        pool.close()
+    assert not path.exists()
+    assert (job.files_deleted, job.freed_bytes, job.changed) == (1, 5100, 0)
+
+
+def make_tree(root, folders=20, files=10):
+    for folder in range(folders):
+        path = root / f"d{folder:02d}" / "sub"
+        path.mkdir(parents=True)
+        for number in range(files):
+            (path / f"{number}.tmp").write_bytes(b"x" * 10)
+
+
+def fail(*args):
+    raise ValueError("output closed")
+
+
+@pytest.mark.parametrize("workers", [0, 4])
+@pytest.mark.parametrize("callback", ["on_progress", "on_file"])
+def test_callback_error_completes_the_job_and_is_raised(engine, tmp_path, workers, callback):
+    make_tree(tmp_path)
+    pool = engine.DeletionPool(workers)
+    try:
+        job = pool.submit(str(tmp_path), **{callback: fail})
+        assert job.done.wait(5)
+        with pytest.raises(ValueError, match="output closed"):
+            job.wait()
+        # The workers survive for later jobs
+        make_tree(tmp_path / "again")
+        assert pool.clean(str(tmp_path / "again")).files_deleted == 200
+    finally:
+        pool.close()
+
+
+def test_callback_error_in_listed_entries_is_raised(engine, tmp_path):
+    make_tree(tmp_path, folders=1)
+    entries = [(str(path), 10, path.stat().st_mtime_ns) for path in (tmp_path / "d00" / "sub").iterdir()]
+    pool = engine.DeletionPool(2)
+    try:
+        job = pool.submit_entries(entries, on_file=fail)
+        assert job.done.wait(5)
+        with pytest.raises(ValueError):
+            job.wait()
+    finally:
+        pool.close()
@@ -0,0 +1,72 @@
+import json
+import os
+import subprocess
+import sys
+
+from conftest import ENGINE_FILE
+
+STATE_FILES = ("fresher_history.db", "fresher_locked.json", "fresher_browsers.json")
+GUI_MODULES = ("tkinter", "ctypes")
+
+
+def headless(*args):
+    """Run the script headless in a fresh interpreter, logging its imports to stderr"""
+    return subprocess.run([sys.executable, "-X", "importtime", ENGINE_FILE, "--headless", *args],
+                          capture_output=True, text=True, timeout=120)
+
+
+def imported(result):
+    """Modules -X importtime reports the run imported"""
+    return {line.rsplit("|", 1)[1].strip() for line in result.stderr.splitlines()
+            if line.startswith("import time:") and line.count("|") == 2}
+
+
+def cleanable_files(root):
+    """Files below a fixture root, leaving out the run's own state files"""
+    return sum(len(names) for _, _, names in os.walk(root)) - sum(
+        os.path.exists(os.path.join(root, name)) for name in STATE_FILES)
+
+
+def app_state():
+    folder = os.path.dirname(ENGINE_FILE)
+    return {name: os.stat(os.path.join(folder, name)).st_mtime_ns
+            for name in STATE_FILES if os.path.exists(os.path.join(folder, name))}
+
+
+def test_fixture_run_keeps_state_files_inside_the_root(fixture_root):
+    before = app_state()
+    result = headless("--root", fixture_root, "--no-estimate")
+    assert result.returncode == 0, result.stderr
+    for name in STATE_FILES:
+        assert os.path.isfile(os.path.join(fixture_root, name)), name
+    assert app_state() == before
+
+
+def test_headless_clean_of_a_fixture(fixture_root):
+    before = cleanable_files(fixture_root)
+    result = headless("--root", fixture_root, "--output", "ndjson")
+    assert result.returncode == 0, result.stderr
+
+    events = [json.loads(line) for line in result.stdout.splitlines()]
+    summary = events[-1]
+    assert summary["event"] == "summary"
+    assert not summary["cancelled"] and summary["errors"] == 0
+    deleted = [event for event in events if event["event"] == "file"]
+    assert len(deleted) == summary["files"] > 0
+    assert sum(event["bytes"] for event in deleted) == summary["bytes"]
+    assert {"log", "target"} <= {event["event"] for event in events}
+    assert not any(os.path.exists(event["path"]) for event in deleted)
+    assert cleanable_files(fixture_root) == before - summary["files"]
+    assert not imported(result) & set(GUI_MODULES)
+
+
+def test_headless_dry_run_of_a_fixture(fixture_root):
+    before = cleanable_files(fixture_root)
+    result = headless("--root", fixture_root, "--dry-run", "--output", "json")
+    assert result.returncode == 0, result.stderr
+    report = json.loads(result.stdout)
+    assert report["dry_run"] and report["files"] > 0
+    assert sum(target["files"] for target in report["targets"]) == report["files"]
+    assert cleanable_files(fixture_root) == before
+    assert "json" in imported(result)
+    assert not imported(result) & set(GUI_MODULES)
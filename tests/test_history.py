@@ -0,0 +1,55 @@
+import os
+import time
+
+DAY = 86400
+MiB = 1024 * 1024
+
+
+def stats(engine, name, nbytes, files=10):
+    result = engine.TargetStats(name)
+    result.freed_bytes, result.files_deleted, result.files_scanned = nbytes, files, files
+    return result
+
+
+def test_regrowth_rate_drives_the_schedule(engine, tmp_path):
+    history = engine.RunHistory(str(tmp_path / "history.db"))
+    start = 1_700_000_000
+    for day, nbytes in enumerate((50 * MiB, 2 * MiB, 4 * MiB)):
+        history.record(start + day * DAY, 1.0, False, [stats(engine, "prefetch", nbytes), stats(engine, "thumbnails", 0)])
+    # Skipped and cancelled runs are not cleans
+    history.record(start + 2.5 * DAY, 0.0, False, [], skipped=["prefetch"])
+    cancelled = stats(engine, "prefetch", 100 * MiB)
+    cancelled.cancelled = True
+    history.record(start + 2.6 * DAY, 1.0, True, [cancelled])
+
+    # What the last two cleans freed had regrown over two days
+    assert history.regrowth("prefetch") == (3 * MiB, 10.0, start + 2 * DAY)
+    assert history.regrowth("recent_files") is None
+    trends = {trend["target"]: trend for trend in history.trends()}
+    assert trends["prefetch"]["cleans"] == 4
+    assert trends["prefetch"]["skipped"] == 1
+    assert trends["thumbnails"]["bytes_per_day"] == 0
+
+    schedule = engine.CleanSchedule(history, min_bytes=2 * MiB, max_days=7)
+    targets = ["prefetch", "thumbnails", "recent_files"]
+    assert set(schedule.skip(targets, now=start + 2.5 * DAY)) == {"prefetch", "thumbnails"}
+    assert set(schedule.skip(targets, now=start + 3 * DAY)) == {"thumbnails"}
+    assert schedule.skip(targets, now=start + 9 * DAY) == {}
+
+
+def test_scheduled_run_skips_targets_that_have_not_regrown(engine, make_cleaner, fixture_root, tmp_path):
+    history = engine.RunHistory(str(tmp_path / "history.db"))
+    now = time.time()
+    for days in (2, 1):
+        history.record(now - days * DAY, 1.0, False, [stats(engine, "prefetch", 0, 0), stats(engine, "recent_files", 0, 0)])
+    prefetch = engine.PathResolver(fixture_root).resolve(r"C:\Windows\Prefetch")[0]
+    files = len(os.listdir(prefetch))
+    cleaner = make_cleaner(fixture_root, targets={"prefetch", "recent_files", "windows_temp"},
+                           history=history, schedule=engine.CleanSchedule(history))
+
+    cleaner.run_all()
+    assert cleaner.run_report()["skipped"] == {"prefetch": 0, "recent_files": 0}
+    assert [result.name for result in cleaner.results] == ["windows_temp"]
+    assert len(os.listdir(prefetch)) == files
+    trends = {trend["target"]: (trend["cleans"], trend["skipped"]) for trend in history.trends()}
+    assert trends == {"prefetch": (2, 1), "recent_files": (2, 1), "windows_temp": (1, 0)}
@@ -0,0 +1,38 @@
+def line(n, level="INFO"):
+    return f"[12:00:{n % 60:02d}] [{level}] line {n}"
+
+
+def test_full_buffer_spills_its_oldest_lines(engine, tmp_path):
+    spill = tmp_path / "fresher.log"
+    buffer = engine.LogBuffer(capacity=3, spill_path=str(spill))
+    for n in range(5):
+        buffer.append(line(n, "ERROR" if n % 2 else "INFO"))
+    buffer._handler.close()
+
+    assert list(buffer.lines) == [line(2), line(3, "ERROR"), line(4)]
+    assert spill.read_text(encoding="utf-8").splitlines() == [line(0), line(1, "ERROR")]
+    assert buffer.filter(level="ERROR") == [line(3, "ERROR")]
+    assert buffer.filter(text="LINE 4") == [line(4)]
+    assert engine.log_level("no timestamp") == "INFO"
+
+
+def test_buffer_stays_bounded_and_rotates_its_spill_file(engine, tmp_path):
+    spill = tmp_path / "fresher.log"
+    buffer = engine.LogBuffer(capacity=100, spill_path=str(spill), max_bytes=4096, backups=2)
+    for n in range(10000):
+        buffer.append(line(n, "WARNING"))
+    buffer._handler.close()
+
+    assert len(buffer.lines) == 100 and buffer.lines[-1] == line(9999, "WARNING")
+    assert sorted(path.name for path in tmp_path.iterdir()) == ["fresher.log", "fresher.log.1", "fresher.log.2"]
+    assert all(path.stat().st_size <= 4096 for path in tmp_path.iterdir())
+    assert spill.read_text(encoding="utf-8").splitlines()[-1] == line(9899, "WARNING")
+
+
+def test_buffer_without_spill_file(engine):
+    buffer = engine.LogBuffer(capacity=2, spill_path=None)
+    for n in range(3):
+        buffer.append(line(n))
+    assert list(buffer.lines) == [line(1), line(2)]
+    buffer.clear()
+    assert not buffer.lines
@@ -0,0 +1,35 @@
+import os
+import shutil
+
+
+def run(make_cleaner, root, workers):
+    cleaner = make_cleaner(root, max_workers=workers)
+    cleaner.run_all()
+    return cleaner.run_report()
+
+
+def per_target(report):
+    return {record["target"]: (record["files_deleted"], record["bytes"]) for record in report["targets"]}
+
+
+def test_parallel_run_matches_sequential(engine, make_cleaner, tmp_path):
+    root = str(tmp_path / "sequential")
+    files, size = engine.generate_fixture(root, scale=0.05)
+    copy = str(tmp_path / "parallel")
+    shutil.copytree(root, copy)
+
+    sequential = run(make_cleaner, root, 1)
+    parallel = run(make_cleaner, copy, 8)
+
+    assert sequential["totals"]["files_deleted"] == files
+    assert sequential["totals"]["bytes"] == size
+    for key in ("files_deleted", "bytes", "dirs_removed", "errors", "failures"):
+        assert parallel["totals"][key] == sequential["totals"][key], key
+    assert per_target(parallel) == per_target(sequential)
+
+
+def test_parallel_run_leaves_only_profile_lists(fixture_root, make_cleaner):
+    run(make_cleaner, fixture_root, 8)
+    left = [os.path.join(folder, name) for folder, _, names in os.walk(fixture_root) for name in names]
+    assert left
+    assert all(path.endswith(("Local State", "profiles.ini")) for path in left)
@@ -0,0 +1,56 @@
+import json
+import os
+
+import pytest
+
+
+@pytest.mark.parametrize("estimate", [True, False])
+def test_overlapping_targets_are_walked_once_and_credited_once(engine, make_cleaner, fixture_root, estimate):
+    resolver = engine.PathResolver(fixture_root)
+    explorer = resolver.resolve(r"%LOCALAPPDATA%\Microsoft\Windows\Explorer")[0]
+    thumbnails = [os.path.join(explorer, name) for name in os.listdir(explorer) if name.startswith("thumbcache_")]
+    temp = resolver.resolve(r"%TEMP%")[0]
+    folders = [temp, explorer] + [resolver.resolve(template)[0] for template in (
+        r"C:\Windows\Temp", r"C:\Windows\Logs", r"%LOCALAPPDATA%\Microsoft\Windows\WebCache")]
+    files = sum(len(names) for folder in folders for _, _, names in os.walk(folder))
+    cleaner = make_cleaner(fixture_root, targets={"windows_temp", "windows_logs", "thumbnails"})
+
+    plan = cleaner.plan_targets()
+    # TEMP, TMP and %LOCALAPPDATA%\Temp are one folder; Explorer is walked by windows_logs
+    assert (plan.paths_listed, plan.walks) == (8, 5)
+    assert {path for path, _ in plan.paths("windows_temp")} == {temp, folders[2]}
+    assert plan.paths("thumbnails") == []
+    assert plan.guests == {"thumbnails"}
+
+    expected = (len(thumbnails), sum(map(os.path.getsize, thumbnails)))
+    cleaner.run_all(estimate=estimate)
+    targets = {record["target"]: record for record in cleaner.run_report()["targets"]}
+    assert (targets["thumbnails"]["files_deleted"], targets["thumbnails"]["bytes"]) == expected
+    assert sum(record["files_deleted"] for record in targets.values()) == files
+    assert not any(names for folder in folders for _, _, names in os.walk(folder))
+
+
+def test_browser_profiles_are_parsed_once_until_a_list_changes(engine, fixture_root, tmp_path):
+    resolver = engine.PathResolver(fixture_root)
+    index_file = str(tmp_path / "browsers.json")
+    profiles = engine.BrowserProfiles(resolver, index_file)
+    dirs = profiles.cache_dirs()
+    assert profiles.parsed == 4
+    chrome = resolver.resolve(r"%LOCALAPPDATA%\Google\Chrome\User Data")[0]
+    firefox = resolver.resolve(r"%LOCALAPPDATA%\Mozilla\Firefox\Profiles\x1y2z3.default-release")[0]
+    for path in (os.path.join(chrome, "Profile 1", "Cache"), os.path.join(chrome, "Default", "Code Cache"),
+                 os.path.join(firefox, "cache2")):
+        assert path in dirs
+
+    cached = engine.BrowserProfiles(resolver, index_file)
+    assert cached.cache_dirs() == dirs
+    assert cached.parsed == 0
+
+    local_state = os.path.join(chrome, "Local State")
+    with open(local_state, "w", encoding="utf-8") as f:
+        json.dump({"profile": {"info_cache": {"Default": {}, "Profile 1": {}, "Profile 2": {}}}}, f)
+    mtime_ns = os.stat(local_state).st_mtime_ns + 10**9
+    os.utime(local_state, ns=(mtime_ns, mtime_ns))
+    changed = engine.BrowserProfiles(resolver, index_file)
+    assert os.path.join(chrome, "Profile 2", "GPUCache") in changed.cache_dirs()
+    assert changed.parsed == 1
@@ -0,0 +1,59 @@
+import os
+import time
+
+
+def test_clean_from_preview_skips_changed_files_without_a_second_walk(engine, make_cleaner, tmp_path):
+    root = str(tmp_path / "root")
+    files, size = engine.generate_fixture(root, scale=0.05)
+    cleaner = make_cleaner(root)
+    index = cleaner.preview()
+    assert (index.total_files, index.total_bytes) == (files, size)
+
+    changed = next(path for path, _, _ in index.files("prefetch"))
+    with open(changed, "ab") as f:
+        f.write(b"x")
+    # Only a walk would find a file created after the preview
+    added = os.path.join(os.path.dirname(changed), "NEW-00000000.pf")
+    open(added, "wb").close()
+
+    cleaner.run_all(index=index)
+    report = cleaner.run_report()
+    assert os.path.exists(changed) and os.path.exists(added)
+    assert report["totals"]["files_deleted"] == files - 1
+    assert report["totals"]["bytes"] == size - (os.path.getsize(changed) - 1)
+
+
+def test_scan_store_round_trip(engine):
+    store = engine.ScanStore()
+    temp, cache = os.path.join("root", "Temp"), os.path.join("root", "Cache", "Cache_Data")
+    now = time.time_ns()
+    first = [(os.path.join(temp, f"tmp{n}.tmp"), n * 100, now - n) for n in range(3)]
+    first.append((os.path.join(cache, "f_000001"), 2**40, now))
+    second = [(os.path.join(temp, "tmp9.tmp"), 0, 0)]
+    store.add("windows_temp", first)
+    store.add("browser_caches", [(os.path.join(cache, "f_000002"), 5, now)])
+    store.add("windows_temp", second)
+
+    assert list(store.files("windows_temp")) == first + second
+    assert list(store.files("browser_caches")) == [(os.path.join(cache, "f_000002"), 5, now)]
+    assert list(store.files("prefetch")) == []
+    assert store.dirs == [temp + os.sep, cache + os.sep]
+    assert len(store) == 6
+
+
+def test_file_columns_distribution(engine):
+    now = 1_000_000_000
+    day = 86400 * 10**9
+    columns = engine.FileColumns()
+    # (size, age in days): one file per size bucket and age bucket
+    files = [(100, 0.5), (5000, 3), (100_000, 10), (2 * 1024 * 1024, 60), (300 * 1024 * 1024, 200)]
+    columns.add("error_reports", [(f"f{n}", size, now * 10**9 - int(age * day))
+                                  for n, (size, age) in enumerate(files)])
+    info = columns.summary(now)["error_reports"]
+
+    assert info["files"] == 5 and info["bytes"] == sum(size for size, _ in files)
+    assert info["size_percentiles"] == {"p50": 100_000, "p90": 300 * 1024 * 1024, "p99": 300 * 1024 * 1024}
+    assert [bucket["files"] for bucket in info["size_histogram"]] == [1, 1, 1, 1, 0, 1]
+    assert [bucket["files"] for bucket in info["age_histogram"]] == [1, 1, 1, 1, 1]
+    assert info["age_histogram"][-1] == {"days": None, "files": 1, "bytes": 300 * 1024 * 1024}
+    assert [top["path"] for top in info["top"]] == ["f4", "f3", "f2", "f1", "f0"]
@@ -0,0 +1,17 @@
+import pstats
+
+
+def profiled_functions(profile_file):
+    return {name for _, _, name in pstats.Stats(profile_file).stats}
+
+
+def test_cprofile_sees_the_estimate_scan_and_the_deletes(fixture_root, make_cleaner, tmp_path):
+    profile_file = str(tmp_path / "run.pstats")
+    cleaner = make_cleaner(fixture_root, max_workers=8, delete_workers=4)
+    cleaner.run_all(profile="cprofile", profile_file=profile_file)
+
+    functions = profiled_functions(profile_file)
+    assert {"scan_targets", "safe_clean_folder", "scan_file_stats", "scan_files"} <= functions
+    assert {"clean_indexed", "_delete_entries"} <= functions
+    assert (cleaner.max_workers, cleaner.delete_workers) == (8, 4)
+    assert cleaner.run_report()["totals"]["files_deleted"]
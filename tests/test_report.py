@@ -0,0 +1,55 @@
+import json
+import os
+
+MiB = 1024 * 1024
+
+
+def test_memory_dumps_are_freed_to_the_byte_with_one_stat_each(engine, make_cleaner, fixture_root):
+    resolver = engine.PathResolver(fixture_root)
+    minidump, memory_dump = resolver.paths([r"C:\Windows\Minidump", r"C:\Windows\MEMORY.DMP"])
+    minidumps = [os.path.join(minidump, name) for name in os.listdir(minidump)]
+    dumps = minidumps + [memory_dump]
+    size = sum(map(os.path.getsize, dumps))
+    cleaner = make_cleaner(fixture_root, targets={"memory_dumps"})
+    assert cleaner.get_size_mb(minidump) * MiB == size - 1024 * MiB
+    assert cleaner.get_size_mb(memory_dump) == 1024
+
+    cleaner.run_all(estimate=False)
+    stats = cleaner.results[0]
+    assert (stats.files_deleted, stats.freed_bytes) == (len(dumps), size)
+    # Each target path and each file in the Minidump folder is stat'ed once
+    assert stats.stat_calls == 2 + len(minidumps)
+    assert cleaner.cleaned_size == size / MiB
+    assert not any(map(os.path.exists, dumps))
+
+
+def test_run_report_and_trace_per_target(engine, make_cleaner, tmp_path):
+    root = str(tmp_path / "root")
+    files, size = engine.generate_fixture(root, scale=0.05)
+    cleaner = make_cleaner(root, max_workers=4)
+    cleaner.run_all()
+    report_file, trace_file = str(tmp_path / "report.json"), str(tmp_path / "trace.json")
+    cleaner.write_report(report_file)
+    cleaner.trace.write(trace_file)
+    with open(report_file, encoding="utf-8") as f:
+        report = json.load(f)
+    with open(trace_file, encoding="utf-8") as f:
+        trace = json.load(f)
+
+    assert report["mode"] == "clean" and not report["cancelled"]
+    assert (report["totals"]["files_deleted"], report["totals"]["bytes"]) == (files, size)
+    targets = {record["target"]: record for record in report["targets"]}
+    assert set(targets) == set(cleaner.file_targets)
+    for key in ("files_scanned", "files_deleted", "bytes", "stat_calls", "errors"):
+        assert report["totals"][key] == sum(record[key] for record in targets.values()), key
+    # Guests' files are scanned by the walk they share, and only credited to them
+    for name in set(targets) - cleaner.plan.guests:
+        assert targets[name]["files_scanned"] >= targets[name]["files_deleted"]
+
+    events = [event for event in trace["traceEvents"] if event["ph"] == "X"]
+    spans = {event["name"]: event for event in events if event["cat"] == "target"}
+    assert set(spans) == set(targets)
+    assert spans["prefetch"]["args"]["bytes"] == targets["prefetch"]["bytes"]
+    assert {"estimate", "retry_locked"} <= {event["name"] for event in events if event["cat"] == "phase"}
+    threads = {event["tid"] for event in trace["traceEvents"] if event["ph"] == "M"}
+    assert {event["tid"] for event in events} <= threads
@@ -0,0 +1,63 @@
+import os
+import time
+
+import pytest
+
+
+def cached_folder(engine, root, name):
+    """A target folder holding app.log (100 bytes), dated past ScanCache.SETTLE_NS"""
+    folder = engine.PathResolver(root).resolve(f"C:\\{name}")[0]
+    os.makedirs(folder)
+    log = os.path.join(folder, "app.log")
+    with open(log, "wb") as f:
+        f.write(b"x" * 100)
+    old = time.time() - 3600
+    os.utime(folder, (old, old))
+    return folder, log
+
+
+@pytest.mark.parametrize("spec", [{"name": "app_logs", "paths": [r"C:\Logs"], "extensions": ["log"]},
+                                  {"name": "app_logs", "paths": [r"C:\Logs"]}])
+def test_file_grown_in_place_is_cleaned_with_its_new_size(engine, make_cleaner, tmp_path, spec):
+    root = str(tmp_path / "root")
+    folder, log = cached_folder(engine, root, "Logs")
+    cache_file = str(tmp_path / "cache.db")
+    rules = {spec["name"]: engine.TargetRule(spec)}
+
+    cache = engine.ScanCache(cache_file)
+    index = make_cleaner(root, rules=rules, scan_cache=cache).preview()
+    cache.close()
+    assert index.total_bytes == 100
+
+    # Appending leaves the folder's mtime, and so its cached listing, alone
+    mtime_ns = os.stat(folder).st_mtime_ns
+    with open(log, "ab") as f:
+        f.write(b"y" * 5000)
+    assert os.stat(folder).st_mtime_ns == mtime_ns
+
+    cache = engine.ScanCache(cache_file)
+    cleaner = make_cleaner(root, rules=rules, scan_cache=cache)
+    assert cleaner.preview().total_bytes == 5100
+    cleaner = make_cleaner(root, rules=rules, scan_cache=cache)
+    cleaner.run_all()
+    cache.close()
+    assert cache.hits
+    assert not os.path.exists(log)
+    assert cleaner.run_report()["totals"]["bytes"] == 5100
+
+
+def test_cached_listing_skips_files_gone_since(engine, tmp_path):
+    root = str(tmp_path / "root")
+    folder, log = cached_folder(engine, root, "Logs")
+    cache_file = str(tmp_path / "cache.db")
+    cache = engine.ScanCache(cache_file)
+    assert list(cache.scan(folder)) == [(log, 100, os.stat(log).st_mtime_ns)]
+    cache.close()
+
+    mtime_ns = os.stat(folder).st_mtime_ns
+    os.remove(log)
+    os.utime(folder, ns=(mtime_ns, mtime_ns))
+    cache = engine.ScanCache(cache_file)
+    assert list(cache.scan(folder)) == []
+    assert cache.hits == 1
+    cache.close()
@@ -0,0 +1,42 @@
+import json
+import subprocess
+import sys
+
+from conftest import ENGINE_FILE
+
+IMPORT_BUDGET = 0.1
+GUI_MODULES = ("tkinter", "ctypes")
+
+PROBE = r'''
+import contextlib, importlib.util, io, json, sys, time
+start = time.perf_counter()
+spec = importlib.util.spec_from_file_location("fresher", sys.argv[1])
+module = importlib.util.module_from_spec(spec)
+spec.loader.exec_module(module)
+elapsed = time.perf_counter() - start
+imported = sorted(name for name in sys.argv[2].split(",") if name in sys.modules)
+with contextlib.redirect_stdout(io.StringIO()):
+    code = module.run_headless(module.build_arg_parser().parse_args(sys.argv[3:]))
+print(json.dumps({"elapsed": elapsed, "imported": imported, "code": code,
+                  "headless": sorted(name for name in sys.argv[2].split(",") if name in sys.modules)}))
+'''
+
+
+def probe(*args):
+    """Import the engine in a fresh interpreter, then run it headless with args"""
+    output = subprocess.run([sys.executable, "-c", PROBE, ENGINE_FILE, ",".join(GUI_MODULES), *args],
+                            capture_output=True, text=True, check=True).stdout
+    return json.loads(output)
+
+
+def test_engine_import_is_within_budget():
+    probe("--list-targets")  # the first import compiles the script; time the cached ones
+    elapsed = min(probe("--list-targets")["elapsed"] for _ in range(3))
+    assert elapsed < IMPORT_BUDGET
+
+
+def test_headless_run_skips_gui_modules():
+    report = probe("--list-targets")
+    assert report["code"] == 0
+    assert report["imported"] == []
+    assert report["headless"] == []
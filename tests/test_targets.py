@@ -0,0 +1,60 @@
+import json
+
+import pytest
+
+
+def write_targets(tmp_path, specs):
+    path = tmp_path / "targets.json"
+    path.write_text(json.dumps(specs), encoding="utf-8")
+    return str(path)
+
+
+@pytest.mark.parametrize("field, value", [
+    ("include", "thumbcache_*"),
+    ("paths", "C:\\Temp"),
+    ("extensions", "log"),
+    ("exclude", ["ok", 3]),
+    ("min_age_days", "7"),
+    ("min_size", -1),
+    ("min_size", True),
+    ("recursive", "false"),
+    ("remove_dirs", 1),
+    ("discover", ["browsers"]),
+])
+def test_malformed_field_names_target_and_field(engine, tmp_path, field, value):
+    path = write_targets(tmp_path, [{"name": "app_logs", "paths": [r"C:\Logs"], field: value}])
+    with pytest.raises(ValueError, match=f"app_logs: {field} must be"):
+        engine.load_target_rules(path)
+
+
+def test_malformed_override_of_a_default_target(engine, tmp_path):
+    path = write_targets(tmp_path, [{"name": "thumbnails", "include": "thumbcache_*"}])
+    with pytest.raises(ValueError, match="thumbnails: include"):
+        engine.load_target_rules(path)
+
+
+@pytest.mark.parametrize("specs", [{"name": "app_logs"}, ["app_logs"], [{"paths": [r"C:\Logs"]}], [{"name": 5}]])
+def test_malformed_file_structure(engine, tmp_path, specs):
+    with pytest.raises(ValueError):
+        engine.load_target_rules(write_targets(tmp_path, specs))
+
+
+def test_valid_targets_file(engine, tmp_path):
+    path = write_targets(tmp_path, [
+        {"name": "app_logs", "paths": [r"C:\Logs"], "extensions": ["log"], "min_age_days": 1.5,
+         "min_size": 0, "recursive": False},
+        {"name": "thumbnails", "enabled": False},
+    ])
+    rules = engine.load_target_rules(path)
+    assert "thumbnails" not in rules
+    rule = rules["app_logs"]
+    assert rule.extensions == {".log"}
+    assert rule.min_age == 1.5 * 86400
+    assert not rule.recursive
+
+
+def test_headless_run_rejects_malformed_targets(engine, tmp_path, capsys):
+    path = write_targets(tmp_path, [{"name": "app_logs", "min_age_days": "7"}])
+    args = engine.build_arg_parser().parse_args(["--headless", "--rules", path, "--list-targets"])
+    assert engine.run_headless(args) == 2
+    assert "app_logs: min_age_days" in capsys.readouterr().err
@@ -0,0 +1,67 @@
+import errno
+import os
+import sys
+import time
+
+import pytest
+
+pytestmark = pytest.mark.skipif(not sys.platform.startswith("linux"), reason="inotify is Linux only")
+
+
+class RefusingLibc:
+    """libc whose inotify_add_watch fails (with a real EINVAL) for the refused paths"""
+
+    def __init__(self, libc, refused):
+        self.libc = libc
+        self.refused = refused
+
+    def __getattr__(self, name):
+        return getattr(self.libc, name)
+
+    def inotify_add_watch(self, fd, path, mask):
+        return self.libc.inotify_add_watch(fd, path, 0 if os.fsdecode(path) in self.refused else mask)
+
+
+def collect(watch, expected, seconds=5):
+    changed = set()
+    deadline = time.monotonic() + seconds
+    while not expected <= changed and time.monotonic() < deadline:
+        changed |= watch.changes(0.1)
+    return changed
+
+
+def test_refused_directories_are_polled(engine, tmp_path):
+    watched, refused = str(tmp_path / "watched"), str(tmp_path / "refused")
+    os.makedirs(watched)
+    os.makedirs(refused)
+    totals = engine.DirectoryTotals()
+    totals.add_tree(str(tmp_path))
+    watch = engine.InotifyWatch(totals, interval=0.2)
+    watch._libc = RefusingLibc(watch._libc, {refused})
+    try:
+        assert watch.watch(sorted(totals.dirs)) == [refused]
+        assert watch.unwatched == {refused}
+        assert watch.error == os.strerror(errno.EINVAL)
+
+        time.sleep(0.01)
+        open(os.path.join(watched, "a.tmp"), "wb").close()
+        open(os.path.join(refused, "b.tmp"), "wb").close()
+        assert collect(watch, {watched, refused}) >= {watched, refused}
+    finally:
+        watch.close()
+
+
+def test_watcher_warns_about_unwatched_directories(engine, make_cleaner, fixture_root, monkeypatch):
+    lines = []
+    monkeypatch.setattr(engine.InotifyWatch, "MASK", 0)
+    cleaner = make_cleaner(fixture_root, targets={"windows_temp"}, log_callback=lines.append)
+    watcher = engine.TargetWatcher(cleaner, backend="inotify", poll_interval=2)
+    watcher.start()
+    try:
+        assert isinstance(watcher.backend, engine.InotifyWatch)
+        assert watcher.backend.unwatched == set(watcher.totals.dirs)
+        warning = [line for line in lines if "Could not watch" in line]
+        assert warning and f"{len(watcher.totals.dirs)} directories" in warning[0]
+        assert "polling them every 2s" in warning[0]
+    finally:
+        watcher.backend.close()